@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: nearest-POI distances, dense haversine matrix vs KD-tree.
+
+For random points over Michigan's lower peninsula and growing POI lists,
+times the 3 nearest POIs per point two ways (scripts/accessibility.py):
+- dense: distance_matrix_km() (n x m broadcast) + argpartition
+- tree:  build_poi_tree() + nearest_pois() on the unit sphere
+and checks both give the same POIs and distances. Also times a scalar
+per-pair loop at small sizes. The dense matrix is skipped once it would
+pass ~1 GB; the tree never builds it.
+
+Run from the repo root: python benchmarks/bench_accessibility.py
+"""
+
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from accessibility import (  # noqa: E402
+    EARTH_RADIUS_KM, build_poi_tree, distance_matrix_km, nearest_pois,
+)
+
+K = 3
+DENSE_MAX_CELLS = 100_000_000  # float64 n x m matrix, ~0.8 GB
+
+
+def random_points(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-86.5, -82.5, n), rng.uniform(41.7, 45.0, n)
+
+
+def dense_nearest(lon, lat, poi_lon, poi_lat, k=K):
+    dist = distance_matrix_km(lon, lat, poi_lon, poi_lat)
+    index = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(dist, index, axis=1), axis=1)
+    index = np.take_along_axis(index, order, axis=1)
+    return np.take_along_axis(dist, index, axis=1), index
+
+
+def tree_nearest(lon, lat, poi_lon, poi_lat, k=K):
+    return nearest_pois(lon, lat, build_poi_tree(poi_lon, poi_lat), k=k)
+
+
+def loop_nearest(lon, lat, poi_lon, poi_lat, k=K):
+    def haversine(lon1, lat1, lon2, lat2):
+        lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+    return [
+        sorted(haversine(x, y, px, py) for px, py in zip(poi_lon, poi_lat))[:k]
+        for x, y in zip(lon, lat)
+    ]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: NEAREST-POI DISTANCES")
+    print("=" * 72)
+
+    tree_nearest(*random_points(10, seed=0), *random_points(10, seed=0))  # warm up scipy
+
+    print(f"\n{'points':>8} {'POIs':>6} {'loop (s)':>9} {'dense (s)':>10} {'tree (s)':>9} "
+          f"{'speedup':>8} {'identical':>10}")
+    for n in [8400, 100000]:
+        lon, lat = random_points(n, seed=1)
+        for m in [10, 500, 5000]:
+            poi_lon, poi_lat = random_points(m, seed=2)
+            (d_tree, i_tree), t_tree = timed(tree_nearest, lon, lat, poi_lon, poi_lat)
+            if n * m <= DENSE_MAX_CELLS:
+                (d_dense, i_dense), t_dense = timed(dense_nearest, lon, lat, poi_lon, poi_lat)
+                identical = (np.array_equal(i_dense, i_tree)
+                             and np.allclose(d_dense, d_tree, rtol=0, atol=1e-6))
+                dense_col, speedup_col = f"{t_dense:>10.3f}", f"{t_dense / t_tree:>7.1f}x"
+            else:
+                identical, dense_col, speedup_col = '-', f"{'-':>10}", f"{'-':>8}"
+            if n * m <= 8400 * 500:
+                _, t_loop = timed(loop_nearest, lon, lat, poi_lon, poi_lat)
+                loop_col = f"{t_loop:>9.2f}"
+            else:
+                loop_col = f"{'-':>9}"
+            print(f"{n:>8,} {m:>6,} {loop_col} {dense_col} {t_tree:>9.3f} "
+                  f"{speedup_col} {str(identical):>10}")
+            if identical is False:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
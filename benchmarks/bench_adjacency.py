@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: block group adjacency graph build time and neighbor lookups.
+
+Builds the queen/rook contiguity graph (scripts/adjacency.py) for synthetic
+Voronoi tessellations from county size up past Michigan's ~8,400 block
+groups, against a naive all-pairs intersects() loop at small sizes (checked
+for identical neighbors). Also compares the real Ingham graph with the old
+webapp rule (neighbors = same first 9 GEOID digits) and times one neighbor
+query as a CSR slice vs a linear scan.
+
+Run from the repo root: python benchmarks/bench_adjacency.py
+"""
+
+import os
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from adjacency import build_adjacency  # noqa: E402
+
+BLOCK_GROUPS = os.path.join(os.path.dirname(__file__), '..', 'data', 'block_groups',
+                            'ingham_block_groups.geojson')
+
+
+def make_tessellation(n, seed=0):
+    """n Voronoi cells clipped to a square, as a GeoDataFrame with GEOIDs."""
+    rng = np.random.default_rng(seed)
+    points = shapely.multipoints(rng.random((n, 2)) * 100)
+    box = shapely.box(0, 0, 100, 100)
+    cells = shapely.get_parts(shapely.voronoi_polygons(points, extend_to=box))
+    cells = shapely.intersection(cells, box)
+    return gpd.GeoDataFrame({'GEOID': [f'{i:012d}' for i in range(len(cells))]}, geometry=cells)
+
+
+def naive_neighbors(gdf):
+    geoms = list(gdf.geometry)
+    return [
+        [j for j in range(len(geoms)) if j != i and geoms[i].intersects(geoms[j])]
+        for i in range(len(geoms))
+    ]
+
+
+def csr_neighbors(graph):
+    indptr, indices = graph['indptr'], graph['indices']
+    return [indices[indptr[i]:indptr[i + 1]].tolist() for i in range(len(indptr) - 1)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: BLOCK GROUP ADJACENCY")
+    print("=" * 72)
+
+    print(f"\n{'polygons':>9} {'queen (s)':>10} {'rook (s)':>9} {'naive (s)':>10} "
+          f"{'mean deg':>9} {'matches naive':>14}")
+    for n in [250, 1000, 8400, 25000]:
+        gdf = make_tessellation(n)
+        queen, t_queen = timed(build_adjacency, gdf, 'queen')
+        _, t_rook = timed(build_adjacency, gdf, 'rook')
+        mean_degree = len(queen['indices']) / n
+        if n <= 1000:
+            naive, t_naive = timed(naive_neighbors, gdf)
+            match, naive_col = str(naive == csr_neighbors(queen)), f"{t_naive:>10.2f}"
+        else:
+            match, naive_col = '-', f"{'-':>10}"
+        print(f"{n:>9,} {t_queen:>10.3f} {t_rook:>9.3f} {naive_col} {mean_degree:>9.1f} {match:>14}")
+
+    # Real geography vs the GEOID prefix rule the webapp used
+    ingham = gpd.read_file(BLOCK_GROUPS)
+    graph = build_adjacency(ingham)
+    geoids = graph['geoids']
+    adjacent = [set(nbrs) for nbrs in csr_neighbors(graph)]
+    prefix_pairs = touching = 0
+    for i, g in enumerate(geoids):
+        for j, h in enumerate(geoids):
+            if i != j and g[:9] == h[:9]:
+                prefix_pairs += 1
+                touching += j in adjacent[i]
+    n_edges = len(graph['indices'])
+    print(f"\nIngham ({len(geoids)} block groups):")
+    print(f"   GEOID-prefix 'neighbors' that actually touch: {touching}/{prefix_pairs} "
+          f"({touching / prefix_pairs:.0%})")
+    print(f"   True neighbors the prefix rule finds:          {touching}/{n_edges} "
+          f"({touching / n_edges:.0%})")
+
+    # One neighbor query: CSR slice vs scanning every block group
+    i = len(geoids) // 2
+    reps = 10000
+    start = time.perf_counter()
+    for _ in range(reps):
+        graph['indices'][graph['indptr'][i]:graph['indptr'][i + 1]]
+    t_csr = (time.perf_counter() - start) / reps
+    start = time.perf_counter()
+    for _ in range(reps // 100):
+        [h for h in geoids if h != geoids[i] and h[:9] == geoids[i][:9]]
+    t_scan = (time.perf_counter() - start) / (reps // 100)
+    print(f"   Neighbor query: CSR {t_csr * 1e6:.1f} µs vs linear scan {t_scan * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
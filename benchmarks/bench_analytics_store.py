@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: block group queries, in-memory scans vs the SQLite analytics store.
+
+Tiles the Ingham predictions and feature table to each of SIZES block groups
+(about statewide, then about national) and builds the store with
+scripts/analytics_store.py. Times the chat tools' queries both ways:
+
+1. in memory, as webapp/lib/ai-tools.ts does: a linear find for a lookup, a
+   full sort for a ranking, a pass over every record for the statistics
+2. on the store: primary-key probe, precomputed top_blocks / index scan,
+   precomputed county_stats
+
+Tiling repeats every score many times, so rankings are full of ties; the
+store must return exactly the in-memory answers (validate_store(); exits
+non-zero otherwise).
+
+Run from the repo root: python benchmarks/bench_analytics_store.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+sys.path.insert(0, BENCH_DIR)
+import analytics_store as store  # noqa: E402
+from bench_prediction_snapshots import tile_records  # noqa: E402
+from storage import read_table  # noqa: E402
+
+DATA_DIR = os.path.join(BENCH_DIR, '..', 'data')
+PREDICTIONS_FILE = os.path.join(DATA_DIR, 'block_groups', 'bg_predictions.json')
+FEATURES_FILE = os.path.join(DATA_DIR, 'processed', 'bg_features.csv')
+SIZES = [8_400, 240_000]
+REPEATS = 200
+SEED = 11
+
+
+def tile_features(features, records):
+    """The feature table cycled to the tiled records' GEOIDs."""
+    tiled = features.iloc[np.arange(len(records)) % len(features)].reset_index(drop=True)
+    tiled['GEOID'] = [r['geoid'] for r in records]
+    return tiled
+
+
+def timed(query, args_list):
+    """Median seconds per call of query over args_list."""
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        query(*args)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: BLOCK GROUP QUERIES, IN-MEMORY SCANS VS ANALYTICS STORE")
+    print("=" * 72)
+
+    with open(PREDICTIONS_FILE) as f:
+        base = json.load(f)
+    base_features = read_table(FEATURES_FILE)
+    rng = np.random.default_rng(SEED)
+    tmp = tempfile.mkdtemp(prefix='analytics_')
+    ok = True
+
+    for n in SIZES:
+        records = tile_records(base, n)
+        features = tile_features(base_features, records)
+        path = os.path.join(tmp, f'analytics_{n}.sqlite')
+
+        start = time.perf_counter()
+        store.build_store(path, records, features)
+        t_build = time.perf_counter() - start
+        print(f"\n{n:,} block groups: store built in {t_build:.2f} s "
+              f"({os.path.getsize(path) / 1024 ** 2:.1f} MB)\n")
+
+        geoids = [records[i]['geoid'] for i in rng.integers(0, n, REPEATS)]
+        metrics = [store.RANKED_METRICS[i % len(store.RANKED_METRICS)] for i in range(REPEATS)]
+
+        def find(geoid):
+            return next((r for r in records if r['geoid'] == geoid), None)
+
+        def compare(a, b):
+            return store.compare_block_groups(find(a), find(b))
+
+        with store.AnalyticsStore(path) as db:
+            queries = [
+                ('lookup', find, db.block_group, [(g,) for g in geoids]),
+                ('top 5', lambda m: store.top_areas(records, m, 5), lambda m: db.top_block_groups(m, 5),
+                 [(m,) for m in metrics]),
+                (f'top {store.TOP_N * 2}', lambda m: store.top_areas(records, m, store.TOP_N * 2, 'lowest'),
+                 lambda m: db.top_block_groups(m, store.TOP_N * 2, 'lowest'), [(m,) for m in metrics]),
+                ('compare', compare, db.compare_block_groups, list(zip(geoids, geoids[::-1]))),
+                ('statistics', lambda: store.area_statistics(records), db.area_statistics, [()] * REPEATS),
+            ]
+            print(f"{'query':<12} {'in memory (ms)':>15} {'store (ms)':>11} {'speedup':>9}")
+            for name, scan, query, args_list in queries:
+                # The scans take over 100 ms each at national size; time fewer of them
+                t_scan = timed(scan, args_list[:max(5, REPEATS * 8_400 // n // 4)])
+                t_store = timed(query, args_list)
+                print(f"{name:<12} {t_scan * 1e3:>15.3f} {t_store * 1e3:>11.3f} {t_scan / t_store:>8.0f}x")
+
+        problems = store.validate_store(path, records, features)
+        ok &= not problems
+        print(f"Store matches the in-memory answers: {'yes' if not problems else 'NO ' + ', '.join(problems[:5])}")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunked, concurrent Census API fetching against a local stub.
+
+Starts a stub of the Census Data API on localhost that answers
+/data/<year>/acs/acs5 block group queries with the API's JSON arrays
+(header row first), rejects calls with more than 50 variables (400), allows
+at most THROTTLE_CONCURRENT requests in flight (429 with Retry-After beyond
+that) and adds LATENCY_S per request. Then fetches VARIABLES variables for
+COUNTIES counties with scripts/census_api.py:
+
+1. one call with every variable (what 02 used to do): rejected
+2. chunked, one connection
+3. chunked, MAX_CONNECTIONS connections
+4. 2 x MAX_CONNECTIONS connections, past the stub's throttle (429s, retried)
+5. as 3, with FAILURE_RATE of calls failing (503/429) and retried
+6. as 3 again with a warm HTTP cache
+
+Every chunked result must equal the stub's ground truth (exits non-zero
+otherwise).
+
+Run from the repo root: python benchmarks/bench_census_fetch.py
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+import census_api  # noqa: E402
+import http_cache  # noqa: E402
+
+VARIABLES = [f'B99{table:03d}_{i:03d}E' for table in range(4) for i in range(1, 31)]  # 120
+COUNTIES = [('26', county) for county in ('065', '037', '045', '155', '093')]
+BLOCK_GROUPS_PER_COUNTY = 200
+LATENCY_S = 0.05
+THROTTLE_CONCURRENT = 6
+FAILURE_RATE = 0.15
+MAX_API_VARIABLES = 50
+
+
+def value(geoid, code):
+    """Deterministic cell value, as the API returns it (a string)."""
+    return str(hash((geoid, code)) % 100000)
+
+
+def block_groups(state, county):
+    return [(state, county, f'{tract:06d}', str(bg))
+            for tract in range(BLOCK_GROUPS_PER_COUNTY // 4) for bg in range(1, 5)]
+
+
+class StubCensusAPI(BaseHTTPRequestHandler):
+    failure_rate = 0.0
+    rng = random.Random(0)
+    lock = threading.Lock()
+    in_flight = 0
+    stats = {'requests': 0, 'throttled': 0, 'failed': 0, 'rejected': 0}
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = body.encode()
+        self.send_response(status)
+        for name, value_ in (headers or {}).items():
+            self.send_header(name, value_)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.stats['requests'] += 1
+            cls.in_flight += 1
+            throttled = cls.in_flight > THROTTLE_CONCURRENT
+            failed = not throttled and cls.rng.random() < cls.failure_rate
+            if failed and cls.rng.random() < 0.5:
+                throttled, failed = True, False
+        try:
+            time.sleep(LATENCY_S)
+            if throttled:
+                cls.stats['throttled'] += 1
+                return self._reply(429, 'Too Many Requests', {'Retry-After': '1'})
+            if failed:
+                cls.stats['failed'] += 1
+                return self._reply(503, 'Service Unavailable')
+
+            query = parse_qs(urlparse(self.path).query)
+            get = query['get'][0].split(',')
+            if len(get) > MAX_API_VARIABLES:
+                cls.stats['rejected'] += 1
+                return self._reply(400, 'error: You requested more than the maximum 50 variables.')
+            state, county = (part.split(':')[1] for part in query['in'][0].split(' '))
+
+            rows = [get + census_api.GEOGRAPHY_COLUMNS]
+            for geo in block_groups(state, county):
+                geoid = ''.join(geo)
+                cells = [f'Block Group {geo[3]}, Tract {geo[2]}' if code == 'NAME' else value(geoid, code)
+                         for code in get]
+                rows.append(cells + list(geo))
+            self._reply(200, json.dumps(rows), {'Content-Type': 'application/json'})
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def expected_table():
+    rows = []
+    for state, county in COUNTIES:
+        for geo in block_groups(state, county):
+            geoid = ''.join(geo)
+            rows.append({'GEOID': geoid, **{code: value(geoid, code) for code in VARIABLES}})
+    return pd.DataFrame(rows).sort_values('GEOID', ignore_index=True)
+
+
+def run(label, expected, connections, failure_rate=0.0, cache_dir=None):
+    StubCensusAPI.failure_rate = failure_rate
+    StubCensusAPI.stats.update(requests=0, throttled=0, failed=0, rejected=0)
+    http_cache.CACHE_DIR = cache_dir or tempfile.mkdtemp(prefix='census_cache_')
+
+    start = time.perf_counter()
+    table = census_api.fetch_block_groups(2022, VARIABLES, COUNTIES, connections=connections)
+    elapsed = time.perf_counter() - start
+
+    got = table[['GEOID'] + VARIABLES].sort_values('GEOID', ignore_index=True)
+    same = got.equals(expected)
+    stats = StubCensusAPI.stats
+    print(f"{label:<34} {elapsed:>8.2f} {stats['requests']:>9} {stats['throttled']:>10} "
+          f"{stats['failed']:>7}   {'yes' if same else 'NO'}")
+    return same, http_cache.CACHE_DIR
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCensusAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    census_api.CENSUS_API_URL = f'http://127.0.0.1:{server.server_port}/data'
+
+    print("=" * 72)
+    print("BENCHMARK: CHUNKED CENSUS API FETCHING (LOCAL STUB)")
+    print("=" * 72)
+    chunks = census_api.block_group_requests(VARIABLES, COUNTIES)
+    print(f"\n{len(VARIABLES)} variables x {len(COUNTIES)} counties x {BLOCK_GROUPS_PER_COUNTY} "
+          f"block groups -> {len(chunks)} API calls; {LATENCY_S * 1000:.0f} ms per call, "
+          f"throttled above {THROTTLE_CONCURRENT} in flight")
+
+    # 1. Everything in one call, as 02 used to ask
+    StubCensusAPI.failure_rate = 0.0
+    params = {'get': 'NAME,' + ','.join(VARIABLES), 'for': 'block group:*', 'in': 'state:26 county:065'}
+    response = requests.get(census_api.acs_url(2022), params=params, timeout=30)
+    print(f"\nSingle call with {len(VARIABLES) + 1} variables: HTTP {response.status_code} "
+          f"({response.text.strip()})\n")
+
+    expected = expected_table()
+    connections = census_api.MAX_CONNECTIONS
+    print(f"{'mode':<34} {'time (s)':>8} {'requests':>9} {'throttled':>10} {'failed':>7}   equal")
+    results = [
+        run('chunked, 1 connection', expected, connections=1),
+        run(f'chunked, {connections} connections', expected, connections=connections),
+        run(f'chunked, {2 * connections} connections', expected, connections=2 * connections),
+        run(f'chunked, {connections} conn., {FAILURE_RATE:.0%} failures', expected,
+            connections=connections, failure_rate=FAILURE_RATE),
+    ]
+    results.append(run('warm HTTP cache', expected, connections=connections, cache_dir=results[1][1]))
+
+    server.shutdown()
+    for _, cache_dir in results:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    if not all(same for same, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
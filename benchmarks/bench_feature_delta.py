@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: feature matrix, full rebuild vs delta update of changed rows.
+
+Scales the Ingham source tables (census, MLS, assessor, accessibility) up to
+N_BLOCK_GROUPS block groups on a synthetic Voronoi tessellation (see
+bench_adjacency.py), with some missing values, and runs script 05 once in
+full. Then, for each CHANGED_COUNTS, edits the census and MLS rows of that
+many block groups and times:
+
+1. a full rebuild (what script 05 did before --changed)
+2. script 05 --changed with the edited GEOIDs (feature_state.py)
+
+The delta output must be byte-identical to the full rebuild, and every row
+that differs from the previous table must be marked stale (exits non-zero
+otherwise).
+
+Run from the repo root: python benchmarks/bench_feature_delta.py
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCH_DIR)
+from adjacency import build_adjacency, write_adjacency  # noqa: E402
+from bench_adjacency import make_tessellation  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from storage import read_table  # noqa: E402
+
+N_BLOCK_GROUPS = 100_000
+CHANGED_COUNTS = [10, 100, 1000]
+MISSING_SHARE = 0.01
+SEED = 5
+
+engineer = importlib.import_module('05_engineer_features')
+
+
+def scale_sources(paths, geoids, rng):
+    """Each source table resampled to the synthetic GEOIDs, with MISSING_SHARE missing values."""
+    sources = {}
+    for key in ('census', 'mls', 'assessor', 'accessibility'):
+        table = read_table(paths[key])
+        scaled = table.iloc[rng.integers(0, len(table), len(geoids))].reset_index(drop=True)
+        scaled['GEOID'] = geoids
+        for col in scaled.columns.drop(['GEOID', 'NAME'], errors='ignore'):
+            if scaled[col].dtype.kind == 'f':
+                scaled.loc[rng.random(len(scaled)) < MISSING_SHARE, col] = np.nan
+        sources[key] = scaled
+    return sources
+
+
+def edit_rows(sources, changed, rng):
+    """New census incomes and MLS prices for the changed block groups (some made missing)."""
+    census, mls = sources['census'], sources['mls']
+    rows = census['GEOID'].isin(changed)
+    census.loc[rows, 'median_income'] = (census.loc[rows, 'median_income']
+                                         * rng.uniform(0.8, 1.2, rows.sum())).round().astype(int)
+    census.loc[rows, 'pct_minority'] = census.loc[rows, 'pct_minority'].where(rng.random(rows.sum()) > 0.2)
+    rows = mls['GEOID'].isin(changed)
+    mls.loc[rows, 'price_yoy_change'] = rng.normal(0.05, 0.03, rows.sum()).round(4)
+
+
+def run(paths, changed=None):
+    """Script 05 with its output captured; returns seconds."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engineer.engineer_features(paths, changed=changed)
+    return time.perf_counter() - start
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: FEATURE MATRIX, FULL REBUILD VS DELTA UPDATE")
+    print("=" * 72)
+
+    os.chdir(SCRIPTS_DIR)
+    rng = np.random.default_rng(SEED)
+    tmp = tempfile.mkdtemp(prefix='feature_delta_')
+    paths = county_paths()
+
+    gdf = make_tessellation(N_BLOCK_GROUPS)
+    geoids = gdf['GEOID'].astype(str).to_numpy()
+    sources = scale_sources(paths, geoids, rng)
+
+    bench_paths = dict(paths, census_trends=os.path.join(tmp, 'no_trends.csv'),
+                       adjacency=os.path.join(tmp, 'adjacency.json'))
+    for key in ('census', 'mls', 'assessor', 'accessibility', 'features', 'features_state',
+                'stale_predictions'):
+        bench_paths[key] = os.path.join(tmp, os.path.basename(paths[key]))
+    write_adjacency(build_adjacency(gdf), bench_paths['adjacency'])
+
+    def write_sources():
+        for key, table in sources.items():
+            table.to_csv(bench_paths[key], index=False)
+
+    write_sources()
+    run(bench_paths)
+    print(f"\n{N_BLOCK_GROUPS:,} block groups; initial full run done\n")
+
+    print(f"{'changed':>8} {'full (s)':>9} {'delta (s)':>10} {'speedup':>8} {'stale':>7}   match")
+    ok = True
+    for count in CHANGED_COUNTS:
+        changed = rng.choice(geoids, count, replace=False)
+        edit_rows(sources, changed, rng)
+        write_sources()
+        before = pd.read_csv(bench_paths['features'], dtype=str)
+
+        os.remove(bench_paths['stale_predictions'])
+        t_delta = run(bench_paths, list(changed))
+        with open(bench_paths['features']) as f:
+            delta = f.read()
+        with open(bench_paths['stale_predictions']) as f:
+            stale = set(json.load(f)['geoids'])
+
+        t_full = run(bench_paths)
+        with open(bench_paths['features']) as f:
+            same = f.read() == delta
+
+        after = pd.read_csv(bench_paths['features'], dtype=str)
+        differs = set(after.loc[(after != before).any(axis=1), 'GEOID'])
+        covered = differs <= stale
+        ok &= same and covered
+        print(f"{count:>8} {t_full:>9.2f} {t_delta:>10.2f} {t_full / t_delta:>7.1f}x {len(stale):>7} "
+              f"  {'yes' if same else 'NO'}{'' if covered else ' (rows changed but not marked stale)'}")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
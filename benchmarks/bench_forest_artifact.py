@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pickled forests vs flat memory-mapped .forest artifacts.
+
+1. Parity: FlatForest.predict() vs sklearn predict() for the committed
+   models and a freshly trained multi-output forest, with and without NaNs
+   in the inputs (must be bit-identical; exits non-zero otherwise).
+2. Cold start in a fresh interpreter: time to import, load and score one
+   block group, and private (anonymous) memory afterwards.
+3. Shared pages: 4 fresh worker processes hold the same model at once; their
+   total proportional set size (Pss, from /proc/<pid>/smaps_rollup) counts
+   shared file pages once, private memory once per worker.
+
+Steps 2 and 3 run for the committed Ingham model and for a large synthetic
+forest (50 unpruned trees on 20k noisy rows). Memory numbers need Linux /proc.
+
+Run from the repo root: python benchmarks/bench_forest_artifact.py
+"""
+
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+from forest_artifact import artifact_path, export_forest, load_forest  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from scoring import equity_score, foreclosure_risk  # noqa: E402
+from storage import read_table  # noqa: E402
+
+WORKERS = 4
+
+# Runs in a fresh interpreter: argv = scripts dir, model file, 'pickle'|'artifact'.
+# Prints timings and memory, then stays alive until stdin closes.
+COLD_START = r'''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import numpy as np
+if sys.argv[3] == 'pickle':
+    import warnings; warnings.simplefilter('ignore')
+    import joblib
+    model = joblib.load(sys.argv[2])
+else:
+    from forest_artifact import load_forest
+    model = load_forest(sys.argv[2])
+loaded = time.perf_counter()
+model.predict(np.zeros((1, len(model.feature_names_in_))))
+scored = time.perf_counter()
+rollup = dict(line.split(':') for line in open('/proc/self/smaps_rollup').read().splitlines()[1:])
+print(loaded - start, scored - start, int(rollup['Anonymous'].split()[0]), int(rollup['Pss'].split()[0]),
+      flush=True)
+sys.stdin.read()
+'''
+
+
+def memory_kb(field):
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def start_workers(model_file, kind, n):
+    """n cold-start interpreters; returns (processes, their printed stats)."""
+    procs = [subprocess.Popen([sys.executable, '-c', COLD_START, SCRIPTS_DIR, model_file, kind],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(n)]
+    stats = [proc.stdout.readline().split() for proc in procs]
+    return procs, stats
+
+
+def pss_kb(pid):
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+
+
+def stop_workers(procs):
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+
+
+def check_parity(label, model, X):
+    X = X[list(model.feature_names_in_)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.forest')
+        export_forest(model, path)
+        flat = load_forest(path)
+        ok = True
+        X_nan = X.copy()
+        X_nan.iloc[::4, 0] = np.nan
+        for variant, data in (('', X), (' + NaNs', X_nan)):
+            same = np.array_equal(model.predict(data), flat.predict(data))
+            ok &= same
+            print(f"   {label + variant:<32} bit-identical: {same}")
+    return ok
+
+
+def report(label, model_file):
+    artifact = artifact_path(model_file)
+    print(f"\n{label}: pickle {os.path.getsize(model_file) / 1e6:.2f} MB, "
+          f"artifact {os.path.getsize(artifact) / 1e6:.2f} MB")
+    print(f"{'format':>9} {'load (s)':>9} {'+1 predict (s)':>15} {'private MB':>11} "
+          f"{'Pss MB, 1 proc':>15} {'Pss MB, ' + str(WORKERS) + ' procs':>16}")
+    for kind, path in (('pickle', model_file), ('artifact', artifact)):
+        procs, stats = start_workers(path, kind, 1)
+        stop_workers(procs)
+        t_load, t_scored, anon_kb, single_pss = map(float, stats[0])
+
+        # All workers alive at once, so shared pages are split between them
+        procs, _ = start_workers(path, kind, WORKERS)
+        total_pss = sum(pss_kb(proc.pid) for proc in procs)
+        stop_workers(procs)
+        print(f"{kind:>9} {t_load:>9.3f} {t_scored:>15.3f} {anon_kb / 1024:>11.1f} "
+              f"{single_pss / 1024:>15.1f} {total_pss / 1024:>16.1f}")
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: PICKLED FORESTS VS MEMORY-MAPPED ARTIFACTS")
+    print("=" * 72)
+    warnings.simplefilter('ignore')
+    if memory_kb('Pss') is None:
+        print("\n/proc/self/smaps_rollup not available; memory columns need Linux")
+        return
+
+    os.chdir(SCRIPTS_DIR)
+    paths = county_paths()
+    train_step = importlib.import_module('06_train_model')
+    features = read_table(paths['features'])
+    X = features.select_dtypes('number').drop(columns=['GEOID'], errors='ignore')
+    X = X.fillna(X.median())
+    Y = np.column_stack([equity_score(features), foreclosure_risk(features)])
+
+    tmp = tempfile.mkdtemp(prefix='forest_artifact_')
+    try:
+        print("\nParity:")
+        X_train = X[train_step.FEATURE_COLS]
+        joint = RandomForestRegressor(**train_step.DEFAULT_PARAMS, random_state=42).fit(X_train, Y)
+        ok = check_parity('equity_model.pkl', joblib.load(paths['equity_model']), X)
+        ok &= check_parity('foreclosure_model.pkl', joblib.load(paths['foreclosure_model']), X)
+        ok &= check_parity('multi-output forest', joint, X)
+        if not ok:
+            sys.exit(1)
+
+        # Committed model (copied so the artifact next to it is fresh)
+        ingham = os.path.join(tmp, 'equity_model.pkl')
+        shutil.copy(paths['equity_model'], ingham)
+        ingham_model = joblib.load(ingham)
+        export_forest(ingham_model, artifact_path(ingham))
+        report('Ingham equity model', ingham)
+
+        # Large forest: 20k jittered resampled rows with a noisy target, so
+        # unpruned trees grow to thousands of leaves
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, len(X), 20000)
+        X_big = X_train.iloc[rows].reset_index(drop=True)
+        X_big = X_big + rng.normal(0, 0.05, X_big.shape) * X_train.std().to_numpy()
+        big_model = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1)
+        big_model.fit(X_big, Y[rows, 0] + rng.normal(0, 5, len(rows)))
+        big = os.path.join(tmp, 'big_model.pkl')
+        joblib.dump(big_model, big)
+        export_forest(big_model, artifact_path(big))
+        del big_model
+        report('Large forest (50 trees, 20k rows)', big)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
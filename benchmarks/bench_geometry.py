@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: map geometry payload, raw GeoJSON vs simplified TopoJSON levels.
+
+Reports file size (raw and gzipped, as served) and the time to parse each
+payload and, for TopoJSON, decode it back into GeoJSON rings the way
+webapp/lib/topojson.ts does.
+
+Run from the repo root after step 01 (or python scripts/topology.py):
+    python benchmarks/bench_geometry.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from topology import ZOOM_TOLERANCES_M, topojson_path  # noqa: E402
+
+GEOJSON_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'block_groups',
+                            'ingham_block_groups.geojson')
+
+
+def decode_topojson(topology):
+    """Python port of topologyToGeoJSON() for timing the decode step."""
+    sx, sy = topology['transform']['scale']
+    tx, ty = topology['transform']['translate']
+    arcs = []
+    for arc in topology['arcs']:
+        x = y = 0
+        points = []
+        for dx, dy in arc:
+            x += dx
+            y += dy
+            points.append((x * sx + tx, y * sy + ty))
+        arcs.append(points)
+
+    def ring(refs):
+        out = []
+        for ref in refs:
+            arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+            out.extend(arc if not out else arc[1:])
+        return out
+
+    features = []
+    for geom in topology['objects']['block_groups']['geometries']:
+        polygons = [geom['arcs']] if geom['type'] == 'Polygon' else geom['arcs']
+        features.append([[ring(r) for r in polygon] for polygon in polygons])
+    return features
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: MAP GEOMETRY PAYLOAD")
+    print("=" * 72)
+    print(f"{'file':<36} {'KB':>8} {'gzip KB':>8} {'parse (ms)':>11} {'ratio':>7}")
+
+    with open(GEOJSON_FILE, 'rb') as f:
+        raw = f.read()
+    base_kb = len(raw) / 1024
+    t = best_of(lambda: json.loads(raw))
+    print(f"{os.path.basename(GEOJSON_FILE):<36} {base_kb:>8.1f} {len(gzip.compress(raw)) / 1024:>8.1f} "
+          f"{t * 1000:>11.2f} {1:>6.1f}x")
+
+    for zoom in sorted(ZOOM_TOLERANCES_M):
+        path = topojson_path(GEOJSON_FILE, zoom)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        t = best_of(lambda: decode_topojson(json.loads(raw)))
+        kb = len(raw) / 1024
+        print(f"{os.path.basename(path):<36} {kb:>8.1f} {len(gzip.compress(raw)) / 1024:>8.1f} "
+              f"{t * 1000:>11.2f} {base_kb / kb:>6.1f}x")
+
+    print("\nTopoJSON parse time includes decoding arcs back to polygon rings.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import cost of the pipeline stages (python -X importtime).
+
+For each stage module (01-07), starts a fresh interpreter that imports it
+and sums the cumulative time of its top-level imports from -X importtime,
+listing which heavy packages it pulls in. Then compares paying those
+imports once per script (seven interpreters, as run_pipeline.py does) with
+importing all seven stages in one interpreter (as `ingham all` does).
+
+With --baseline REV the same is measured for scripts/ at an older git
+revision, e.g. the commit before the lazy-import changes.
+
+Run from the repo root: python benchmarks/bench_imports.py [--baseline REV]
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, 'scripts')
+
+STAGE_MODULES = [
+    '01_fetch_block_groups', '02_fetch_census', '03_fetch_assessor', '04_generate_synthetic_mls',
+    '05_engineer_features', '06_train_model', '07_generate_predictions',
+]
+HEAVY = ['pandas', 'geopandas', 'shapely', 'pyproj', 'sklearn', 'scipy', 'requests', 'joblib']
+REPEATS = 3
+
+
+def import_profile(scripts_dir, modules):
+    """(total import ms, set of heavy top-level packages) for one fresh interpreter."""
+    code = 'import importlib\n' + ''.join(f'importlib.import_module({m!r})\n' for m in modules)
+    best = None
+    for _ in range(REPEATS):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                              cwd=scripts_dir, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        total_us = 0
+        packages = set()
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name.startswith('  '):  # top-level import (one space after the bar)
+                total_us += int(cumulative)
+            top = name.strip().split('.')[0]
+            if top in HEAVY:
+                packages.add(top)
+        if best is None or total_us < best[0]:
+            best = (total_us, packages)
+    return best[0] / 1000, best[1]
+
+
+def report(label, scripts_dir):
+    print(f"\n{label}")
+    print(f"   {'stage':<28} {'import (ms)':>12}  heavy packages")
+    separate = 0
+    for module in STAGE_MODULES:
+        ms, packages = import_profile(scripts_dir, [module])
+        separate += ms
+        heavy = ', '.join(p for p in HEAVY if p in packages)
+        print(f"   {module:<28} {ms:>12.0f}  {heavy}")
+    together, _ = import_profile(scripts_dir, STAGE_MODULES)
+    print(f"   {'7 interpreters (sum)':<28} {separate:>12.0f}")
+    print(f"   {'1 interpreter (all stages)':<28} {together:>12.0f}")
+    return separate, together
+
+
+def export_revision(rev, dest):
+    archive = subprocess.run(['git', 'archive', rev, 'scripts'], cwd=REPO_ROOT,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return os.path.join(dest, 'scripts')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time cost of the pipeline stages.")
+    parser.add_argument('--baseline', help="git revision to compare against")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("BENCHMARK: PIPELINE STAGE IMPORT TIME (-X importtime)")
+    print("=" * 72)
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            report(f"Baseline ({args.baseline})", export_revision(args.baseline, tmp))
+    report("Working tree", SCRIPTS_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MLS sales aggregation, full recompute vs incremental state.
+
+Synthesizes N_SALES closed sales over MONTHS monthly export files (CSV)
+inside the Ingham block groups, then:
+
+1. full recompute, what a loader without state does every month: read
+   every file, geopandas sjoin, 12-month window, pandas groupby medians
+2. backfill of all but the last month into a fresh state (scripts/mls_sales.py)
+3. appending the last month: only the new file is read
+4. rerunning with nothing new (every file hash already in the state)
+
+The incremental table must match the full recompute: sale counts exact,
+days on market exact, price and price per sqft medians within the
+histogram bin width, year-over-year change within MAX_YOY_ERROR (exits
+non-zero otherwise).
+
+Run from the repo root: python benchmarks/bench_mls_sales.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+import mls_sales  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from storage import read_table  # noqa: E402
+
+N_SALES = 400_000
+FIRST_MONTH = (2019, 1)
+MONTHS = 60
+SEED = 11
+
+# Relative bin widths of the price and price per sqft histograms
+MAX_PRICE_ERROR = (mls_sales.PRICE_RANGE[1] / mls_sales.PRICE_RANGE[0]) ** (1 / mls_sales.PRICE_BINS) - 1
+MAX_PPSF_ERROR = (mls_sales.PPSF_RANGE[1] / mls_sales.PPSF_RANGE[0]) ** (1 / mls_sales.PPSF_BINS) - 1
+MAX_YOY_ERROR = 2.5 * MAX_PRICE_ERROR
+
+
+def points_in(geom, count, rng):
+    import shapely
+
+    xmin, ymin, xmax, ymax = geom.bounds
+    lon, lat = np.empty(0), np.empty(0)
+    while len(lon) < count:
+        x = rng.uniform(xmin, xmax, 4 * count + 16)
+        y = rng.uniform(ymin, ymax, 4 * count + 16)
+        inside = shapely.contains_xy(geom, x, y)
+        lon, lat = np.concatenate([lon, x[inside]]), np.concatenate([lat, y[inside]])
+    return lon[:count], lat[:count]
+
+
+def synthesize_sales(block_groups, census, rng):
+    """N_SALES sales with close dates spread over MONTHS months; 4%/yr appreciation."""
+    bg = block_groups.merge(census[['GEOID', 'median_home_value', 'total_units']], on='GEOID', how='left')
+    units = bg['total_units'].clip(lower=1).fillna(1).to_numpy(dtype=float)
+    counts = rng.multinomial(N_SALES, units / units.sum())
+    medians = bg['median_home_value'].where(bg['median_home_value'] > 0).fillna(150000).to_numpy()
+
+    frames = []
+    for geom, count, median in zip(bg.geometry, counts, medians):
+        lon, lat = points_in(geom, count, rng)
+        month = rng.integers(0, MONTHS, count)
+        sqft = rng.lognormal(np.log(1500), 0.3, count).round()
+        frames.append(pd.DataFrame({
+            'close_date': pd.Timestamp(*FIRST_MONTH, 1) + pd.to_timedelta(month * 30.44 + rng.uniform(0, 28, count), unit='D'),
+            'close_price': (median * rng.lognormal(0, 0.35, count) * 1.04 ** (month / 12)).round(-2),
+            'days_on_market': rng.gamma(2.0, 20.0, count).round(),
+            'living_area': np.where(rng.random(count) < 0.01, np.nan, sqft),
+            'lon': lon.round(6),
+            'lat': lat.round(6),
+        }))
+    sales = pd.concat(frames, ignore_index=True)
+    sales['close_date'] = sales['close_date'].dt.floor('D')
+    return sales.sample(frac=1, random_state=SEED).reset_index(drop=True)
+
+
+def write_monthly_files(sales, directory):
+    """One CSV per close month, named like an MLS export; returns their paths in month order."""
+    files = []
+    for period, month in sales.groupby(sales['close_date'].dt.to_period('M')):
+        path = os.path.join(directory, f'closed_{period}.csv')
+        month.assign(close_date=month['close_date'].dt.strftime('%Y-%m-%d')).to_csv(path, index=False)
+        files.append(path)
+    return files
+
+
+def full_recompute(files, block_groups):
+    """Everything in memory: every file, sjoin, window, groupby."""
+    import geopandas as gpd
+
+    sales = pd.concat([pd.read_csv(f) for f in files], ignore_index=True)
+    points = gpd.GeoDataFrame(sales, geometry=gpd.points_from_xy(sales['lon'], sales['lat']), crs='EPSG:4269')
+    joined = gpd.sjoin(points, block_groups[['GEOID', 'geometry']], predicate='intersects')
+    joined = joined.sort_values('index_right')
+    joined = joined[~joined.index.duplicated(keep='last')]
+
+    dates = pd.to_datetime(joined['close_date'])
+    month = mls_sales.month_index(dates.dt.year, dates.dt.month)
+    last = month.max()
+    current = joined[month > last - 12]
+    prior = joined[(month <= last - 12) & (month > last - 24)]
+
+    def median(frame, values):
+        grouped = values.groupby(frame['GEOID'])
+        return grouped.median().where(grouped.count() >= mls_sales.MIN_SALES)
+
+    price = median(current, current['close_price'])
+    table = pd.DataFrame({
+        'median_sale_price': price,
+        'price_yoy_change': price / median(prior, prior['close_price']) - 1,
+        'days_on_market': median(current, current['days_on_market']),
+        'sale_count_12mo': current.groupby('GEOID').size(),
+        'price_per_sqft': median(current, current['close_price'] / current['living_area']),
+    })
+    return table.reindex(block_groups['GEOID']).fillna({'sale_count_12mo': 0}).reset_index()
+
+
+def compare(exact, table):
+    merged = exact.merge(table, on='GEOID', suffixes=('', '_state'))
+
+    def worst(col, relative=True):
+        a, b = merged[col], merged[f'{col}_state']
+        if (a.isna() != b.isna()).any():
+            return np.inf
+        diff = (b / a - 1) if relative else (b - a)
+        return float(diff.abs().max())
+
+    errors = {
+        'counts': worst('sale_count_12mo', relative=False),
+        'dom': worst('days_on_market', relative=False),
+        'price': worst('median_sale_price'),
+        'ppsf': worst('price_per_sqft'),
+        'yoy': worst('price_yoy_change', relative=False),
+    }
+    ok = (errors['counts'] == 0 and errors['dom'] <= 0.5 and errors['price'] <= MAX_PRICE_ERROR
+          and errors['ppsf'] <= MAX_PPSF_ERROR and errors['yoy'] <= MAX_YOY_ERROR)
+    return ok, errors
+
+
+def main():
+    import geopandas as gpd
+
+    print("=" * 72)
+    print("BENCHMARK: MLS SALES, FULL RECOMPUTE VS INCREMENTAL STATE")
+    print("=" * 72)
+
+    os.chdir(SCRIPTS_DIR)
+    paths = county_paths()
+    block_groups = gpd.read_file(paths['block_groups'])
+    census = read_table(paths['census'])
+
+    tmp = tempfile.mkdtemp(prefix='mls_sales_')
+    files = write_monthly_files(synthesize_sales(block_groups, census, np.random.default_rng(SEED)), tmp)
+    size_mb = sum(os.path.getsize(f) for f in files) / 1e6
+    print(f"\n{N_SALES:,} sales in {len(files)} monthly files ({size_mb:.1f} MB CSV), "
+          f"{len(block_groups)} block groups\n")
+
+    state_paths = {'block_groups': paths['block_groups'], 'mls_state': os.path.join(tmp, 'state.npz')}
+    timings = []
+
+    start = time.perf_counter()
+    exact = full_recompute(files, block_groups)
+    timings.append(('full recompute (all files)', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    mls_sales.update_sales(state_paths, files[:-1])
+    timings.append((f'backfill {len(files) - 1} months', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    state, ingested = mls_sales.update_sales(state_paths, files)
+    table, as_of = mls_sales.sales_table(state)
+    timings.append((f'append 1 month + table ({len(ingested)} read)', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    state, ingested = mls_sales.update_sales(state_paths, files)
+    timings.append((f'rerun, nothing new ({len(ingested)} read)', time.perf_counter() - start))
+
+    print(f"{'step':<36} {'time (s)':>9}")
+    for label, elapsed in timings:
+        print(f"{label:<36} {elapsed:>9.2f}")
+
+    cells = sum(len(counts) for counts in state['counts'].values())
+    print(f"\nState: {cells:,} non-empty (month, block group, bin) cells, "
+          f"{os.path.getsize(state_paths['mls_state']) / 1e6:.2f} MB on disk")
+
+    ok, errors = compare(exact, table)
+    print(f"\nWindow ending {as_of} vs full recompute:")
+    print(f"  sale counts: max diff {errors['counts']:.0f}; days on market: max diff {errors['dom']:.1f}")
+    print(f"  median price: max error {errors['price']:.3%} (bin {MAX_PRICE_ERROR:.2%}); "
+          f"price/sqft: {errors['ppsf']:.3%} (bin {MAX_PPSF_ERROR:.2%})")
+    print(f"  YoY change: max diff {errors['yoy']:.4f}")
+    print(f"  {'match' if ok else 'MISMATCH'}")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
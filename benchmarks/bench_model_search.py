@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hyperparameter search for the two Random Forest targets.
+
+On the real feature table, searches a 36-candidate grid for both targets:
+- serial:   the old pattern, one cross-validated grid per target in turn,
+            one fit at a time (scripts/model_search.py with jobs=1, one
+            target per call, no halving, no cache)
+- pooled:   both targets in one process pool over shared folds
+- halving:  pooled + successive halving on the number of trees
+- resumed:  halving again over a warm fold-model cache
+and reports wall time and the chosen parameters. Pool speedup is bounded by
+the number of CPUs.
+
+Run from the repo root: python benchmarks/bench_model_search.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from model_search import search_hyperparameters  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from scoring import equity_score, foreclosure_risk  # noqa: E402
+from storage import read_table  # noqa: E402
+
+GRID = {
+    'max_depth': [6, 10, None],
+    'min_samples_split': [2, 5],
+    'min_samples_leaf': [1, 2],
+    'max_features': [1.0, 0.5, 'sqrt'],
+}
+
+
+def load_training_data():
+    import importlib
+    train_module = importlib.import_module('06_train_model')
+    features = read_table(county_paths()['features'])
+    X = features[train_module.FEATURE_COLS]
+    X = X.fillna(X.median())
+    return X, {'equity': equity_score(features), 'foreclosure': foreclosure_risk(features)}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: HYPERPARAMETER SEARCH (BOTH TARGETS)")
+    print("=" * 72)
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    X, targets = load_training_data()
+    print(f"\n{len(X)} block groups × {X.shape[1]} features, {os.cpu_count()} CPUs")
+
+    cache_dir = tempfile.mkdtemp(prefix='model_search_')
+    try:
+        def serial():
+            best = {}
+            for name, y in targets.items():
+                best.update(search_hyperparameters(X, {name: y}, GRID, jobs=1, halving=False)[0])
+            return best
+
+        runs = [
+            ('serial', serial),
+            ('pooled', lambda: search_hyperparameters(X, targets, GRID, halving=False)[0]),
+            ('halving', lambda: search_hyperparameters(X, targets, GRID, cache_dir=cache_dir)[0]),
+            ('resumed', lambda: search_hyperparameters(X, targets, GRID, cache_dir=cache_dir)[0]),
+        ]
+        results = []
+        for label, fn in runs:
+            print(f"\n{label}:")
+            best, elapsed = timed(fn)
+            results.append((label, best, elapsed))
+
+        print(f"\n{'mode':>8} {'time (s)':>9} {'equity CV R²':>13} {'foreclosure CV R²':>18}")
+        for label, best, elapsed in results:
+            print(f"{label:>8} {elapsed:>9.2f} {best['equity']['cv_r2_mean']:>13.3f} "
+                  f"{best['foreclosure']['cv_r2_mean']:>18.3f}")
+        for label, best, _ in results:
+            print(f"\n{label} picks:")
+            for name, b in best.items():
+                print(f"   {name}: {b['params']}")
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
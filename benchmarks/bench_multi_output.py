@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: two single-target forests vs one multi-output forest.
+
+Trains both layouts from script 06 (DEFAULT_PARAMS, same split) on the real
+feature table and reports, per layout: test R² and MAE for each target, fit
+time, predict latency for the whole county and for one block group (the
+prediction service's typical request), and pickled model size. Timing is
+repeated on a 20k-row resample with jittered features to show how fit and
+predict scale past county size.
+
+Run from the repo root: python benchmarks/bench_multi_output.py
+"""
+
+import importlib
+import io
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from pipeline_paths import county_paths  # noqa: E402
+from scoring import equity_score, foreclosure_risk  # noqa: E402
+from storage import read_table  # noqa: E402
+
+train_step = importlib.import_module('06_train_model')
+
+
+def load_data():
+    features = read_table(county_paths()['features'])
+    X = features[train_step.FEATURE_COLS]
+    X = X.fillna(X.median())
+    Y = np.column_stack([equity_score(features), foreclosure_risk(features)])
+    return X, Y
+
+
+def make_model():
+    return RandomForestRegressor(**train_step.DEFAULT_PARAMS, random_state=42, n_jobs=-1)
+
+
+def fit_layouts(X_train, Y_train):
+    """{layout: (models, fit seconds)}"""
+    start = time.perf_counter()
+    separate = [make_model().fit(X_train, Y_train[:, i]) for i in range(2)]
+    t_separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joint = make_model().fit(X_train, Y_train)
+    t_joint = time.perf_counter() - start
+    return {'separate': (separate, t_separate), 'joint': ([joint], t_joint)}
+
+
+def predict(models, X):
+    if len(models) == 1:
+        return models[0].predict(X)
+    return np.column_stack([m.predict(X) for m in models])
+
+
+def predict_latency(models, X, reps):
+    predict(models, X)  # warm up
+    start = time.perf_counter()
+    for _ in range(reps):
+        predict(models, X)
+    return (time.perf_counter() - start) / reps
+
+
+def pickled_size(models):
+    total = 0
+    for model in models:
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        total += buffer.tell()
+    return total
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: TWO FORESTS VS ONE MULTI-OUTPUT FOREST")
+    print("=" * 72)
+
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    X, Y = load_data()
+    X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
+    layouts = fit_layouts(X_train, Y_train)
+
+    print(f"\nIngham: {len(X_train)} train / {len(X_test)} test block groups, "
+          f"params {train_step.DEFAULT_PARAMS}")
+    print(f"\n{'layout':>9} {'equity R²':>10} {'MAE':>6} {'foreclosure R²':>15} {'MAE':>6} "
+          f"{'fit (s)':>8} {'county (ms)':>12} {'1 BG (ms)':>10} {'size (MB)':>10}")
+    for layout, (models, t_fit) in layouts.items():
+        pred = predict(models, X_test)
+        metrics = [(r2_score(Y_test[:, i], pred[:, i]), mean_absolute_error(Y_test[:, i], pred[:, i]))
+                   for i in range(2)]
+        for model in models:
+            model.set_params(n_jobs=1)  # as in the prediction service
+        t_county = predict_latency(models, X, 20)
+        t_one = predict_latency(models, X.iloc[:1], 200)
+        print(f"{layout:>9} {metrics[0][0]:>10.3f} {metrics[0][1]:>6.2f} {metrics[1][0]:>15.3f} "
+              f"{metrics[1][1]:>6.2f} {t_fit:>8.2f} {t_county * 1e3:>12.2f} {t_one * 1e3:>10.2f} "
+              f"{pickled_size(models) / 1e6:>10.2f}")
+
+    # Larger synthetic sample: resample rows and jitter features by 5% of their spread
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, len(X), 20000)
+    X_big = X.iloc[rows].reset_index(drop=True)
+    X_big = X_big + rng.normal(0, 0.05, X_big.shape) * X.std().to_numpy()
+    Y_big = Y[rows]
+    big = fit_layouts(X_big, Y_big)
+    print(f"\n20,000 resampled rows:")
+    print(f"{'layout':>9} {'fit (s)':>8} {'predict all (s)':>16} {'size (MB)':>10}")
+    for layout, (models, t_fit) in big.items():
+        print(f"{layout:>9} {t_fit:>8.2f} {predict_latency(models, X_big, 3):>16.3f} "
+              f"{pickled_size(models) / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parcel-to-block-group aggregation, in-memory join vs streaming.
+
+Synthesizes PARCEL_COUNTS parcels inside the Ingham block groups (values around
+each block group's Census median home value, with some exempt parcels and
+missing years) and writes them as CSV and GeoPackage. Then aggregates them:
+
+1. in memory: read the whole CSV, geopandas sjoin, pandas groupby
+2. streaming from the CSV (scripts/parcels.py): CHUNK_ROWS at a time,
+   STRtree assignment, per-block-group histograms
+3. streaming from the GeoPackage (GDAL paging)
+
+Each mode runs in a fresh process and reports wall time and how far peak
+RSS grew past its high-water mark after imports (0: the run fit in memory
+the imports had already touched). Counts, means and year-built medians must
+match the in-memory result, and histogram medians must be within
+MAX_MEDIAN_ERROR (exits non-zero otherwise).
+
+Run from the repo root: python benchmarks/bench_parcels.py
+"""
+
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+import parcels  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from storage import read_table  # noqa: E402
+
+PARCEL_COUNTS = [120_000, 1_000_000]
+MAX_MEDIAN_ERROR = 0.01
+SEED = 7
+
+
+def synthesize_parcels(block_groups, census, n, rng):
+    """n parcel points inside the block groups, with values and years built."""
+    import shapely
+
+    bg = block_groups.merge(census[['GEOID', 'median_home_value', 'total_units']], on='GEOID', how='left')
+    units = bg['total_units'].clip(lower=1).fillna(1).to_numpy(dtype=float)
+    counts = rng.multinomial(n, units / units.sum())
+    medians = bg['median_home_value'].where(bg['median_home_value'] > 0).fillna(150000).to_numpy()
+
+    frames = []
+    for geom, count, median in zip(bg.geometry, counts, medians):
+        xmin, ymin, xmax, ymax = geom.bounds
+        lon, lat = np.empty(0), np.empty(0)
+        while len(lon) < count:
+            x = rng.uniform(xmin, xmax, 4 * count + 16)
+            y = rng.uniform(ymin, ymax, 4 * count + 16)
+            inside = shapely.contains_xy(geom, x, y)
+            lon, lat = np.concatenate([lon, x[inside]]), np.concatenate([lat, y[inside]])
+        frames.append(pd.DataFrame({
+            'lon': lon[:count].round(6),
+            'lat': lat[:count].round(6),
+            'assessed_value': (median * rng.lognormal(0, 0.4, count)).round(),
+            'year_built': rng.normal(1965, 25, count).clip(1850, 2023).round(),
+        }))
+    frame = pd.concat(frames, ignore_index=True)
+    frame.loc[rng.random(len(frame)) < 0.02, 'assessed_value'] = 0      # exempt
+    frame.loc[rng.random(len(frame)) < 0.05, 'year_built'] = np.nan     # vacant land
+    return frame.sample(frac=1, random_state=SEED).reset_index(drop=True)
+
+
+def in_memory(csv_file, block_groups_file):
+    """Whole file in memory, geopandas sjoin and groupby (exact statistics)."""
+    import geopandas as gpd
+
+    frame = pd.read_csv(csv_file)
+    points = gpd.GeoDataFrame(frame, geometry=gpd.points_from_xy(frame['lon'], frame['lat']), crs='EPSG:4269')
+    bgs = gpd.read_file(block_groups_file)[['GEOID', 'geometry']]
+    joined = gpd.sjoin(points, bgs, predicate='intersects').sort_values('index_right')
+    # A point on a shared boundary joins both block groups; keep the last, as parcels.py does
+    joined = joined[~joined.index.duplicated(keep='last')]
+
+    valued = joined[joined['assessed_value'] > 0].groupby('GEOID')['assessed_value']
+    dated = joined.dropna(subset=['year_built']).groupby('GEOID')['year_built']
+    return pd.DataFrame({
+        'parcel_count_estimated': joined.groupby('GEOID').size(),
+        'assessed_value_median': valued.median(),
+        'assessed_value_mean': valued.mean(),
+        'assessed_value_p25': valued.quantile(0.25),
+        'year_built_median': dated.median(),
+        'year_built_mean': dated.mean(),
+    }).reset_index()
+
+
+def streaming(parcel_file, block_groups_file):
+    return parcels.aggregate_parcels(parcel_file, block_groups_file)[0]
+
+
+def measure(task):
+    """Run in a fresh process: (result, seconds, peak RSS MB above the post-import RSS)."""
+    func, args = task
+    import geopandas  # noqa: F401  (both modes pay for the same imports)
+    import shapely  # noqa: F401
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, elapsed, (peak - baseline) / 1024
+
+
+def compare(exact, streamed):
+    merged = exact.merge(streamed, on='GEOID', suffixes=('', '_stream'))
+    same_rows = len(merged) == len(exact) == len(streamed)
+    counts = (merged['parcel_count_estimated'] == merged['parcel_count_estimated_stream']).all()
+    means = np.allclose(merged['assessed_value_mean'], merged['assessed_value_mean_stream'], rtol=1e-6)
+    years = ((merged['year_built_median'] - merged['year_built_median_stream']).abs() <= 0.5).all()
+    error = max((merged[f'{col}_stream'] / merged[col] - 1).abs().max()
+                for col in ('assessed_value_median', 'assessed_value_p25'))
+    return bool(same_rows and counts and means and years and error <= MAX_MEDIAN_ERROR), error
+
+
+def main():
+    import geopandas as gpd
+
+    print("=" * 72)
+    print("BENCHMARK: PARCEL AGGREGATION (IN-MEMORY JOIN VS STREAMING)")
+    print("=" * 72)
+
+    os.chdir(SCRIPTS_DIR)
+    paths = county_paths()
+    block_groups = gpd.read_file(paths['block_groups'])
+    census = read_table(paths['census'])
+
+    print(f"\n{len(block_groups)} block groups; streaming reads {parcels.CHUNK_ROWS:,} parcels per chunk")
+    ok = True
+    for n_parcels in PARCEL_COUNTS:
+        ok &= run(n_parcels, block_groups, census, paths['block_groups'])
+    if not ok:
+        sys.exit(1)
+
+
+def run(n_parcels, block_groups, census, block_groups_file):
+    import geopandas as gpd
+
+    tmp = tempfile.mkdtemp(prefix='parcels_')
+    csv_file = os.path.join(tmp, 'parcels.csv')
+    gpkg_file = os.path.join(tmp, 'parcels.gpkg')
+    frame = synthesize_parcels(block_groups, census, n_parcels, np.random.default_rng(SEED))
+    frame.to_csv(csv_file, index=False)
+    gpd.GeoDataFrame(frame[['assessed_value', 'year_built']],
+                     geometry=gpd.points_from_xy(frame['lon'], frame['lat']), crs='EPSG:4269',
+                     ).to_file(gpkg_file, driver='GPKG')
+    del frame
+    print(f"\n{n_parcels:,} parcels (CSV {os.path.getsize(csv_file) / 1e6:.1f} MB)")
+
+    tasks = {
+        'in-memory sjoin + groupby': (in_memory, (csv_file, block_groups_file)),
+        'streaming, CSV': (streaming, (csv_file, block_groups_file)),
+        'streaming, GeoPackage': (streaming, (gpkg_file, block_groups_file)),
+    }
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for label, task in tasks.items():
+        with context.Pool(1) as pool:
+            results[label] = pool.apply(measure, (task,))
+
+    exact = results['in-memory sjoin + groupby'][0]
+    print(f"{'mode':<28} {'time (s)':>9} {'peak MB':>8} {'median err':>11}   match")
+    ok = True
+    for label, (table, elapsed, peak_mb) in results.items():
+        if label == 'in-memory sjoin + groupby':
+            print(f"{label:<28} {elapsed:>9.2f} {peak_mb:>8.0f} {'-':>11}   -")
+            continue
+        same, error = compare(exact, table)
+        ok &= same
+        print(f"{label:<28} {elapsed:>9.2f} {peak_mb:>8.0f} {error:>10.3%}   {'yes' if same else 'NO'}")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    return ok
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prediction service latency and throughput under local load.
+
+Starts scripts/prediction_service.py, then runs concurrent keep-alive
+clients against it:
+- GET  /predictions/<GEOID>   (served from warm memory)
+- POST /score                 (one what-if scenario for 5 block groups)
+
+/score is measured with micro-batching on and off (--max-batch 1) to show
+what batching concurrent requests into one predict() call buys.
+
+Run from the repo root: python benchmarks/bench_prediction_service.py
+"""
+
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+PORT = 8799
+CLIENTS = 16
+DURATION_S = 5.0
+
+
+def start_service(extra_args):
+    proc = subprocess.Popen(
+        [sys.executable, 'prediction_service.py', '--port', str(PORT)] + extra_args,
+        cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("prediction service did not start")
+
+
+def run_load(make_request, geoids):
+    """CLIENTS threads issue requests back to back for DURATION_S seconds."""
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + DURATION_S
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', PORT)
+        local = []
+        while time.perf_counter() < stop_at:
+            method, path, body = make_request(rng, geoids)
+            start = time.perf_counter()
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            assert response.status == 200, response.status
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(CLIENTS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return len(ms) / elapsed, np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def get_one(rng, geoids):
+    return 'GET', f'/predictions/{rng.choice(geoids)}', None
+
+
+def score_one(rng, geoids):
+    scenario = {
+        'geoids': rng.sample(geoids, 5),
+        'scale': {'median_income': 1 + rng.uniform(-0.2, 0.2)},
+    }
+    return 'POST', '/score', json.dumps(scenario)
+
+
+def main():
+    print("=" * 64)
+    print(f"BENCHMARK: PREDICTION SERVICE ({CLIENTS} clients, {DURATION_S:.0f}s per run)")
+    print("=" * 64)
+    print(f"{'workload':<30} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+
+    runs = [
+        ('GET /predictions/<GEOID>', [], get_one),
+        ('POST /score (batched)', [], score_one),
+        ('POST /score (no batching)', ['--max-batch', '1', '--batch-wait-ms', '0'], score_one),
+    ]
+    for label, extra_args, make_request in runs:
+        proc = start_service(extra_args)
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT)
+            conn.request('GET', '/predictions')
+            geoids = [r['geoid'] for r in json.loads(conn.getresponse().read())]
+            rps, p50, p99 = run_load(make_request, geoids)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{label:<30} {rps:>9,.0f} {p50:>9.2f} {p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
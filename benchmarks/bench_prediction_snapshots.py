@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prediction snapshots, full payload vs diff per run.
+
+Tiles the Ingham predictions to N_BLOCK_GROUPS records (about statewide)
+and publishes RUNS successive prediction runs with
+scripts/prediction_snapshots.py. Each run is a delta update (script 05
+--changed): MOVED_SHARE of the block groups get new data and their scores
+move by several points, NUDGED_SHARE (neighbors, through the spatial lags)
+move by a few tenths, the rest keep their scores. Reports what a returning
+client downloads per run, the full snapshot vs the diff, raw and gzipped,
+and the publish time.
+
+Checks (exits non-zero on failure):
+- applying each kept diff to its base reproduces the next snapshot's bytes
+- every published score is within the threshold of the latest run
+- eviction leaves exactly the kept snapshots and their diffs on disk
+
+Run from the repo root: python benchmarks/bench_prediction_snapshots.py
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import prediction_snapshots as snapshots  # noqa: E402
+from predictions_payload import encode_predictions  # noqa: E402
+
+PREDICTIONS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'block_groups', 'bg_predictions.json')
+N_BLOCK_GROUPS = 8400
+RUNS = 16
+KEEP = 8
+THRESHOLD = 0.5
+MOVED_SHARE = 0.03
+NUDGED_SHARE = 0.10
+NUDGE = 0.2
+SEED = 3
+
+SCORES = ['equity_score', 'gentrification_risk', 'foreclosure_risk']
+BANDS = {'equity_low': 'equity_score', 'equity_high': 'equity_score',
+         'foreclosure_low': 'foreclosure_risk', 'foreclosure_high': 'foreclosure_risk'}
+
+
+def tile_records(records, n):
+    """n records cycled from records, with distinct GEOIDs."""
+    out = []
+    for i in range(n):
+        record = dict(records[i % len(records)])
+        record['geoid'] = f"{record['geoid']}{i // len(records):03d}"
+        out.append(record)
+    return out
+
+
+def next_run(records, rng):
+    """The next prediction run: large moves for a few block groups, small ones for some more."""
+    out = []
+    for old in records:
+        draw = rng.random()
+        if draw < MOVED_SHARE:
+            scale = 5.0
+        elif draw < MOVED_SHARE + NUDGED_SHARE:
+            scale = NUDGE
+        else:
+            out.append(old)
+            continue
+        record = dict(old)
+        for field in SCORES:
+            record[field] = round(float(np.clip(old[field] + rng.normal(0, scale), 0, 100)), 1)
+        # Bands follow their score
+        for band, score in BANDS.items():
+            if band in old:
+                record[band] = round(float(np.clip(record[score] + old[band] - old[score], 0, 100)), 1)
+        out.append(record)
+    return out
+
+
+def gzip_size(data):
+    return len(gzip.compress(data, compresslevel=6))
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: PREDICTION SNAPSHOTS, FULL PAYLOAD VS DIFF")
+    print("=" * 72)
+
+    with open(PREDICTIONS_FILE) as f:
+        records = tile_records(json.load(f), N_BLOCK_GROUPS)
+    rng = np.random.default_rng(SEED)
+    tmp = tempfile.mkdtemp(prefix='snapshots_')
+    paths = {'snapshots': tmp}
+
+    print(f"\n{N_BLOCK_GROUPS:,} block groups, {RUNS} runs, threshold {THRESHOLD}, keeping {KEEP}\n")
+    print(f"{'run':>4} {'upserts':>8} {'full KB':>8} {'gz':>7} {'diff KB':>8} {'gz':>7} {'publish (s)':>12}")
+
+    totals = {'full': 0, 'full_gz': 0, 'diff': 0, 'diff_gz': 0}
+    for run in range(RUNS):
+        if run:
+            records = next_run(records, rng)
+        start = time.perf_counter()
+        entry = snapshots.publish_snapshot(paths, records, threshold=THRESHOLD, keep=KEEP)
+        elapsed = time.perf_counter() - start
+
+        with open(os.path.join(tmp, entry['file']), 'rb') as f:
+            full = f.read()
+        row = f"{run:>4} "
+        if entry['diff']:
+            with open(os.path.join(tmp, entry['diff']['file']), 'rb') as f:
+                diff = f.read()
+            totals['full'] += len(full)
+            totals['full_gz'] += gzip_size(full)
+            totals['diff'] += len(diff)
+            totals['diff_gz'] += gzip_size(diff)
+            row += (f"{entry['diff']['upserts']:>8} {len(full) / 1024:>8.1f} {gzip_size(full) / 1024:>7.1f} "
+                    f"{len(diff) / 1024:>8.1f} {gzip_size(diff) / 1024:>7.1f}")
+        else:
+            row += f"{'-':>8} {len(full) / 1024:>8.1f} {gzip_size(full) / 1024:>7.1f} {'-':>8} {'-':>7}"
+        print(f"{row} {elapsed:>12.3f}")
+
+    print(f"\nPer update, gzipped: full {totals['full_gz'] / (RUNS - 1) / 1024:.1f} KB, "
+          f"diff {totals['diff_gz'] / (RUNS - 1) / 1024:.1f} KB "
+          f"({totals['full_gz'] / totals['diff_gz']:.1f}x less)")
+
+    manifest = snapshots.load_manifest(tmp)
+    ok = True
+
+    # The kept chain reproduces every snapshot from the oldest one
+    kept = manifest['snapshots']
+    chained = snapshots.read_records(tmp, kept[0]['file'])
+    for entry in kept[1:]:
+        upserts = snapshots.read_records(tmp, entry['diff']['file'])
+        chained = snapshots.apply_diff(chained, upserts, entry['diff']['remove'])
+        with open(os.path.join(tmp, entry['file']), 'rb') as f:
+            ok &= encode_predictions(chained) == f.read()
+    print(f"Diff chain over {len(kept)} kept snapshots reproduces them: {'yes' if ok else 'NO'}")
+
+    latest = {r['geoid']: r for r in snapshots.read_records(tmp, kept[-1]['file'])}
+    error = max(abs(latest[r['geoid']][field] - r[field]) for r in records
+                for field in snapshots.SCORE_FIELDS if field in r)
+    within = error <= THRESHOLD + 1e-9
+    print(f"Largest published score error: {error:.1f} (threshold {THRESHOLD}): {'ok' if within else 'NO'}")
+
+    on_disk = {f'objects/{name}' for name in os.listdir(os.path.join(tmp, 'objects'))}
+    evicted = len(kept) == KEEP and on_disk == snapshots.manifest_files(manifest)
+    print(f"Objects on disk after eviction: {len(on_disk)} "
+          f"({len(kept)} snapshots + {len(kept) - 1} diffs): {'ok' if evicted else 'NO'}")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not (ok and within and evicted):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: predictions payload size and parse time.
+
+Compares bg_predictions.json as written today (indent=2), the compact JSON
+mode, and the struct-of-arrays binary payload (scripts/predictions_payload.py)
+for Ingham County and for a synthetic statewide-sized set of block groups.
+Sizes are reported raw and gzipped (what the browser actually downloads);
+parse time is json.loads() vs decoding the binary columns. Every binary
+payload is checked to decode back to exactly the JSON records.
+
+Run from the repo root: python benchmarks/bench_predictions_payload.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from predictions_payload import decode_predictions, decode_records, encode_predictions  # noqa: E402
+
+PREDICTIONS = os.path.join(os.path.dirname(__file__), '..', 'data', 'block_groups', 'bg_predictions.json')
+
+
+def make_records(n, seed=0):
+    """Synthetic records in the bg_predictions.json schema."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'geoid': f'26{i // 4000:03d}{i % 4000 // 4:06d}{i % 4 + 1}',
+            'name': f'Block Group {i % 4 + 1}; Census Tract {i // 4 % 9000 / 100:g}; County {i // 4000}; Michigan',
+            'equity_score': round(float(rng.uniform(20, 95)), 1),
+            'gentrification_risk': round(float(rng.uniform(0, 100)), 1),
+            'foreclosure_risk': round(float(rng.uniform(0, 60)), 1),
+            'median_income': int(rng.integers(15000, 200000)),
+            'median_price': int(rng.integers(40000, 900000)),
+            'population': int(rng.integers(300, 4000)),
+            'days_on_market': int(rng.integers(7, 180)),
+            'price_yoy_change': round(float(rng.uniform(-0.05, 0.15)), 4),
+        }
+        for i in range(n)
+    ]
+
+
+def time_call(fn, *args, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: PREDICTIONS PAYLOAD")
+    print("=" * 72)
+
+    with open(PREDICTIONS) as f:
+        datasets = [('Ingham', json.load(f)), ('statewide (synthetic)', make_records(8000))]
+
+    for label, records in datasets:
+        payloads = {
+            'JSON indent=2': json.dumps(records, indent=2).encode(),
+            'JSON compact': json.dumps(records, separators=(',', ':')).encode(),
+            'binary': encode_predictions(records),
+        }
+        if decode_records(payloads['binary']) != records:
+            sys.exit(f"❌ binary payload does not round-trip for {label}")
+
+        print(f"\n{label}: {len(records):,} block groups (binary round-trip ✓)")
+        print(f"   {'format':<16} {'raw KB':>9} {'gzip KB':>9} {'parse (ms)':>11}")
+        for name, payload in payloads.items():
+            if name == 'binary':
+                parse = time_call(decode_predictions, payload)
+            else:
+                parse = time_call(json.loads, payload)
+            gz = len(gzip.compress(payload, 6))
+            print(f"   {name:<16} {len(payload) / 1024:>9.1f} {gz / 1024:>9.1f} {parse * 1000:>11.2f}")
+        print(f"   {'binary -> dicts':<16} {'':>9} {'':>9} "
+              f"{time_call(decode_records, payloads['binary']) * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
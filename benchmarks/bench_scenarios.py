@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch what-if scoring throughput.
+
+Scores 200 scenarios that each perturb median_income for 50 block groups,
+once through a single stacked batch (score_scenarios) and once scenario by
+scenario, and reports scored rows per second for both.
+
+Run from the repo root: python benchmarks/bench_scenarios.py
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+from scenarios import load_engine, score_scenarios  # noqa: E402
+
+N_SCENARIOS = 200
+GEOIDS_PER_SCENARIO = 50
+
+
+def main():
+    os.chdir(SCRIPTS_DIR)
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+    print("=" * 60)
+    print("BENCHMARK: BATCH WHAT-IF SCORING")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    engine = load_engine()
+    print(f"Engine load (models + features): {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(0)
+    geoids = engine['base'].index.to_numpy()
+    scenarios = [
+        {
+            'name': f'income {f:+.1%}',
+            'geoids': list(rng.choice(geoids, GEOIDS_PER_SCENARIO, replace=False)),
+            'scale': {'median_income': 1 + f},
+        }
+        for f in np.linspace(-0.2, 0.2, N_SCENARIOS)
+    ]
+    n_rows = N_SCENARIOS * GEOIDS_PER_SCENARIO
+
+    start = time.perf_counter()
+    score_scenarios(engine, scenarios)
+    t_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for s in scenarios:
+        score_scenarios(engine, [s])
+    t_loop = time.perf_counter() - start
+
+    print(f"\n{N_SCENARIOS} scenarios x {GEOIDS_PER_SCENARIO} block groups = {n_rows:,} rows")
+    print(f"{'mode':<22} {'time (s)':>9} {'rows/s':>10}")
+    print(f"{'one batch':<22} {t_batch:>9.3f} {n_rows / t_batch:>10,.0f}")
+    print(f"{'one call per scenario':<22} {t_loop:>9.3f} {n_rows / t_loop:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rule-based scoring formulas, DataFrame.apply(axis=1) vs NumPy.
+
+Compares the original per-row target/gentrification functions from scripts
+06 and 07 against the column-wise versions in scripts/scoring.py at 10k and
+1M synthetic rows. Before timing, it checks that both paths agree exactly
+(NaNs included) on the real feature table and on synthetic rows with
+missing values and out-of-range inputs; it exits non-zero if they don't.
+
+Run from the repo root: python benchmarks/bench_scoring.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import scoring  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from storage import read_table  # noqa: E402
+
+
+# Original per-row functions from scripts 06 and 07, kept here as the reference
+
+def legacy_equity_score(row):
+    affordability = 100 - min(row['cost_burden_pct'], 100)
+    stability = 100 - (row['foreclosure_rate'] * 100)
+    opportunity = min((row['median_income'] / 55000) * 50, 100)
+    quality = (100 - row['property_age_estimate']) * 0.5 + row['market_liquidity'] * 0.5
+    equity_score = (
+        0.40 * affordability +
+        0.30 * stability +
+        0.20 * opportunity +
+        0.10 * quality
+    )
+    return np.clip(equity_score, 0, 100)
+
+
+def legacy_foreclosure_risk(row):
+    cost_burden_risk = min(row['cost_burden_pct'], 100)
+    price_volatility = abs(row['price_yoy_change']) * 500
+    price_volatility = min(price_volatility, 100)
+    income_risk = max(0, 100 - (row['median_income'] / 75000 * 100))
+    foreclosure_risk = (
+        0.50 * cost_burden_risk +
+        0.30 * price_volatility +
+        0.20 * income_risk
+    )
+    return np.clip(foreclosure_risk, 0, 100)
+
+
+def legacy_gentrification_risk(row):
+    price_factor = np.clip(row['price_yoy_change'] * 1000, 0, 50)
+    income_factor = max(0, (1 - row['median_income'] / 75000) * 30)
+    displacement_risk = row['pct_minority'] * 20
+    gent_risk = price_factor + income_factor + displacement_risk
+    return np.clip(gent_risk, 0, 100)
+
+
+FORMULAS = [
+    ('equity_score', legacy_equity_score, scoring.equity_score),
+    ('foreclosure_risk', legacy_foreclosure_risk, scoring.foreclosure_risk),
+    ('gentrification_risk', legacy_gentrification_risk, scoring.gentrification_risk),
+]
+
+
+def make_rows(n, seed=0, missing=0.0):
+    """Random frame with every column the formulas read (wider than real ranges)."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'median_income': rng.normal(55000, 30000, n).clip(5000, 300000),
+        'cost_burden_pct': rng.uniform(-10, 130, n),
+        'foreclosure_rate': rng.uniform(0, 1.2, n),
+        'property_age_estimate': rng.integers(0, 130, n).astype(float),
+        'market_liquidity': rng.uniform(0, 100, n),
+        'price_yoy_change': rng.normal(0.05, 0.12, n),
+        'pct_minority': rng.uniform(0, 1, n),
+    })
+    if missing:
+        frame = frame.mask(rng.random(frame.shape) < missing)
+    return frame
+
+
+def check_parity(frame, label):
+    ok = True
+    for name, legacy, vectorized in FORMULAS:
+        old = frame.apply(legacy, axis=1).to_numpy(dtype=float)
+        new = vectorized(frame).to_numpy()
+        same = np.array_equal(old, new, equal_nan=True)
+        ok &= same
+        print(f"   {'✓' if same else '✗'} {name:<20} {label}")
+    return ok
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("=" * 64)
+    print("BENCHMARK: SCORING FORMULAS")
+    print("=" * 64)
+
+    print("\nParity (row functions vs scoring.py, exact):")
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    ok = check_parity(read_table(county_paths()['features']), 'bg_features')
+    ok &= check_parity(make_rows(5000, seed=1, missing=0.05), 'synthetic, 5% NaN')
+    if not ok:
+        sys.exit("\n❌ scoring.py disagrees with the row functions")
+
+    print(f"\n{'rows':>10} {'formula':<20} {'apply (s)':>10} {'numpy (s)':>10} {'speedup':>9}")
+    for n in [10_000, 1_000_000]:
+        frame = make_rows(n)
+        for name, legacy, vectorized in FORMULAS:
+            t_old = time_call(lambda: frame.apply(legacy, axis=1), repeat=1 if n > 10_000 else 3)
+            t_new = time_call(lambda: vectorized(frame))
+            print(f"{n:>10,} {name:<20} {t_old:>10.3f} {t_new:>10.4f} {t_old / t_new:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: spatial lag features, per-row neighbor loop vs sparse multiply.
+
+Computes neighbor averages of the SPATIAL_LAG_INPUTS columns on synthetic
+Voronoi tessellations (see bench_adjacency.py) up to statewide size, once
+with a Python loop over each block group's neighbors and once with
+add_spatial_lags() (two sparse matrix products), and checks they agree.
+
+Run from the repo root: python benchmarks/bench_spatial_lags.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from adjacency import build_adjacency, spatial_weights  # noqa: E402
+from bench_adjacency import make_tessellation  # noqa: E402
+from derived_features import SPATIAL_LAG_COLUMNS, SPATIAL_LAG_INPUTS, add_spatial_lags  # noqa: E402
+
+
+def loop_lags(features, graph):
+    """Reference: average each column over the neighbor list, row by row."""
+    X = features[SPATIAL_LAG_INPUTS].to_numpy(dtype=float)
+    indptr, indices = graph['indptr'], graph['indices']
+    out = X.copy()
+    for i in range(len(X)):
+        nbrs = indices[indptr[i]:indptr[i + 1]]
+        for k in range(X.shape[1]):
+            values = [X[j, k] for j in nbrs if np.isfinite(X[j, k])]
+            if values:
+                out[i, k] = sum(values) / len(values)
+    return out
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: SPATIAL LAG FEATURES")
+    print("=" * 72)
+    print(f"{'block groups':>13} {'edges':>8} {'loop (s)':>9} {'sparse (s)':>11} {'speedup':>8} {'max diff':>10}")
+
+    # Warm-up: first call pays the scipy.sparse import
+    warm = make_tessellation(10)
+    spatial_weights(build_adjacency(warm), warm['GEOID'])
+
+    rng = np.random.default_rng(0)
+    for n in [1000, 8400, 25000]:
+        gdf = make_tessellation(n)
+        graph = build_adjacency(gdf)
+        features = pd.DataFrame(rng.random((n, len(SPATIAL_LAG_INPUTS))), columns=SPATIAL_LAG_INPUTS)
+        features['GEOID'] = gdf['GEOID']
+        features.loc[rng.random(n) < 0.02, 'median_income'] = np.nan
+
+        start = time.perf_counter()
+        expected = loop_lags(features, graph)
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        weights = spatial_weights(graph, features['GEOID'])
+        add_spatial_lags(features, weights)
+        t_sparse = time.perf_counter() - start
+
+        diff = np.nanmax(np.abs(features[SPATIAL_LAG_COLUMNS].to_numpy() - expected))
+        print(f"{n:>13,} {len(graph['indices']) // 2:>8,} {t_loop:>9.3f} {t_sparse:>11.4f} "
+              f"{t_loop / t_sparse:>7.0f}x {diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
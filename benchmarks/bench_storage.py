@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CSV vs Parquet for the data/processed intermediates.
+
+Resamples the committed bg_features.csv up to county and statewide sizes and
+measures write time, full read time, projected read time (the columns step 06
+loads) and file size for each storage format.
+
+Run from the repo root: python benchmarks/bench_storage.py
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from storage import read_table, write_table  # noqa: E402
+
+train = importlib.import_module('06_train_model')
+
+FEATURES_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'bg_features.csv')
+SIZES = [('county', 230), ('statewide', 8_400), ('multi-state', 100_000)]
+
+
+def make_features(n, base, seed=0):
+    """Resample the real feature table to n rows with unique GEOIDs."""
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    df['GEOID'] = [f'26{i:010d}' for i in range(n)]
+    return df
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    base = read_table(FEATURES_FILE)
+    columns = train.FEATURE_COLS + train.TARGET_INPUT_COLS
+
+    print("=" * 72)
+    print("BENCHMARK: CSV VS PARQUET INTERMEDIATES (bg_features)")
+    print("=" * 72)
+    print(f"{'scale':<12} {'rows':>8} {'format':<8} {'write (ms)':>11} {'read (ms)':>10} "
+          f"{'proj. (ms)':>11} {'size (KB)':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, n in SIZES:
+            df = make_features(n, base)
+            for ext in ('csv', 'parquet'):
+                path = os.path.join(tmp, f'bg_features_{n}.{ext}')
+                t_write = best_of(lambda: write_table(df, path, 'features'))
+                t_read = best_of(lambda: read_table(path))
+                t_proj = best_of(lambda: read_table(path, columns=columns))
+                size_kb = os.path.getsize(path) / 1024
+                print(f"{label:<12} {n:>8,} {ext:<8} {t_write * 1000:>11.1f} {t_read * 1000:>10.1f} "
+                      f"{t_proj * 1000:>11.1f} {size_kb:>10,.0f}")
+
+    print(f"\nProjected read = the {len(columns)} columns step 06 loads.")
+
+
+if __name__ == "__main__":
+    main()
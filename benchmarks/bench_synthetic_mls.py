@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: synthetic MLS generation, row loop vs vectorized.
+
+Compares the original iterrows() implementation of script 04 against
+synthesize_mls() on random block-group frames of county and statewide size,
+and checks both paths produce identical output for the same seed.
+
+Run from the repo root: python benchmarks/bench_synthetic_mls.py
+"""
+
+import importlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+mls = importlib.import_module('04_generate_synthetic_mls')
+
+
+def legacy_synthesize_mls(bg_data, rng):
+    """Original per-row loop from script 04, kept here as the reference."""
+    sales_data = []
+    for _, row in bg_data.iterrows():
+        base_price = row['median_home_value'] if pd.notna(row['median_home_value']) else 150000
+        distance_factor = 1 - (row['dist_to_downtown'] / bg_data['dist_to_downtown'].max())
+        income_factor = (row['median_income'] / bg_data['median_income'].max()) if pd.notna(row['median_income']) else 0.5
+
+        yoy_change = 0.03
+        yoy_change += distance_factor * 0.04
+        yoy_change += income_factor * 0.02
+        yoy_change += rng.normal(0, 0.02)
+        yoy_change = np.clip(yoy_change, -0.05, 0.15)
+
+        dom = 45 + (1 - distance_factor) * 30
+        dom = dom + (1 - income_factor) * 20
+        dom = dom + rng.normal(0, 10)
+        dom = int(np.clip(dom, 7, 180))
+
+        turnover_rate = 0.05
+        if yoy_change > 0.08:
+            turnover_rate += 0.02
+        sale_count = int(row['total_units'] * turnover_rate) if pd.notna(row['total_units']) else 5
+        sale_count = max(2, sale_count)
+
+        median_sale_price = base_price * (1 + yoy_change)
+        price_per_sqft = np.clip(80 + (median_sale_price / 300000) * 100, 60, 200)
+
+        sales_data.append({
+            'GEOID': row['GEOID'],
+            'median_sale_price': int(median_sale_price),
+            'price_yoy_change': round(yoy_change, 4),
+            'days_on_market': dom,
+            'sale_count_12mo': sale_count,
+            'price_per_sqft': int(price_per_sqft),
+            'dist_to_downtown': round(row['dist_to_downtown'], 4)
+        })
+    return pd.DataFrame(sales_data)
+
+
+def make_block_groups(n, seed=0):
+    """Random block-group frame with the columns synthesize_mls() reads."""
+    rng = np.random.default_rng(seed)
+    income = rng.normal(55000, 20000, n).clip(10000, 250000)
+    income[rng.random(n) < 0.02] = np.nan
+    home_value = rng.normal(180000, 80000, n).clip(30000, 900000)
+    home_value[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        'GEOID': [f'26{i:010d}' for i in range(n)],
+        'median_income': income,
+        'median_home_value': home_value,
+        'total_units': rng.integers(50, 1500, n).astype(float),
+        'dist_to_downtown': rng.random(n) * 2.5,
+    })
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("=" * 60)
+    print("BENCHMARK: SYNTHETIC MLS GENERATION")
+    print("=" * 60)
+    print(f"{'block groups':>14} {'loop (s)':>10} {'vector (s)':>11} {'speedup':>9} {'identical':>10}")
+
+    for n in [200, 2000, 8000]:
+        bg = make_block_groups(n)
+
+        old = legacy_synthesize_mls(bg, np.random.RandomState(mls.SEED))
+        new = mls.synthesize_mls(bg, np.random.RandomState(mls.SEED))
+        identical = old.equals(new)
+
+        repeat = 1 if n > 2000 else 3
+        t_old = time_call(lambda: legacy_synthesize_mls(bg, np.random.RandomState(mls.SEED)), repeat=repeat)
+        t_new = time_call(lambda: mls.synthesize_mls(bg, np.random.RandomState(mls.SEED)))
+        print(f"{n:>14,} {t_old:>10.3f} {t_new:>11.4f} {t_old / t_new:>8.0f}x {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Monte Carlo prediction bands, per-draw loop vs stacked passes.
+
+For N re-draws of the synthetic MLS inputs, the loop does what N reruns of
+04 -> 05 -> 07 would do in-process: synthesize one draw, recompute derived
+features and spatial lags, predict every tree, then pools all draws for the
+quantiles. The stacked path (scripts/uncertainty.py) synthesizes all draws
+at once, recomputes features for the stacked rows in one pass, lags every
+draw with one sparse multiply and predicts every tree once per model.
+
+Both consume the same random stream, so their bands must match exactly
+(exits non-zero otherwise).
+
+Run from the repo root: python benchmarks/bench_uncertainty.py
+"""
+
+import importlib
+import os
+import sys
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS_DIR)
+from adjacency import load_adjacency, spatial_weights  # noqa: E402
+from derived_features import add_derived_features, add_spatial_lags  # noqa: E402
+from pipeline_paths import county_paths  # noqa: E402
+from storage import read_table  # noqa: E402
+from trained_models import feature_columns, load_models, predict_target_trees  # noqa: E402
+from uncertainty import (  # noqa: E402
+    DRAW_SEED, INTERVAL_QUANTILES, MLS_DRAW_COLUMNS, mls_draws, prediction_intervals, stack_draws,
+)
+
+DRAW_COUNTS = [10, 50, 200]
+
+
+def loop_bands(paths, models, feature_cols, features, weights, n_draws):
+    synthetic_mls = importlib.import_module('04_generate_synthetic_mls')
+    census = read_table(paths['census'])
+    bg_data = synthetic_mls.downtown_distances(paths).merge(census, on='GEOID')
+    rng = np.random.default_rng(DRAW_SEED)
+    position = bg_data.reset_index().set_index('GEOID')['index']
+
+    equity, foreclosure = [], []
+    for _ in range(n_draws):
+        sales = synthetic_mls.synthesize_mls(bg_data, rng)
+        frame = features.copy()
+        rows = position.reindex(frame['GEOID']).to_numpy()
+        for col in MLS_DRAW_COLUMNS:
+            frame[col] = sales[col].to_numpy(dtype=float)[rows]
+        add_derived_features(frame)
+        add_spatial_lags(frame, weights)
+        X = frame[feature_cols]
+        e, f = predict_target_trees(models, X.fillna(X.median()))
+        equity.append(e)
+        foreclosure.append(f)
+
+    return {name: np.quantile(np.concatenate(trees, axis=1), INTERVAL_QUANTILES, axis=1).T
+            for name, trees in (('equity', equity), ('foreclosure', foreclosure))}
+
+
+def stacked_bands(paths, models, feature_cols, features, weights, n_draws):
+    geoids, draws = mls_draws(paths, n_draws)
+    stacked = stack_draws(features, geoids, draws, weights)
+    X = stacked[feature_cols]
+    return prediction_intervals(models, X.fillna(X.median()), len(features))
+
+
+def main():
+    print("=" * 72)
+    print("BENCHMARK: MONTE CARLO PREDICTION BANDS")
+    print("=" * 72)
+
+    os.chdir(SCRIPTS_DIR)
+    paths = county_paths()
+    models = load_models(paths)
+    feature_cols = feature_columns(models)
+    features = read_table(paths['features'])
+    weights = spatial_weights(load_adjacency(paths['adjacency']), features['GEOID'])
+    n_trees = predict_target_trees(models, features[feature_cols].iloc[:1])[0].shape[1]
+
+    start = time.perf_counter()
+    X = features[feature_cols]
+    trees_only = prediction_intervals(models, X.fillna(X.median()), len(features))
+    elapsed = time.perf_counter() - start
+    width = np.median(np.diff(trees_only['equity']))
+    print(f"\n{len(features)} block groups, {n_trees} trees per model")
+    print(f"Per-tree bands only: {elapsed * 1000:.0f} ms (median equity width {width:.1f})\n")
+
+    print(f"{'draws':>6} {'loop (s)':>9} {'stacked (s)':>12} {'speedup':>8} {'equity width':>13} {'identical':>10}")
+    ok = True
+    for n_draws in DRAW_COUNTS:
+        start = time.perf_counter()
+        looped = loop_bands(paths, models, feature_cols, features, weights, n_draws)
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stacked = stacked_bands(paths, models, feature_cols, features, weights, n_draws)
+        t_stacked = time.perf_counter() - start
+
+        same = all(np.array_equal(looped[k], stacked[k]) for k in looped)
+        ok &= same
+        print(f"{n_draws:>6} {t_loop:>9.2f} {t_stacked:>12.2f} {t_loop / t_stacked:>7.1f}x "
+              f"{np.median(np.diff(stacked['equity'])):>13.1f} {str(same):>10}")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
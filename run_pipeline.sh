@@ -2,8 +2,9 @@
 #
 # Ingham County Housing Equity MVP - Data Pipeline Runner
 #
-# Runs all 7 Python scripts in sequence to generate predictions.
-# Run with: bash run_pipeline.sh
+# Runs the 7 Python scripts through scripts/run_pipeline.py, which only
+# reruns steps whose inputs changed since the last run.
+# Run with: bash run_pipeline.sh [--force all]
 #
 
 set -e  # Exit on error
@@ -32,11 +33,18 @@ fi
 echo "🔧 Activating virtual environment..."
 source venv/bin/activate
 
-# Install dependencies
-echo "📥 Installing dependencies..."
-pip install -q --upgrade pip
-pip install -q -r requirements.txt
-echo "✓ Dependencies installed"
+# Install dependencies (only when requirements.txt has changed)
+REQ_STAMP="venv/.requirements.sha256"
+REQ_HASH=$(python3 -c "import hashlib; print(hashlib.sha256(open('requirements.txt', 'rb').read()).hexdigest())")
+if [ ! -f "$REQ_STAMP" ] || [ "$(cat "$REQ_STAMP")" != "$REQ_HASH" ]; then
+    echo "📥 Installing dependencies..."
+    pip install -q --upgrade pip
+    pip install -q -r requirements.txt
+    echo "$REQ_HASH" > "$REQ_STAMP"
+    echo "✓ Dependencies installed"
+else
+    echo "✓ Dependencies up to date"
+fi
 
 echo ""
 echo "========================================"
@@ -44,39 +52,11 @@ echo "RUNNING DATA PIPELINE (7 SCRIPTS)"
 echo "========================================"
 echo ""
 
-# Run each script
-cd scripts
-
-echo "▶️  Script 1/7: Fetching block group boundaries..."
-python3 01_fetch_block_groups.py
-echo ""
-
-echo "▶️  Script 2/7: Fetching Census ACS data..."
-python3 02_fetch_census.py
-echo ""
-
-echo "▶️  Script 3/7: Fetching assessor data (synthetic)..."
-python3 03_fetch_assessor.py
-echo ""
-
-echo "▶️  Script 4/7: Generating synthetic MLS data..."
-python3 04_generate_synthetic_mls.py
+# Incremental DAG runner: skips steps whose inputs are unchanged and runs
+# independent steps in parallel. Pass --force all to rebuild everything.
+python3 scripts/run_pipeline.py "$@"
 echo ""
 
-echo "▶️  Script 5/7: Engineering features..."
-python3 05_engineer_features.py
-echo ""
-
-echo "▶️  Script 6/7: Training ML models..."
-python3 06_train_model.py
-echo ""
-
-echo "▶️  Script 7/7: Generating predictions..."
-python3 07_generate_predictions.py
-echo ""
-
-cd ..
-
 echo "========================================"
 echo "✅ PIPELINE COMPLETE!"
 echo "========================================"
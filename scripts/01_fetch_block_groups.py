@@ -3,39 +3,55 @@
 Script 01: Fetch Census Block Groups for Ingham County, Michigan
 
 Downloads Census TIGER/Line block group boundaries and filters to Ingham County.
-Creates a GeoJSON file with ~150-200 block groups.
+Creates a GeoJSON file with ~150-200 block groups, plus simplified, quantized
+TopoJSON versions at several zoom levels for the webapp map (see topology.py),
+the polygon adjacency graph used for spillover queries (see adjacency.py), and
+distance-to-POI accessibility features (see accessibility.py).
 """
 
 import geopandas as gpd
 import os
 
-def fetch_block_groups():
-    """Download and filter Census block groups for Ingham County."""
+import http_cache
+from accessibility import accessibility_features
+from adjacency import build_adjacency, degree_summary, write_adjacency
+from pipeline_paths import county_paths
+from storage import write_table
+from topology import write_topojson_levels
+
+def fetch_block_groups(paths=None):
+    """Download and filter Census block groups for one county (default: Ingham)."""
+
+    paths = paths or county_paths()
+    state_fips = paths['state_fips']
+    county_fips = paths['county_fips']
 
     print("=" * 60)
     print("STEP 1: FETCH CENSUS BLOCK GROUPS")
     print("=" * 60)
 
     # Create output directory
-    os.makedirs('../data/block_groups', exist_ok=True)
+    os.makedirs(paths['block_groups_dir'], exist_ok=True)
 
-    # Download Census Block Groups for Michigan (State FIPS: 26)
-    print("\n📥 Downloading Census Block Groups for Michigan...")
-    url = 'https://www2.census.gov/geo/tiger/TIGER2023/BG/tl_2023_26_bg.zip'
+    # Download Census Block Groups for the whole state (e.g. Michigan, State FIPS: 26)
+    print(f"\n📥 Downloading Census Block Groups for state {state_fips}...")
+    url = f'https://www2.census.gov/geo/tiger/TIGER2023/BG/tl_2023_{state_fips}_bg.zip'
 
+    # The statewide zip is cached on disk, so later runs (and other
+    # counties in the same state) don't download it again.
     try:
-        bg_all = gpd.read_file(url)
-        print(f"✓ Downloaded {len(bg_all)} block groups for Michigan")
+        bg_all = gpd.read_file(http_cache.fetch_to_file(url, timeout=300))
+        print(f"✓ Downloaded {len(bg_all)} block groups for state {state_fips}")
     except Exception as e:
         print(f"❌ Error downloading data: {e}")
         return
 
-    # Filter to Ingham County (County FIPS: 065)
+    # Filter to the requested county (Ingham County FIPS: 065)
     # Full GEOID format: SSCCCTTTTTTG where SS=state, CCC=county
-    print("\n🔍 Filtering to Ingham County (FIPS: 26065)...")
-    ingham_bg = bg_all[bg_all['COUNTYFP'] == '065'].copy()
+    print(f"\n🔍 Filtering to county FIPS {state_fips}{county_fips}...")
+    ingham_bg = bg_all[bg_all['COUNTYFP'] == county_fips].copy()
 
-    print(f"✓ Found {len(ingham_bg)} block groups in Ingham County")
+    print(f"✓ Found {len(ingham_bg)} block groups in county {state_fips}{county_fips}")
 
     # Display sample GEOIDs
     print("\n📋 Sample Block Group GEOIDs:")
@@ -43,10 +59,35 @@ def fetch_block_groups():
         print(f"   - {geoid}")
 
     # Save to GeoJSON
-    output_file = '../data/block_groups/ingham_block_groups.geojson'
+    output_file = paths['block_groups']
     print(f"\n💾 Saving to {output_file}...")
     ingham_bg.to_file(output_file, driver='GeoJSON')
 
+    # Map payloads: shared-border topology, simplified per zoom level, GEOID only
+    print("\n📐 Building simplified TopoJSON for the map...")
+    source_kb = os.path.getsize(output_file) / 1024
+    for topo_file in write_topojson_levels(ingham_bg, output_file):
+        size_kb = os.path.getsize(topo_file) / 1024
+        print(f"   ✓ {topo_file}: {size_kb:.1f} KB ({source_kb / size_kb:.1f}x smaller)")
+
+    # Neighbor graph (queen contiguity) for spillover queries
+    print("\n🕸️  Building block group adjacency graph...")
+    graph = build_adjacency(ingham_bg)
+    write_adjacency(graph, paths['adjacency'])
+    adjacency = degree_summary(graph)
+    print(f"   ✓ {paths['adjacency']}: {adjacency['edges']} neighbor pairs, "
+          f"mean degree {adjacency['mean_degree']:.1f}")
+    if adjacency['isolated']:
+        print(f"   ⚠️  {adjacency['isolated']} block groups have no neighbors")
+
+    # Accessibility: geodesic distances to points of interest
+    print("\n📍 Computing accessibility features...")
+    os.makedirs(paths['processed_dir'], exist_ok=True)
+    access = accessibility_features(ingham_bg)
+    write_table(access, paths['accessibility'], 'accessibility')
+    print(f"   ✓ {paths['accessibility']}: {len(access.columns) - 1} features, "
+          f"median distance downtown {access['dist_downtown_km'].median():.1f} km")
+
     # Summary statistics
     print("\n" + "=" * 60)
     print("SUMMARY")
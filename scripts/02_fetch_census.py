@@ -4,83 +4,65 @@ Script 02: Fetch Census ACS Data for Ingham County Block Groups
 
 Downloads demographic and housing data from Census ACS 5-year estimates.
 NO SPATIAL JOINS NEEDED - Direct GEOID match with block groups!
+
+All vintages in ACS_YEARS are fetched concurrently; the latest is written as
+census_by_bg, and together they form a block group x year panel with
+year-over-year and trend features (see census_panel.py).
 """
 
-import pandas as pd
-import requests
 import os
 
-def fetch_census_data():
-    """Fetch Census ACS data for Ingham County block groups."""
+import http_cache
+from census_api import acs_url
+from census_panel import (
+    ACS_VARIABLES, GEOGRAPHY_2020, add_share_columns, build_panel, fetch_panel, parse_years, trend_features,
+)
+from pipeline_paths import county_paths
+from storage import write_table
+
+def fetch_census_data(paths=None):
+    """Fetch Census ACS data for one county's block groups (default: Ingham)."""
+
+    paths = paths or county_paths()
 
     print("=" * 60)
     print("STEP 2: FETCH CENSUS ACS DATA")
     print("=" * 60)
 
     # Create output directory
-    os.makedirs('../data/processed', exist_ok=True)
-
-    # Census API key (optional - can use without for small requests)
-    # Get free key at: https://api.census.gov/data/key_signup.html
-    API_KEY = os.environ.get('CENSUS_API_KEY', None)
-
-    # Define ACS 5-year variables (2022 data)
-    variables = {
-        'B19013_001E': 'median_income',          # Median household income
-        'B25003_001E': 'total_units',            # Total housing units
-        'B25003_002E': 'owner_occupied',         # Owner-occupied units
-        'B25003_003E': 'renter_occupied',        # Renter-occupied units
-        'B25070_010E': 'rent_burden_50pct',      # Renters paying ≥50% income on rent
-        'B25070_001E': 'total_renters',          # Total renter households
-        'B01003_001E': 'total_population',       # Total population
-        'B02001_002E': 'white_population',       # White population
-        'B02001_003E': 'black_population',       # Black population
-        'B25077_001E': 'median_home_value',      # Median home value
-    }
-
-    # Build Census API URL
-    base_url = 'https://api.census.gov/data/2022/acs/acs5'
-    var_list = ','.join(variables.keys())
-
-    # Request block group data for Ingham County
-    params = {
-        'get': f'NAME,{var_list}',
-        'for': 'block group:*',
-        'in': 'state:26 county:065',  # Michigan (26), Ingham County (065)
-    }
-
-    if API_KEY:
-        params['key'] = API_KEY
+    os.makedirs(paths['processed_dir'], exist_ok=True)
+
+    # Census API key (optional - can use without for small requests), read
+    # from CENSUS_API_KEY. Get free key at: https://api.census.gov/data/key_signup.html
+
+    # ACS 5-year vintages to fetch (ACS_YEARS, see census_panel.py); the
+    # latest one becomes census_by_bg, all of them the panel
+    years = parse_years()
+    latest = years[-1]
 
     print("\n📥 Fetching Census ACS data from API...")
-    print(f"   URL: {base_url}")
-    print(f"   Variables: {len(variables)}")
-
-    try:
-        response = requests.get(base_url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
+    print(f"   URL: {acs_url(latest)}")
+    print(f"   Variables: {len(ACS_VARIABLES)}")
+    print(f"   Vintages: {years[0]}-{latest} ({len(years)}, fetched concurrently)")
+
+    vintages, crosswalk, errors = fetch_panel(paths, years)
+
+    if latest in errors:
+        e = errors[latest]
         print(f"❌ Error fetching Census data: {e}")
+        if isinstance(e, http_cache.CacheMiss):
+            print("\n💡 Run once with network access to populate the cache,")
+            print("   or unset PIPELINE_OFFLINE")
+            return
         print("\n💡 Tip: Get a free Census API key at:")
         print("   https://api.census.gov/data/key_signup.html")
         print("   Then set: export CENSUS_API_KEY='your_key_here'")
         return
+    for key, e in errors.items():
+        print(f"   ⚠️  Skipping {key} ({e.__class__.__name__}: {e})")
 
-    # Convert to DataFrame
-    print(f"✓ Received data for {len(data) - 1} block groups")
-
-    headers = data[0]
-    rows = data[1:]
-    df = pd.DataFrame(rows, columns=headers)
-
-    # Rename columns
-    for code, name in variables.items():
-        if code in df.columns:
-            df[name] = pd.to_numeric(df[code], errors='coerce')
-
-    # Create GEOID (concatenate state + county + tract + block group)
-    df['GEOID'] = (df['state'] + df['county'] + df['tract'] + df['block group'])
+    df = vintages[latest]
+    print(f"✓ Received data for {len(df)} block groups")
 
     print("\n📋 Sample GEOIDs:")
     for geoid in df['GEOID'].head(3):
@@ -89,14 +71,7 @@ def fetch_census_data():
     # Calculate derived metrics
     print("\n🔧 Engineering derived features...")
 
-    df['pct_owner_occupied'] = (df['owner_occupied'] / df['total_units']).fillna(0)
-    df['pct_renter_occupied'] = (df['renter_occupied'] / df['total_units']).fillna(0)
-    df['pct_cost_burdened'] = (df['rent_burden_50pct'] / df['total_renters']).fillna(0)
-    df['pct_minority'] = (1 - (df['white_population'] / df['total_population'])).fillna(0)
-
-    # Clip percentages to [0, 1]
-    for col in ['pct_owner_occupied', 'pct_renter_occupied', 'pct_cost_burdened', 'pct_minority']:
-        df[col] = df[col].clip(0, 1)
+    add_share_columns(df)
 
     # Select final columns
     output_cols = [
@@ -109,12 +84,24 @@ def fetch_census_data():
 
     df_final = df[output_cols].copy()
 
-    # Save to CSV
-    output_file = '../data/processed/census_by_bg.csv'
-    df_final.to_csv(output_file, index=False)
+    # Save (CSV or Parquet, see storage.py)
+    output_file = paths['census']
+    write_table(df_final, output_file, 'census')
 
     print(f"✓ Derived features calculated")
 
+    # Block group x year panel on 2020 boundaries, and change features
+    print("\n📈 Building multi-year panel...")
+    panel = build_panel(vintages, crosswalk)
+    trends = trend_features(panel)
+    write_table(panel, paths['census_panel'], 'census_panel')
+    write_table(trends, paths['census_trends'], 'census_trends')
+    panel_years = sorted(panel['year'].unique())
+    if crosswalk is None and min(years) < GEOGRAPHY_2020:
+        print("   ⚠️  No 2010 -> 2020 crosswalk; pre-2020 vintages left out of the panel")
+    print(f"✓ {len(panel)} block group-years from {len(panel_years)} vintages "
+          f"({', '.join(str(y) for y in panel_years)})")
+
     # Summary statistics
     print("\n" + "=" * 60)
     print("SUMMARY")
@@ -127,7 +114,12 @@ def fetch_census_data():
     print(f"\nCost Burden:")
     print(f"  Mean: {df_final['pct_cost_burdened'].mean():.1%}")
     print(f"  High burden areas (>40%): {(df_final['pct_cost_burdened'] > 0.4).sum()}")
+    if len(panel_years) >= 2:
+        print(f"\nMedian Home Value Trend ({panel_years[0]}-{panel_years[-1]}):")
+        print(f"  Median annual change: {trends['median_home_value_trend'].median():.1%}")
     print(f"\nOutput file: {output_file}")
+    print(f"Panel: {paths['census_panel']}")
+    print(f"Trends: {paths['census_trends']}")
 
     print("\n✅ Census data ready!")
 
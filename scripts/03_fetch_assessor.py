@@ -1,43 +1,32 @@
 #!/usr/bin/env python3
 """
-Script 03: Fetch County Assessor Data (Placeholder)
+Script 03: Fetch County Assessor Data
 
-For MVP: We'll skip real assessor data and rely on Census median home values.
-Real assessor data would come from Ingham County's open data portal or FOIA request.
+With PARCEL_FILE set, parcels from a county parcel extract are spatially
+joined to block groups and aggregated (median/quantile assessed values,
+parcel counts, year built), streaming the file in chunks; see parcels.py.
+Block groups without parcels keep the Census-based estimates.
 
-This script is a placeholder that shows the structure for when you get real data.
+Without a parcel file (the MVP default), assessor-style columns are
+estimated from Census median home values. Real parcel data comes from
+Ingham County's open data portal or a FOIA request.
 """
 
 import pandas as pd
-import geopandas as gpd
 import os
 
-def fetch_assessor_data():
-    """Placeholder for county assessor data - uses Census data instead."""
+from parcels import PARCEL_FILE, PARCEL_LAYER, aggregate_parcels
+from pipeline_paths import county_paths
+from storage import read_table, write_table
 
-    print("=" * 60)
-    print("STEP 3: FETCH ASSESSOR DATA (USING CENSUS DATA FOR MVP)")
-    print("=" * 60)
-
-    print("\n⚠️  NOTE: Using Census median home values instead of assessor data")
-    print("   For production, integrate with:")
-    print("   - Ingham County Treasurer's Office")
-    print("   - Michigan.gov Open Data Portal")
-    print("   - FOIA request for parcel data")
-
-    # Load Census data (already has median_home_value)
-    census_file = '../data/processed/census_by_bg.csv'
-
-    if not os.path.exists(census_file):
-        print(f"\n❌ Error: {census_file} not found")
-        print("   Run script 02_fetch_census.py first")
-        return
+# Columns every block group gets, from parcels where there are any
+ESTIMATED_COLUMNS = [
+    'assessed_value_median', 'assessed_value_mean', 'parcel_count_estimated', 'property_age_estimate',
+]
 
-    census = pd.read_csv(census_file)
-    print(f"\n✓ Loaded Census data: {len(census)} block groups")
 
-    # Create assessor-style aggregations
-    # In real system: spatial join parcels → block groups, then aggregate
+def census_estimates(census):
+    """Assessor-style columns estimated from Census data (the MVP placeholder)."""
     assessor_agg = pd.DataFrame({
         'GEOID': census['GEOID'],
         'assessed_value_median': census['median_home_value'],
@@ -51,28 +40,96 @@ def fetch_assessor_data():
     assessor_agg['property_age_estimate'] = (
         50 - ((assessor_agg['assessed_value_median'] / max_value) * 30)
     ).clip(5, 100).astype(int)
+    return assessor_agg
+
+
+def with_estimates(parcels_by_bg, estimates):
+    """
+    Parcel aggregates for every block group in estimates; block groups (or
+    columns) without parcel data take the Census-based estimate.
+    """
+    assessor_agg = estimates[['GEOID']].merge(parcels_by_bg, on='GEOID', how='left')
+    for col in ESTIMATED_COLUMNS:
+        assessor_agg[col] = assessor_agg[col].fillna(estimates[col])
+    return assessor_agg.astype({'parcel_count_estimated': int, 'property_age_estimate': int})
+
+
+def fetch_assessor_data(paths=None, parcel_file=PARCEL_FILE):
+    """County assessor data from parcel_file, or Census-based estimates without one."""
+
+    paths = paths or county_paths()
+
+    print("=" * 60)
+    if parcel_file:
+        print("STEP 3: FETCH ASSESSOR DATA (PARCELS)")
+    else:
+        print("STEP 3: FETCH ASSESSOR DATA (USING CENSUS DATA FOR MVP)")
+    print("=" * 60)
+
+    if not parcel_file:
+        print("\n⚠️  NOTE: Using Census median home values instead of assessor data")
+        print("   Set PARCEL_FILE to a county parcel extract, from:")
+        print("   - Ingham County Treasurer's Office")
+        print("   - Michigan.gov Open Data Portal")
+        print("   - FOIA request for parcel data")
+
+    # Load Census data (already has median_home_value)
+    census_file = paths['census']
+
+    if not os.path.exists(census_file):
+        print(f"\n❌ Error: {census_file} not found")
+        print("   Run script 02_fetch_census.py first")
+        return
+
+    census = read_table(census_file)
+    print(f"\n✓ Loaded Census data: {len(census)} block groups")
+
+    assessor_agg = census_estimates(census)
+
+    if parcel_file:
+        for f in (parcel_file, paths['block_groups']):
+            if not os.path.exists(f):
+                print(f"\n❌ Error: {f} not found")
+                return
+
+        print(f"\n🏠 Joining parcels from {parcel_file} to block groups...")
+        parcels_by_bg, stats = aggregate_parcels(parcel_file, paths['block_groups'], layer=PARCEL_LAYER)
+        print(f"   ✓ {stats['read']:,} parcels read, {stats['read'] - stats['outside'] - stats['no_geometry']:,} "
+              f"in {len(parcels_by_bg)} block groups")
+        print(f"   {stats['valued']:,} with an assessed value, {stats['dated']:,} with a year built")
+        if stats['outside'] or stats['no_geometry']:
+            print(f"   ⚠️  {stats['outside']:,} outside every block group, "
+                  f"{stats['no_geometry']:,} without a location")
+
+        assessor_agg = with_estimates(parcels_by_bg, assessor_agg)
+        missing = len(assessor_agg) - assessor_agg['GEOID'].isin(parcels_by_bg['GEOID']).sum()
+        if missing:
+            print(f"   ⚠️  {missing} block groups without parcels keep Census-based estimates")
 
     # Save
-    output_file = '../data/processed/assessor_by_bg.csv'
-    assessor_agg.to_csv(output_file, index=False)
+    output_file = paths['assessor']
+    write_table(assessor_agg, output_file, 'assessor')
 
     # Summary
     print("\n" + "=" * 60)
-    print("SUMMARY (SYNTHETIC DATA FOR MVP)")
+    print("SUMMARY (PARCELS)" if parcel_file else "SUMMARY (SYNTHETIC DATA FOR MVP)")
     print("=" * 60)
     print(f"Total block groups: {len(assessor_agg)}")
     print(f"\nAssessed Values:")
     print(f"  Median: ${assessor_agg['assessed_value_median'].median():,.0f}")
     print(f"  Range: ${assessor_agg['assessed_value_median'].min():,.0f} - ${assessor_agg['assessed_value_median'].max():,.0f}")
-    print(f"\nEstimated Parcels: {assessor_agg['parcel_count_estimated'].sum():,}")
+    print(f"\n{'Parcels' if parcel_file else 'Estimated Parcels'}: {assessor_agg['parcel_count_estimated'].sum():,}")
     print(f"Output file: {output_file}")
 
+    if parcel_file:
+        print("\n✅ Assessor data ready!")
+        return
+
     print("\n✅ Assessor data (synthetic) ready!")
     print("\n💡 NEXT STEPS FOR PRODUCTION:")
     print("   1. Contact Ingham County Equalization Department")
     print("   2. Request parcel shapefile with assessed values")
-    print("   3. Spatial join parcels to block groups")
-    print("   4. Aggregate: median value, parcel count, avg lot size")
+    print("   3. Set PARCEL_FILE to it and rerun this step")
 
 if __name__ == "__main__":
     fetch_assessor_data()
@@ -5,122 +5,218 @@ Script 04: Generate Synthetic MLS Data
 Creates realistic-looking MLS-style sales data based on Census data.
 For MVP only - real production system would use actual MLS data from
 Greater Lansing Association of Realtors.
+
+With MLS_FILES set, closed sales from MLS exports are aggregated to block
+groups instead (mls_sales.py): only files not ingested before are read,
+and block groups with too few sales keep the synthetic values. The output
+table has the same columns either way.
+
+Usage:
+    python 04_generate_synthetic_mls.py             # synthetic, or ingest new MLS files
+    python 04_generate_synthetic_mls.py --rebuild   # re-ingest every MLS file
 """
 
+import argparse
+
 import pandas as pd
-import geopandas as gpd
 import numpy as np
 import os
 
-np.random.seed(42)  # Reproducible synthetic data
-
-def generate_synthetic_mls():
-    """Generate synthetic MLS sales data for each block group."""
+from mls_sales import MIN_SALES, MLS_AS_OF, MLS_FILES, list_sale_files, sales_table, update_sales
+from pipeline_paths import county_paths
+from storage import read_table, write_table
+
+SEED = 42  # Reproducible synthetic data
+
+# Downtown Lansing coordinates (approximate Capitol building, as in
+# accessibility.POINTS_OF_INTEREST)
+DOWNTOWN_LON = -84.5555
+DOWNTOWN_LAT = 42.7325
+
+
+def downtown_distances(paths):
+    """
+    GEOID + dist_to_downtown (km) in GeoJSON row order. Step 01 already
+    computed it (accessibility table, dist_downtown_km), so the geometry is
+    only read, with geopandas, when that column is missing (e.g. a POI_FILE
+    without the Capitol).
+    """
+    if os.path.exists(paths['accessibility']):
+        access = read_table(paths['accessibility'])
+        if 'dist_downtown_km' in access.columns:
+            return access[['GEOID', 'dist_downtown_km']].rename(
+                columns={'dist_downtown_km': 'dist_to_downtown'}
+            )
+
+    import geopandas as gpd
+    from accessibility import block_group_points, haversine_km
+
+    bg_geo = gpd.read_file(paths['block_groups'])
+    lon, lat = block_group_points(bg_geo)
+    return pd.DataFrame({
+        'GEOID': bg_geo['GEOID'],
+        'dist_to_downtown': haversine_km(lon, lat, DOWNTOWN_LON, DOWNTOWN_LAT),
+    })
+
+
+def synthesize_mls(bg_data, rng):
+    """
+    Build the synthetic MLS table for every block group in one vectorized pass.
+
+    bg_data needs GEOID, median_home_value, median_income, total_units and
+    dist_to_downtown. rng is anything with a NumPy-style normal(loc, scale, size)
+    (np.random.Generator or np.random.RandomState). Noise is drawn as an
+    (n, 2) array so the draw order (yoy, dom per block group) matches the
+    original row-by-row loop; a RandomState seeded with SEED reproduces the
+    committed synthetic_mls_by_bg.csv exactly.
+    """
+    n = len(bg_data)
+    dist = bg_data['dist_to_downtown'].to_numpy(dtype=float)
+    income = bg_data['median_income'].to_numpy(dtype=float)
+    home_value = bg_data['median_home_value'].to_numpy(dtype=float)
+    total_units = bg_data['total_units'].to_numpy(dtype=float)
+
+    noise = rng.normal(0.0, [0.02, 10.0], size=(n, 2))
+
+    # Base price from Census median home value
+    base_price = np.where(np.isnan(home_value), 150000, home_value)
+
+    # Price trend: closer to downtown = higher appreciation
+    # Also factor in median income (proxy for gentrification pressure)
+    distance_factor = 1 - (dist / np.nanmax(dist))
+    income_factor = np.where(np.isnan(income), 0.5, income / np.nanmax(income))
+
+    # YoY price change: baseline 3% + distance boost + income boost + noise
+    yoy_change = 0.03  # 3% baseline
+    yoy_change = yoy_change + distance_factor * 0.04  # Up to 4% boost near downtown
+    yoy_change = yoy_change + income_factor * 0.02  # Up to 2% boost in higher income areas
+    yoy_change = yoy_change + noise[:, 0]  # ±2% random noise
+    yoy_change = np.clip(yoy_change, -0.05, 0.15)  # Clip to [-5%, 15%]
+
+    # Days on market: inversely related to demand
+    # Lower income + far from downtown = longer on market
+    base_dom = 45  # days
+    dom = base_dom + (1 - distance_factor) * 30  # +0-30 days if far
+    dom = dom + (1 - income_factor) * 20  # +0-20 days if low income
+    dom = dom + noise[:, 1]  # Random variation
+    dom = np.clip(dom, 7, 180).astype(int)  # Clip to reasonable range
+
+    # Sale count: based on total units and turnover rate
+    # Higher turnover in high-appreciation areas (flipping)
+    turnover_rate = np.where(yoy_change > 0.08, 0.07, 0.05)  # 5% baseline, +2% when hot
+    sale_count = np.where(
+        np.isnan(total_units), 5, np.trunc(np.nan_to_num(total_units) * turnover_rate)
+    ).astype(int)
+    sale_count = np.maximum(2, sale_count)  # At least 2 sales per area
+
+    # Sale price: apply YoY change to median
+    median_sale_price = base_price * (1 + yoy_change)
+
+    # Price per square foot (synthetic - typical range $80-180)
+    price_per_sqft = 80 + (median_sale_price / 300000) * 100
+    price_per_sqft = np.clip(price_per_sqft, 60, 200)
+
+    return pd.DataFrame({
+        'GEOID': bg_data['GEOID'].to_numpy(),
+        'median_sale_price': median_sale_price.astype(int),
+        'price_yoy_change': np.round(yoy_change, 4),
+        'days_on_market': dom,
+        'sale_count_12mo': sale_count,
+        'price_per_sqft': price_per_sqft.astype(int),
+        'dist_to_downtown': np.round(dist, 4),
+    })
+
+
+def with_synthetic(sales, synthetic):
+    """
+    Real MLS aggregates for every block group in synthetic; medians missing
+    from the sales (too few sales) take the synthetic value. Sale counts
+    are real, including zeros.
+    """
+    mls = synthetic[['GEOID', 'dist_to_downtown']].merge(sales, on='GEOID', how='left')
+    for col in ['median_sale_price', 'price_yoy_change', 'days_on_market', 'sale_count_12mo', 'price_per_sqft']:
+        mls[col] = mls[col].fillna(synthetic[col])
+    mls = mls[synthetic.columns]
+    return mls.astype({col: int for col in
+                       ['median_sale_price', 'days_on_market', 'sale_count_12mo', 'price_per_sqft']})
+
+
+def generate_synthetic_mls(paths=None, rng=None, mls_files=MLS_FILES, rebuild=False):
+    """Generate synthetic MLS sales data for each block group, or aggregate mls_files."""
+
+    paths = paths or county_paths()
 
     print("=" * 60)
-    print("STEP 4: GENERATE SYNTHETIC MLS DATA")
+    if mls_files:
+        print("STEP 4: AGGREGATE MLS SALES")
+    else:
+        print("STEP 4: GENERATE SYNTHETIC MLS DATA")
     print("=" * 60)
 
-    print("\n⚠️  NOTE: Generating synthetic data for MVP demonstration")
-    print("   Real production system would use actual MLS feed")
+    if not mls_files:
+        print("\n⚠️  NOTE: Generating synthetic data for MVP demonstration")
+        print("   Real production system would use actual MLS feed")
 
     # Load Census data and block group geometries
-    census_file = '../data/processed/census_by_bg.csv'
-    bg_file = '../data/block_groups/ingham_block_groups.geojson'
+    census_file = paths['census']
+    bg_file = paths['block_groups']
 
     if not os.path.exists(census_file) or not os.path.exists(bg_file):
         print("\n❌ Error: Required files not found")
         print("   Run scripts 01 and 02 first")
         return
 
-    census = pd.read_csv(census_file)
-    bg_geo = gpd.read_file(bg_file)
+    census = read_table(census_file)
+
+    # Great-circle distance (km) from projected centroids to downtown
+    distances = downtown_distances(paths)
 
     print(f"\n✓ Loaded {len(census)} block groups")
 
     # Ensure GEOID is string in both dataframes
     census['GEOID'] = census['GEOID'].astype(str)
-    bg_geo['GEOID'] = bg_geo['GEOID'].astype(str)
+    distances['GEOID'] = distances['GEOID'].astype(str)
 
-    # Merge census data with geometries
-    bg_data = bg_geo.merge(census, on='GEOID')
-
-    # Calculate centroids for distance calculations
-    bg_data['centroid_lon'] = bg_data.geometry.centroid.x
-    bg_data['centroid_lat'] = bg_data.geometry.centroid.y
-
-    # Downtown Lansing coordinates (approximate Capitol building)
-    DOWNTOWN_LON = -84.5555
-    DOWNTOWN_LAT = 42.7325
-
-    # Calculate distance to downtown (in degrees - rough proxy)
-    bg_data['dist_to_downtown'] = np.sqrt(
-        (bg_data['centroid_lon'] - DOWNTOWN_LON)**2 +
-        (bg_data['centroid_lat'] - DOWNTOWN_LAT)**2
-    )
+    # Merge census data onto the block groups (GeoJSON row order)
+    bg_data = distances.merge(census, on='GEOID')
 
     print("\n🏠 Generating synthetic MLS sales data...")
 
-    sales_data = []
-
-    for _, row in bg_data.iterrows():
-        # Base price from Census median home value
-        base_price = row['median_home_value'] if pd.notna(row['median_home_value']) else 150000
-
-        # Price trend: closer to downtown = higher appreciation
-        # Also factor in median income (proxy for gentrification pressure)
-        distance_factor = 1 - (row['dist_to_downtown'] / bg_data['dist_to_downtown'].max())
-        income_factor = (row['median_income'] / bg_data['median_income'].max()) if pd.notna(row['median_income']) else 0.5
-
-        # YoY price change: baseline 3% + distance boost + income boost + noise
-        yoy_change = 0.03  # 3% baseline
-        yoy_change += distance_factor * 0.04  # Up to 4% boost near downtown
-        yoy_change += income_factor * 0.02  # Up to 2% boost in higher income areas
-        yoy_change += np.random.normal(0, 0.02)  # ±2% random noise
-        yoy_change = np.clip(yoy_change, -0.05, 0.15)  # Clip to [-5%, 15%]
-
-        # Days on market: inversely related to demand
-        # Lower income + far from downtown = longer on market
-        base_dom = 45  # days
-        dom = base_dom + (1 - distance_factor) * 30  # +0-30 days if far
-        dom = dom + (1 - income_factor) * 20  # +0-20 days if low income
-        dom = dom + np.random.normal(0, 10)  # Random variation
-        dom = int(np.clip(dom, 7, 180))  # Clip to reasonable range
-
-        # Sale count: based on total units and turnover rate
-        turnover_rate = 0.05  # 5% annual turnover baseline
-        # Higher turnover in high-appreciation areas (flipping)
-        if yoy_change > 0.08:
-            turnover_rate += 0.02
-        sale_count = int(row['total_units'] * turnover_rate) if pd.notna(row['total_units']) else 5
-        sale_count = max(2, sale_count)  # At least 2 sales per area
-
-        # Sale price: apply YoY change to median
-        median_sale_price = base_price * (1 + yoy_change)
-
-        # Price per square foot (synthetic - typical range $80-180)
-        price_per_sqft = 80 + (median_sale_price / 300000) * 100
-        price_per_sqft = np.clip(price_per_sqft, 60, 200)
-
-        sales_data.append({
-            'GEOID': row['GEOID'],
-            'median_sale_price': int(median_sale_price),
-            'price_yoy_change': round(yoy_change, 4),
-            'days_on_market': dom,
-            'sale_count_12mo': sale_count,
-            'price_per_sqft': int(price_per_sqft),
-            'dist_to_downtown': round(row['dist_to_downtown'], 4)
-        })
-
-    sales_df = pd.DataFrame(sales_data)
-
-    # Save to CSV
-    output_file = '../data/processed/synthetic_mls_by_bg.csv'
-    sales_df.to_csv(output_file, index=False)
+    if rng is None:
+        rng = np.random.RandomState(SEED)
+    sales_df = synthesize_mls(bg_data, rng)
+
+    if mls_files:
+        files = list_sale_files(mls_files)
+        if not files:
+            print(f"\n❌ Error: no MLS files match {mls_files}")
+            return
+
+        print(f"\n🏠 Ingesting MLS sales ({len(files)} files)...")
+        state, ingested = update_sales(paths, files, rebuild=rebuild)
+        if ingested:
+            totals = {key: sum(stats[key] for _, stats in ingested) for key in ingested[0][1]}
+            print(f"   ✓ {len(ingested)} new files: {totals['sales']:,} of {totals['read']:,} sales ingested")
+            if totals['incomplete'] or totals['outside']:
+                print(f"   ⚠️  {totals['incomplete']:,} without price/date/location, "
+                      f"{totals['outside']:,} outside every block group")
+        print(f"   {len(files) - len(ingested)} files already ingested "
+              f"({len(state['files'])} in {paths['mls_state']})")
+
+        sales, as_of = sales_table(state, MLS_AS_OF)
+        print(f"   12 months to {as_of}: {sales['sale_count_12mo'].sum():,} sales")
+        sales_df = with_synthetic(sales, sales_df)
+        thin = sales['median_sale_price'].isna().sum()
+        if thin:
+            print(f"   ⚠️  {thin} block groups with fewer than {MIN_SALES} sales keep synthetic medians")
+
+    # Save (CSV or Parquet, see storage.py)
+    output_file = paths['mls']
+    write_table(sales_df, output_file, 'mls')
 
     # Summary statistics
     print("\n" + "=" * 60)
-    print("SUMMARY (SYNTHETIC DATA)")
+    print("SUMMARY (MLS SALES)" if mls_files else "SUMMARY (SYNTHETIC DATA)")
     print("=" * 60)
     print(f"Total block groups: {len(sales_df)}")
     print(f"\nMedian Sale Price:")
@@ -136,6 +232,10 @@ def generate_synthetic_mls():
     print(f"\nTotal Sales (12mo): {sales_df['sale_count_12mo'].sum():,}")
     print(f"Output file: {output_file}")
 
+    if mls_files:
+        print("\n✅ MLS data ready!")
+        return
+
     print("\n✅ Synthetic MLS data ready!")
     print("\n💡 NEXT STEPS FOR PRODUCTION:")
     print("   1. Partner with Greater Lansing Association of Realtors")
@@ -145,4 +245,8 @@ def generate_synthetic_mls():
     print("   5. Calculate metrics: median price, DOM, sale volume")
 
 if __name__ == "__main__":
-    generate_synthetic_mls()
+    parser = argparse.ArgumentParser(description="Synthetic or real (MLS_FILES) MLS table per block group")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="discard the MLS sales state and re-ingest every file")
+    args = parser.parse_args()
+    generate_synthetic_mls(rebuild=args.rebuild)
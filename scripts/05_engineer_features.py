@@ -4,93 +4,53 @@ Script 05: Engineer Features for ML Models
 
 Combines Census, assessor, and synthetic MLS data into a single feature matrix.
 Creates derived features used for predicting equity score and foreclosure risk.
+When script 02 built a multi-year panel, its year-over-year and trend
+features (census_panel.py) are merged in too.
+
+--changed recomputes only the rows of the given block groups (and what
+depends on them: median fills and neighbors' spatial lags) against the
+state saved by the last full run, and marks their predictions stale; see
+feature_state.py.
+
+Usage (from scripts/):
+    python 05_engineer_features.py                                  # full rebuild
+    python 05_engineer_features.py --changed 260650001001 260650001002
+    python 05_engineer_features.py --changed-file changed_geoids.txt
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import os
 
-def engineer_features():
-    """Combine all data sources and engineer features for ML."""
-
-    print("=" * 60)
-    print("STEP 5: FEATURE ENGINEERING")
-    print("=" * 60)
-
-    # Load all data sources
-    census_file = '../data/processed/census_by_bg.csv'
-    mls_file = '../data/processed/synthetic_mls_by_bg.csv'
-    assessor_file = '../data/processed/assessor_by_bg.csv'
-
-    # Check files exist
-    missing_files = []
-    for f in [census_file, mls_file, assessor_file]:
-        if not os.path.exists(f):
-            missing_files.append(f)
-
-    if missing_files:
-        print("\n❌ Error: Missing required files:")
-        for f in missing_files:
-            print(f"   - {f}")
-        print("\n   Run scripts 02, 03, and 04 first")
-        return
-
-    print("\n📥 Loading data sources...")
-    census = pd.read_csv(census_file)
-    mls = pd.read_csv(mls_file)
-    assessor = pd.read_csv(assessor_file)
-
-    print(f"   Census: {len(census)} rows")
-    print(f"   MLS: {len(mls)} rows")
-    print(f"   Assessor: {len(assessor)} rows")
-
+from adjacency import load_adjacency, spatial_weights
+from feature_state import (
+    filled_values, load_state, mark_stale, neighbor_rows, new_state, read_changed, replace_rows, save_state,
+)
+from pipeline_paths import county_paths
+from storage import patch_csv_rows, read_table, write_table
+from derived_features import (
+    SPATIAL_LAG_COLUMNS, SPATIAL_LAG_INPUTS, add_derived_features, add_spatial_lags, spatial_lag_values,
+)
+
+
+def merge_features(census, mls, assessor, accessibility, trends=None):
+    """
+    Merge the sources on GEOID (one row per census row), add the derived
+    features and select the feature table's columns, before missing values
+    are filled.
+    """
     # Merge on GEOID - direct joins, no spatial operations needed!
-    print("\n🔗 Merging datasets on GEOID...")
     features = census.merge(mls, on='GEOID', how='left')
     features = features.merge(assessor, on='GEOID', how='left')
-
-    print(f"✓ Merged to {len(features)} rows with {len(features.columns)} columns")
+    features = features.merge(accessibility, on='GEOID', how='left')
+    trend_cols = []
+    if trends is not None:
+        features = features.merge(trends, on='GEOID', how='left')
+        trend_cols = [col for col in trends.columns if col != 'GEOID']
 
     # Engineer derived features
-    print("\n🔧 Engineering derived features...")
-
-    # 1. Affordability Ratio (higher = less affordable)
-    features['affordability_ratio'] = (
-        features['median_sale_price'] / features['median_income']
-    ).fillna(3.0).clip(0, 10)
-
-    # 2. Cost Burden (percentage)
-    features['cost_burden_pct'] = (features['pct_cost_burdened'] * 100).clip(0, 100)
-
-    # 3. Gentrification Pressure (composite indicator)
-    features['gentrification_pressure'] = (
-        features['price_yoy_change'] * 100 *  # Price momentum
-        (50000 / features['median_income'].clip(lower=20000)) *  # Income vulnerability
-        features['pct_minority']  # Displacement risk
-    ).fillna(0).clip(0, 100)
-
-    # 4. Market Liquidity (inverse of days on market)
-    features['market_liquidity'] = (
-        100 - (features['days_on_market'] / 180 * 100)
-    ).clip(0, 100)
-
-    # 5. Owner Stability (owner-occupied rate as percentage)
-    features['owner_stability'] = (features['pct_owner_occupied'] * 100).clip(0, 100)
-
-    # 6. Foreclosure Rate Proxy (placeholder - cost burden is main predictor)
-    features['foreclosure_rate'] = (features['cost_burden_pct'] / 100).clip(0, 1)
-
-    # 7. Price-to-Assessed Ratio (market heat indicator)
-    features['price_to_assessed_ratio'] = (
-        features['median_sale_price'] / features['assessed_value_median']
-    ).fillna(1.0).clip(0.5, 2.0)
-
-    # 8. Population Density Proxy (population per unit)
-    features['pop_per_unit'] = (
-        features['total_population'] / features['total_units']
-    ).fillna(2.5).clip(1, 8)
-
-    print("✓ Created 8 derived features")
+    add_derived_features(features)
 
     # Select final feature set for ML models
     final_features = [
@@ -115,16 +75,75 @@ def engineer_features():
         'gentrification_pressure', 'market_liquidity',
         'owner_stability', 'foreclosure_rate',
         'price_to_assessed_ratio', 'pop_per_unit'
-    ]
+    ] + [
+        # Accessibility (geodesic distances to points of interest)
+        col for col in accessibility.columns if col != 'GEOID'
+    ] + trend_cols  # Multi-year census changes
 
-    features_final = features[final_features].copy()
+    return features[final_features].copy()
+
+
+def engineer_features(paths=None, changed=None):
+    """
+    Combine all data sources and engineer features for ML. With changed (a
+    list of GEOIDs), update only the rows that depend on them.
+    """
+
+    paths = paths or county_paths()
+
+    print("=" * 60)
+    print("STEP 5: FEATURE ENGINEERING")
+    print("=" * 60)
+
+    # Load all data sources
+    census_file = paths['census']
+    mls_file = paths['mls']
+    assessor_file = paths['assessor']
+    accessibility_file = paths['accessibility']
+    adjacency_file = paths['adjacency']
+
+    # Check files exist
+    missing_files = []
+    for f in [census_file, mls_file, assessor_file, accessibility_file, adjacency_file]:
+        if not os.path.exists(f):
+            missing_files.append(f)
+
+    if missing_files:
+        print("\n❌ Error: Missing required files:")
+        for f in missing_files:
+            print(f"   - {f}")
+        print("\n   Run scripts 01, 02, 03, and 04 first")
+        return
+
+    print("\n📥 Loading data sources...")
+    census = read_table(census_file)
+    mls = read_table(mls_file)
+    assessor = read_table(assessor_file)
+    accessibility = read_table(accessibility_file)
+    # Multi-year change features are optional (single-vintage runs skip them)
+    trends = read_table(paths['census_trends']) if os.path.exists(paths['census_trends']) else None
+
+    print(f"   Census: {len(census)} rows")
+    print(f"   MLS: {len(mls)} rows")
+    print(f"   Assessor: {len(assessor)} rows")
+    print(f"   Accessibility: {len(accessibility)} rows")
+    if trends is not None:
+        print(f"   Census trends: {len(trends)} rows")
+
+    if changed is not None:
+        return update_features(paths, changed, census, mls, assessor, accessibility, trends)
+
+    print("\n🔗 Merging datasets on GEOID and engineering derived features...")
+    features_final = merge_features(census, mls, assessor, accessibility, trends)
+    print(f"✓ {len(features_final)} rows, 8 derived features, {len(features_final.columns)} columns")
 
     # Handle missing values
     print("\n🧹 Handling missing values...")
     missing_before = features_final.isnull().sum().sum()
 
-    # Fill numeric columns with median
+    # Fill numeric columns with median; the unfilled values are kept for --changed runs
     numeric_cols = features_final.select_dtypes(include=[np.number]).columns
+    unfilled = features_final[numeric_cols].copy()
     for col in numeric_cols:
         if col not in ['GEOID']:
             features_final[col] = features_final[col].fillna(features_final[col].median())
@@ -132,16 +151,26 @@ def engineer_features():
     missing_after = features_final.isnull().sum().sum()
     print(f"   Missing values: {missing_before} → {missing_after}")
 
+    # Spatial lags: neighbor averages over the block group adjacency graph,
+    # one sparse matrix multiply for all columns
+    print("\n🕸️  Computing spatial lags...")
+    weights = spatial_weights(load_adjacency(adjacency_file), features_final['GEOID'])
+    add_spatial_lags(features_final, weights)
+    print(f"   ✓ {len(SPATIAL_LAG_COLUMNS)} lagged features over {weights.nnz} neighbor links")
+
     # Save feature matrix
-    output_file = '../data/processed/bg_features.csv'
-    features_final.to_csv(output_file, index=False)
+    output_file = paths['features']
+    write_table(features_final, output_file, 'features')
+    save_state(new_state(features_final['GEOID'], unfilled, features_final[SPATIAL_LAG_COLUMNS]),
+               paths['features_state'])
+    mark_stale(paths, features_final['GEOID'])
 
     # Summary statistics
     print("\n" + "=" * 60)
     print("FEATURE MATRIX SUMMARY")
     print("=" * 60)
     print(f"Total block groups: {len(features_final)}")
-    print(f"Total features: {len(final_features) - 2}")  # Exclude GEOID, NAME
+    print(f"Total features: {len(features_final.columns) - 2}")  # Exclude GEOID, NAME
     print(f"\nKey Derived Features:")
     print(f"  Affordability Ratio (median): {features_final['affordability_ratio'].median():.2f}")
     print(f"  Cost Burden % (mean): {features_final['cost_burden_pct'].mean():.1f}%")
@@ -168,5 +197,84 @@ def engineer_features():
     print("\n✅ Feature engineering complete!")
     print("\n📊 Ready for ML model training (script 06)")
 
+def update_features(paths, changed, census, mls, assessor, accessibility, trends=None):
+    """
+    Recompute the feature rows of the changed GEOIDs, and the rows that
+    depend on them, from the state saved by the last full run.
+    """
+    state_file = paths['features_state']
+    if not os.path.exists(state_file) or not os.path.exists(paths['features']):
+        print(f"\n❌ Error: {state_file} not found")
+        print("   Run script 05 once without --changed first")
+        return
+
+    state = load_state(state_file)
+    geoids = pd.Series(np.arange(len(state['geoids'])), index=state['geoids'])
+    changed = pd.unique(np.asarray(changed, dtype=str))
+    in_census = set(census['GEOID'])
+    unknown = [g for g in changed if g not in geoids.index or g not in in_census]
+    if unknown:
+        raise ValueError(f"{len(unknown)} changed GEOIDs (e.g. {unknown[0]}) are not in both "
+                         "the census table and the feature table; rerun without --changed")
+    rows = geoids[changed].to_numpy()
+
+    print(f"\n🔗 Merging {len(rows)} changed block groups...")
+    fresh = merge_features(census[census['GEOID'].isin(changed)], mls, assessor, accessibility, trends)
+    fresh = fresh.set_index('GEOID').loc[changed].reset_index()
+    columns = list(state['columns'])
+    if list(fresh.select_dtypes(include=[np.number]).columns) != columns:
+        raise ValueError("Feature columns changed since the last full run; rerun without --changed")
+
+    # Identifiers come from the table; every number from the state, since a
+    # CSV round trip isn't exact
+    text_cols = [col for col in fresh.columns if col not in columns]
+    features = read_table(paths['features'], columns=text_cols)
+    if not np.array_equal(state['geoids'], features['GEOID'].astype(str)):
+        raise ValueError(f"{state_file} does not match {paths['features']}; rerun without --changed")
+    for col in text_cols:
+        features.loc[rows, col] = fresh[col].to_numpy()
+
+    # New medians; rows with a missing value in a column whose median moved are refilled
+    moved = replace_rows(state, rows, fresh[columns].to_numpy(dtype=float))
+    touched = np.union1d(rows, np.flatnonzero(np.isnan(state['raw'][:, moved]).any(axis=1)))
+    print(f"   {int(moved.sum())} column medians moved; {len(touched)} rows refilled")
+
+    # Integer columns stay integers, as in a full run: integer sources with no missing value
+    integral = (np.array([fresh[col].dtype.kind in 'iu' for col in columns])
+                & ~np.isnan(state['raw']).any(axis=0))
+    retyped = bool((integral != state['integral']).any())
+    state['integral'] = integral
+    filled = filled_values(state)
+    for j, col in enumerate(columns):
+        features[col] = filled[:, j].astype(np.int64) if integral[j] else filled[:, j]
+
+    # Spatial lags of those rows and their neighbors
+    print("\n🕸️  Updating spatial lags...")
+    weights = spatial_weights(load_adjacency(paths['adjacency']), features['GEOID'])
+    lag_rows = neighbor_rows(weights, touched)
+    state['lags'][lag_rows] = spatial_lag_values(
+        features[SPATIAL_LAG_INPUTS].to_numpy(dtype=float), weights, lag_rows)
+    for i, col in enumerate(SPATIAL_LAG_COLUMNS):
+        features[col] = state['lags'][:, i]
+    print(f"   ✓ {len(lag_rows)} block groups relagged")
+
+    # Every other row is unchanged, so only their lines need rewriting
+    features = features[list(fresh.columns) + SPATIAL_LAG_COLUMNS]
+    if retyped or not patch_csv_rows(features, paths['features'], lag_rows):
+        write_table(features, paths['features'], 'features')
+    save_state(state, state_file)
+    stale = mark_stale(paths, state['geoids'][lag_rows])
+
+    print(f"\nOutput file: {paths['features']}")
+    print(f"   {len(lag_rows)} predictions marked stale ({stale} in total); "
+          "refresh them with script 07 --stale")
+    print("\n✅ Feature update complete!")
+
+
 if __name__ == "__main__":
-    engineer_features()
+    parser = argparse.ArgumentParser(description="Build the block group feature matrix.")
+    parser.add_argument('--changed', nargs='+', metavar='GEOID',
+                        help="recompute only these block groups (and the rows depending on them)")
+    parser.add_argument('--changed-file', help="file of changed GEOIDs, one per line")
+    args = parser.parse_args()
+    engineer_features(changed=read_changed(args.changed, args.changed_file))
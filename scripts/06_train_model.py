@@ -7,6 +7,18 @@ Trains two Random Forest models:
 2. Foreclosure Risk Score (0-100) - predicts foreclosure risk
 
 Models are saved as .pkl files for generating predictions.
+
+With PIPELINE_MODELS=joint (or --multi-output) a single multi-output forest
+predicts both scores instead: one fit, one pickle and one predict() call,
+with splits chosen on the combined error of both targets (see
+trained_models.py for how scripts 07+ load either layout).
+
+By default the models use the fixed hyperparameters in DEFAULT_PARAMS.
+With --search, both targets are tuned together by model_search.py
+(parallel, shared CV folds, successive halving, cached fold models) and
+the best settings per target are used for the final fit:
+
+    python 06_train_model.py --search [--jobs 8] [--no-halving] [--multi-output]
 """
 
 import pandas as pd
@@ -14,133 +26,100 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import mean_absolute_error, r2_score
+import argparse
 import joblib
 import os
 
+from derived_features import SPATIAL_LAG_COLUMNS
+from forest_artifact import artifact_path, export_forest
+from pipeline_paths import MODEL_LAYOUT, county_paths
+from scoring import equity_score, foreclosure_risk
+from storage import read_table
+from trained_models import TARGETS
+
 np.random.seed(42)
 
-def calculate_equity_score(row):
+# Feature columns for ML models
+FEATURE_COLS = [
+    'median_income',
+    'pct_owner_occupied',
+    'pct_cost_burdened',
+    'pct_minority',
+    'median_sale_price',
+    'price_yoy_change',
+    'days_on_market',
+    'affordability_ratio',
+    'cost_burden_pct',
+    'market_liquidity',
+    'owner_stability',
+    'price_to_assessed_ratio',
+] + SPATIAL_LAG_COLUMNS  # neighbor averages (spatial lags) from script 05
+
+# Extra columns the target formulas read
+TARGET_INPUT_COLS = ['foreclosure_rate', 'property_age_estimate']
+
+DEFAULT_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+}
+
+def train_joint_model(X_train, X_test, y_train, y_test, params, cv_stats=None):
     """
-    Calculate Housing Equity Score (0-100).
-    Composite of: affordability, stability, opportunity, quality.
+    Fit one multi-output forest on both targets (columns in TARGETS order)
+    and report per-target test metrics. Returns (model, {target: (r2, mae)}).
     """
-    # 1. Affordability (40% weight) - lower cost burden = higher score
-    affordability = 100 - min(row['cost_burden_pct'], 100)
-
-    # 2. Stability (30% weight) - lower foreclosure risk = higher score
-    stability = 100 - (row['foreclosure_rate'] * 100)
-
-    # 3. Opportunity (20% weight) - proxy: income level vs county median
-    opportunity = min((row['median_income'] / 55000) * 50, 100)
-
-    # 4. Quality (10% weight) - proxy: property age and market liquidity
-    quality = (100 - row['property_age_estimate']) * 0.5 + row['market_liquidity'] * 0.5
-
-    # Weighted average
-    equity_score = (
-        0.40 * affordability +
-        0.30 * stability +
-        0.20 * opportunity +
-        0.10 * quality
+    print("\n🌲 Training Joint Equity + Foreclosure Model (multi-output Random Forest)...")
+    joint_model = RandomForestRegressor(
+        **params,
+        random_state=42,
+        n_jobs=-1
     )
+    joint_model.fit(X_train, y_train)
+
+    # Evaluate each output against its own target
+    y_pred = joint_model.predict(X_test)
+    metrics = {}
+    for i, (target, label) in enumerate(zip(TARGETS, ['Equity Score', 'Foreclosure Risk'])):
+        r2 = r2_score(y_test[:, i], y_pred[:, i])
+        mae = mean_absolute_error(y_test[:, i], y_pred[:, i])
+        metrics[target] = (r2, mae)
+        print(f"   ✓ {label}: R² {r2:.3f}, MAE {mae:.2f} points")
+
+    # Cross-validation (R² averaged over both outputs)
+    if cv_stats:
+        cv_mean, cv_std = cv_stats
+    else:
+        cv_scores = cross_val_score(joint_model, X_train, y_train, cv=5, scoring='r2')
+        cv_mean, cv_std = cv_scores.mean(), cv_scores.std()
+    print(f"   ✓ CV R² (5-fold, both outputs): {cv_mean:.3f} ± {cv_std:.3f}")
+
+    # Feature importance (shared by both outputs)
+    feature_importance = pd.DataFrame({
+        'feature': list(X_train.columns),
+        'importance': joint_model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    print(f"\n   Top 5 Features (both targets):")
+    for _, row in feature_importance.head(5).iterrows():
+        print(f"      {row['feature']}: {row['importance']:.3f}")
 
-    return np.clip(equity_score, 0, 100)
+    return joint_model, metrics
 
 
-def calculate_foreclosure_risk(row):
+def train_separate_models(paths, X_train, X_test, y_equity_train, y_equity_test, y_fc_train, y_fc_test,
+                          equity_params, foreclosure_params, search_cv):
     """
-    Calculate Foreclosure Risk Score (0-100).
-    Based on: cost burden, price volatility, income stability.
+    Fit one forest per target. Returns ({model file: model},
+    {target: (r2, mae)}).
     """
-    # 1. Cost Burden Risk (50% weight)
-    cost_burden_risk = min(row['cost_burden_pct'], 100)
-
-    # 2. Price Volatility Risk (30% weight) - high volatility = higher risk
-    price_volatility = abs(row['price_yoy_change']) * 500  # Scale to 0-100
-    price_volatility = min(price_volatility, 100)
-
-    # 3. Income Risk (20% weight) - low income = higher risk
-    income_risk = max(0, 100 - (row['median_income'] / 75000 * 100))
-
-    # Weighted average
-    foreclosure_risk = (
-        0.50 * cost_burden_risk +
-        0.30 * price_volatility +
-        0.20 * income_risk
-    )
-
-    return np.clip(foreclosure_risk, 0, 100)
-
-
-def train_models():
-    """Train Random Forest models for equity and foreclosure prediction."""
-
-    print("=" * 60)
-    print("STEP 6: TRAIN ML MODELS")
-    print("=" * 60)
-
-    # Load features
-    features_file = '../data/processed/bg_features.csv'
-
-    if not os.path.exists(features_file):
-        print(f"\n❌ Error: {features_file} not found")
-        print("   Run script 05_engineer_features.py first")
-        return
-
-    features = pd.read_csv(features_file)
-    print(f"\n✓ Loaded features: {len(features)} block groups")
-
-    # Create target variables
-    print("\n🎯 Creating target variables...")
-    features['equity_score'] = features.apply(calculate_equity_score, axis=1)
-    features['foreclosure_risk_score'] = features.apply(calculate_foreclosure_risk, axis=1)
-
-    print(f"   Equity Score - Mean: {features['equity_score'].mean():.1f}, Range: [{features['equity_score'].min():.1f}, {features['equity_score'].max():.1f}]")
-    print(f"   Foreclosure Risk - Mean: {features['foreclosure_risk_score'].mean():.1f}, Range: [{features['foreclosure_risk_score'].min():.1f}, {features['foreclosure_risk_score'].max():.1f}]")
-
-    # Define feature columns for ML models
-    feature_cols = [
-        'median_income',
-        'pct_owner_occupied',
-        'pct_cost_burdened',
-        'pct_minority',
-        'median_sale_price',
-        'price_yoy_change',
-        'days_on_market',
-        'affordability_ratio',
-        'cost_burden_pct',
-        'market_liquidity',
-        'owner_stability',
-        'price_to_assessed_ratio'
-    ]
-
-    X = features[feature_cols].copy()
-    y_equity = features['equity_score']
-    y_foreclosure = features['foreclosure_risk_score']
-
-    # Handle any remaining NaNs
-    X = X.fillna(X.median())
-
-    print(f"\n📊 Feature matrix: {X.shape[0]} samples × {X.shape[1]} features")
-
-    # Split data (80/20 train/test)
-    X_train, X_test, y_equity_train, y_equity_test = train_test_split(
-        X, y_equity, test_size=0.2, random_state=42
-    )
-    _, _, y_fc_train, y_fc_test = train_test_split(
-        X, y_foreclosure, test_size=0.2, random_state=42
-    )
-
-    print(f"   Train set: {len(X_train)} samples")
-    print(f"   Test set: {len(X_test)} samples")
+    feature_cols = list(X_train.columns)
 
     # Train Equity Score Model
     print("\n🌲 Training Equity Score Model (Random Forest)...")
     equity_model = RandomForestRegressor(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
+        **equity_params,
         random_state=42,
         n_jobs=-1
     )
@@ -154,9 +133,13 @@ def train_models():
     print(f"   ✓ R² Score: {equity_r2:.3f}")
     print(f"   ✓ MAE: {equity_mae:.2f} points")
 
-    # Cross-validation
-    cv_scores = cross_val_score(equity_model, X_train, y_equity_train, cv=5, scoring='r2')
-    print(f"   ✓ CV R² (5-fold): {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
+    # Cross-validation (already done by the search when it ran)
+    if 'equity' in search_cv:
+        cv_mean, cv_std = search_cv['equity']
+    else:
+        cv_scores = cross_val_score(equity_model, X_train, y_equity_train, cv=5, scoring='r2')
+        cv_mean, cv_std = cv_scores.mean(), cv_scores.std()
+    print(f"   ✓ CV R² (5-fold): {cv_mean:.3f} ± {cv_std:.3f}")
 
     # Feature importance
     feature_importance = pd.DataFrame({
@@ -171,10 +154,7 @@ def train_models():
     # Train Foreclosure Risk Model
     print("\n🌲 Training Foreclosure Risk Model (Random Forest)...")
     foreclosure_model = RandomForestRegressor(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
+        **foreclosure_params,
         random_state=42,
         n_jobs=-1
     )
@@ -189,8 +169,12 @@ def train_models():
     print(f"   ✓ MAE: {fc_mae:.2f} points")
 
     # Cross-validation
-    cv_scores_fc = cross_val_score(foreclosure_model, X_train, y_fc_train, cv=5, scoring='r2')
-    print(f"   ✓ CV R² (5-fold): {cv_scores_fc.mean():.3f} ± {cv_scores_fc.std():.3f}")
+    if 'foreclosure' in search_cv:
+        cv_mean_fc, cv_std_fc = search_cv['foreclosure']
+    else:
+        cv_scores_fc = cross_val_score(foreclosure_model, X_train, y_fc_train, cv=5, scoring='r2')
+        cv_mean_fc, cv_std_fc = cv_scores_fc.mean(), cv_scores_fc.std()
+    print(f"   ✓ CV R² (5-fold): {cv_mean_fc:.3f} ± {cv_std_fc:.3f}")
 
     # Feature importance
     feature_importance_fc = pd.DataFrame({
@@ -202,33 +186,147 @@ def train_models():
     for _, row in feature_importance_fc.head(5).iterrows():
         print(f"      {row['feature']}: {row['importance']:.3f}")
 
-    # Save models
-    os.makedirs('../models', exist_ok=True)
+    trained = {paths['equity_model']: equity_model, paths['foreclosure_model']: foreclosure_model}
+    return trained, {'equity': (equity_r2, equity_mae), 'foreclosure': (fc_r2, fc_mae)}
 
-    equity_model_file = '../models/equity_model.pkl'
-    foreclosure_model_file = '../models/foreclosure_model.pkl'
 
-    print(f"\n💾 Saving models...")
-    joblib.dump(equity_model, equity_model_file)
-    joblib.dump(foreclosure_model, foreclosure_model_file)
+def train_models(paths=None, search=False, jobs=None, halving=True, multi_output=None):
+    """Train Random Forest models for equity and foreclosure prediction."""
+
+    paths = paths or county_paths()
+    if multi_output is None:
+        multi_output = MODEL_LAYOUT == 'joint'
+
+    print("=" * 60)
+    print("STEP 6: TRAIN ML MODELS")
+    print("=" * 60)
+
+    # Load features
+    features_file = paths['features']
+
+    if not os.path.exists(features_file):
+        print(f"\n❌ Error: {features_file} not found")
+        print("   Run script 05_engineer_features.py first")
+        return
+
+    # Only load the columns training needs (Parquet skips the rest on disk)
+    features = read_table(features_file, columns=FEATURE_COLS + TARGET_INPUT_COLS)
+    print(f"\n✓ Loaded features: {len(features)} block groups")
+
+    # Create target variables
+    print("\n🎯 Creating target variables...")
+    features['equity_score'] = equity_score(features)
+    features['foreclosure_risk_score'] = foreclosure_risk(features)
 
-    print(f"   ✓ {equity_model_file}")
-    print(f"   ✓ {foreclosure_model_file}")
+    print(f"   Equity Score - Mean: {features['equity_score'].mean():.1f}, Range: [{features['equity_score'].min():.1f}, {features['equity_score'].max():.1f}]")
+    print(f"   Foreclosure Risk - Mean: {features['foreclosure_risk_score'].mean():.1f}, Range: [{features['foreclosure_risk_score'].min():.1f}, {features['foreclosure_risk_score'].max():.1f}]")
+
+    feature_cols = FEATURE_COLS
+
+    X = features[feature_cols].copy()
+    y_equity = features['equity_score']
+    y_foreclosure = features['foreclosure_risk_score']
+
+    # Handle any remaining NaNs
+    X = X.fillna(X.median())
+
+    print(f"\n📊 Feature matrix: {X.shape[0]} samples × {X.shape[1]} features")
+
+    # Split data (80/20 train/test)
+    X_train, X_test, y_equity_train, y_equity_test = train_test_split(
+        X, y_equity, test_size=0.2, random_state=42
+    )
+    _, _, y_fc_train, y_fc_test = train_test_split(
+        X, y_foreclosure, test_size=0.2, random_state=42
+    )
+
+    print(f"   Train set: {len(X_train)} samples")
+    print(f"   Test set: {len(X_test)} samples")
+
+    # Both targets share the split, so they stack into one (n, 2) target
+    y_joint_train = np.column_stack([y_equity_train, y_fc_train])
+    y_joint_test = np.column_stack([y_equity_test, y_fc_test])
+
+    equity_params = foreclosure_params = joint_params = DEFAULT_PARAMS
+    search_cv = {}
+    if search:
+        from model_search import search_hyperparameters
+
+        print("\n🔍 Searching hyperparameters (both targets, shared folds)...")
+        if multi_output:
+            search_targets = {'joint': y_joint_train}
+        else:
+            search_targets = {'equity': y_equity_train, 'foreclosure': y_fc_train}
+        best, results = search_hyperparameters(
+            X_train, search_targets,
+            cache_dir=paths['search_cache'], jobs=jobs, halving=halving,
+        )
+        results.to_csv(os.path.join(paths['search_cache'], 'results.csv'), index=False)
+        search_cv = {name: (b['cv_r2_mean'], b['cv_r2_std']) for name, b in best.items()}
+        for name, b in best.items():
+            print(f"   ✓ {name.capitalize()}: {b['params']}")
+        if multi_output:
+            joint_params = best['joint']['params']
+        else:
+            equity_params, foreclosure_params = best['equity']['params'], best['foreclosure']['params']
+
+    if multi_output:
+        joint_model, metrics = train_joint_model(
+            X_train, X_test, y_joint_train, y_joint_test, joint_params, search_cv.get('joint')
+        )
+        trained = {paths['joint_model']: joint_model}
+    else:
+        trained, metrics = train_separate_models(
+            paths, X_train, X_test, y_equity_train, y_equity_test, y_fc_train, y_fc_test,
+            equity_params, foreclosure_params, search_cv,
+        )
+    (equity_r2, equity_mae), (fc_r2, fc_mae) = metrics['equity'], metrics['foreclosure']
+
+    # Save models
+    os.makedirs(paths['models_dir'], exist_ok=True)
+
+    print(f"\n💾 Saving models...")
+    for model_file, model in trained.items():
+        joblib.dump(model, model_file)
+        print(f"   ✓ {model_file}")
+        # Flat, memory-mappable copy that scripts 07+ load without unpickling
+        export_forest(model, artifact_path(model_file))
+        print(f"   ✓ {artifact_path(model_file)}")
+
+    # Remove the other layout so loaders never pick up a stale model
+    for stale in [paths['equity_model'], paths['foreclosure_model'], paths['joint_model']]:
+        if stale not in trained:
+            for stale_file in (stale, artifact_path(stale)):
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+                    print(f"   ✓ Removed {stale_file} (other model layout)")
 
     # Summary
     print("\n" + "=" * 60)
     print("MODEL TRAINING SUMMARY")
     print("=" * 60)
+    if multi_output:
+        print("Joint multi-output model (equity + foreclosure)\n")
     print(f"Equity Score Model:")
     print(f"  R²:  {equity_r2:.3f}")
     print(f"  MAE: {equity_mae:.2f} points")
     print(f"\nForeclosure Risk Model:")
     print(f"  R²:  {fc_r2:.3f}")
     print(f"  MAE: {fc_mae:.2f} points")
-    print(f"\nModels saved to: ../models/")
+    print(f"\nModels saved to: {paths['models_dir']}/")
 
     print("\n✅ ML model training complete!")
     print("\n📊 Ready to generate predictions (script 07)")
 
 if __name__ == "__main__":
-    train_models()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--search', action='store_true',
+                        help='tune hyperparameters for both models before the final fit')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes for --search (default: one per CPU)')
+    parser.add_argument('--no-halving', dest='halving', action='store_false',
+                        help='score every candidate at full size instead of successive halving')
+    parser.add_argument('--multi-output', action='store_true', default=None,
+                        help='train one multi-output forest for both targets (default: PIPELINE_MODELS)')
+    args = parser.parse_args()
+    train_models(search=args.search, jobs=args.jobs, halving=args.halving, multi_output=args.multi_output)
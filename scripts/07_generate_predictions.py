@@ -4,98 +4,214 @@ Script 07: Generate Predictions
 
 Loads trained ML models and generates predictions for all block groups.
 Creates final JSON file with all scores for deployment.
+
+Each record also carries a 90% band for both model scores (equity_low/high,
+foreclosure_low/high) from the per-tree predictions; --draws N widens it
+with N re-draws of the synthetic MLS inputs (see uncertainty.py).
+
+Every run also publishes a content-addressed snapshot of the records and a
+diff from the previous one (prediction_snapshots.py), so clients can fetch
+only the block groups whose scores moved. The records and the feature table
+also go into a SQLite analytics store with per-score indexes and
+precomputed rankings and statistics (analytics_store.py).
+
+--stale re-predicts only the block groups whose feature rows script 05
+--changed rewrote since the last run (feature_state.py) and patches their
+records in the existing output.
+
+Usage (from scripts/):
+    python 07_generate_predictions.py                 # scores + per-tree bands
+    python 07_generate_predictions.py --draws 50      # bands over trees x 50 MLS draws
+    python 07_generate_predictions.py --no-intervals  # scores only
+    python 07_generate_predictions.py --stale         # only block groups marked stale
 """
 
+import argparse
+import json
 import pandas as pd
 import numpy as np
-import joblib
-import json
 import os
 
-def calculate_gentrification_risk(row):
+from analytics_store import build_store
+from feature_state import clear_stale, read_stale
+from pipeline_paths import county_paths
+from prediction_snapshots import publish_snapshot
+from predictions_payload import write_predictions_binary, write_predictions_json
+from scoring import gentrification_risk
+from storage import read_table
+from trained_models import feature_columns, load_models, models_available, predict_targets
+
+# Columns used for the output JSON and the gentrification formula
+OUTPUT_COLS = [
+    'GEOID', 'NAME', 'median_income', 'median_sale_price', 'total_population',
+    'days_on_market', 'price_yoy_change', 'pct_minority',
+]
+
+def build_prediction_records(features, equity_predictions, foreclosure_predictions, gentrification_risks,
+                             bands=None):
     """
-    Calculate gentrification risk using rule-based formula.
-    Based on price growth, income, and demographics.
+    One output record per block group, in the bg_predictions.json schema.
+    bands ({'equity': (n, 2), 'foreclosure': (n, 2)} from
+    uncertainty.prediction_intervals) adds <target>_low/_high fields.
+    """
+    output = []
+    for i, row in features.iterrows():
+        record = {
+            'geoid': str(row['GEOID']),
+            'name': str(row['NAME']) if pd.notna(row['NAME']) else '',
+            'equity_score': round(float(equity_predictions[i]), 1),
+            'gentrification_risk': round(float(gentrification_risks.iloc[i]), 1),
+            'foreclosure_risk': round(float(foreclosure_predictions[i]), 1),
+            'median_income': int(row['median_income']) if pd.notna(row['median_income']) else 0,
+            'median_price': int(row['median_sale_price']) if pd.notna(row['median_sale_price']) else 0,
+            'population': int(row['total_population']) if pd.notna(row['total_population']) else 0,
+            'days_on_market': int(row['days_on_market']) if pd.notna(row['days_on_market']) else 0,
+            'price_yoy_change': round(float(row['price_yoy_change']), 4) if pd.notna(row['price_yoy_change']) else 0.0,
+        }
+        if bands is not None:
+            for target in ('equity', 'foreclosure'):
+                low, high = bands[target][i]
+                record[f'{target}_low'] = round(float(low), 1)
+                record[f'{target}_high'] = round(float(high), 1)
+        output.append(record)
+    return output
+
+
+def score_intervals(paths, models, X, draws=0):
+    """Per-tree (and, with draws, per-MLS-draw) bands for both model scores."""
+    from uncertainty import mls_draws, prediction_intervals, stack_draws
+
+    if not draws:
+        return prediction_intervals(models, X, len(X))
+
+    # Derived features and lags are recomputed per draw, so start from the
+    # full feature table rather than the model columns
+    full = read_table(paths['features'])
+    weights = None
+    if any(col.startswith('lag_') for col in X.columns):
+        from adjacency import load_adjacency, spatial_weights
+        weights = spatial_weights(load_adjacency(paths['adjacency']), full['GEOID'])
+    geoids, drawn = mls_draws(paths, draws)
+    stacked = stack_draws(full, geoids, drawn, weights)
+    X_draws = stacked[X.columns].fillna(X.median())
+    return prediction_intervals(models, X_draws, len(full))
+
+
+def previous_records(paths, features, intervals, draws):
+    """
+    The current output records, when --stale can patch them: same block
+    groups in the same order, same band fields, and no MLS re-draws (those
+    are pooled over every block group). None otherwise.
+    """
+    if draws:
+        print("   --draws re-draws every block group; predicting all")
+        return None
+    if not os.path.exists(paths['predictions']):
+        return None
+    with open(paths['predictions']) as f:
+        records = json.load(f)
+    if [r['geoid'] for r in records] != features['GEOID'].astype(str).tolist() \
+            or any(('equity_low' in r) != intervals for r in records):
+        print("   Existing predictions don't match the features; predicting all")
+        return None
+    return records
+
+
+def generate_predictions(paths=None, intervals=True, draws=0, stale=False):
+    """
+    Generate predictions for all block groups using trained models. With
+    intervals, add 90% bands from the per-tree predictions, pooled over
+    `draws` re-draws of the synthetic MLS inputs when draws > 0. With
+    stale, only predict the block groups marked stale by script 05 and
+    keep the other records.
     """
-    # High price growth + low income + minority population = higher risk
-    price_factor = np.clip(row['price_yoy_change'] * 1000, 0, 50)
-    income_factor = max(0, (1 - row['median_income'] / 75000) * 30)
-    displacement_risk = row['pct_minority'] * 20
-
-    gent_risk = price_factor + income_factor + displacement_risk
-    return np.clip(gent_risk, 0, 100)
-
 
-def generate_predictions():
-    """Generate predictions for all block groups using trained models."""
+    paths = paths or county_paths()
 
     print("=" * 60)
     print("STEP 7: GENERATE PREDICTIONS")
     print("=" * 60)
 
     # Load trained models
-    equity_model_file = '../models/equity_model.pkl'
-    foreclosure_model_file = '../models/foreclosure_model.pkl'
-
-    if not os.path.exists(equity_model_file) or not os.path.exists(foreclosure_model_file):
+    if not models_available(paths):
         print("\n❌ Error: Model files not found")
         print("   Run script 06_train_model.py first")
         return
 
     print("\n📥 Loading trained models...")
-    equity_model = joblib.load(equity_model_file)
-    foreclosure_model = joblib.load(foreclosure_model_file)
-    print("   ✓ Models loaded")
+    models = load_models(paths)
+    print(f"   ✓ Models loaded ({', '.join(models)})")
 
     # Load features
-    features_file = '../data/processed/bg_features.csv'
-    features = pd.read_csv(features_file)
+    features_file = paths['features']
+    feature_cols = feature_columns(models)
+    features = read_table(features_file, columns=list(dict.fromkeys(OUTPUT_COLS + feature_cols)))
     print(f"   ✓ Features loaded: {len(features)} block groups")
 
+    previous = previous_records(paths, features, intervals, draws) if stale else None
+    if previous is not None:
+        stale_geoids = set(read_stale(paths))
+        features = features[features['GEOID'].astype(str).isin(stale_geoids)].reset_index(drop=True)
+        print(f"   ✓ {len(features)} stale block groups to re-predict")
+        if features.empty:
+            print("\n✅ Predictions are up to date")
+            return
+
     # Prepare feature matrix
-    feature_cols = equity_model.feature_names_in_
     X = features[feature_cols].copy()
     X = X.fillna(X.median())
 
     print(f"\n🔮 Generating predictions...")
 
     # Generate ML predictions
-    equity_predictions = equity_model.predict(X)
-    foreclosure_predictions = foreclosure_model.predict(X)
+    equity_predictions, foreclosure_predictions = predict_targets(models, X)
 
     # Calculate gentrification risk (rule-based)
-    gentrification_risks = features.apply(calculate_gentrification_risk, axis=1)
+    gentrification_risks = gentrification_risk(features)
 
     print(f"   ✓ Equity Score predictions generated")
     print(f"   ✓ Foreclosure Risk predictions generated")
     print(f"   ✓ Gentrification Risk calculated")
 
+    bands = None
+    if intervals:
+        bands = score_intervals(paths, models, X, draws)
+        source = f"trees x {draws} MLS draws" if draws else "per-tree predictions"
+        print(f"   ✓ 90% bands from {source} "
+              f"(median width: equity {np.median(np.diff(bands['equity'])):.1f}, "
+              f"foreclosure {np.median(np.diff(bands['foreclosure'])):.1f})")
+
     # Create output JSON
     print("\n📊 Creating output JSON...")
 
-    output = []
-    for i, row in features.iterrows():
-        output.append({
-            'geoid': str(row['GEOID']),
-            'name': str(row['NAME']) if pd.notna(row['NAME']) else '',
-            'equity_score': round(float(equity_predictions[i]), 1),
-            'gentrification_risk': round(float(gentrification_risks.iloc[i]), 1),
-            'foreclosure_risk': round(float(foreclosure_predictions[i]), 1),
-            'median_income': int(row['median_income']) if pd.notna(row['median_income']) else 0,
-            'median_price': int(row['median_sale_price']) if pd.notna(row['median_sale_price']) else 0,
-            'population': int(row['total_population']) if pd.notna(row['total_population']) else 0,
-            'days_on_market': int(row['days_on_market']) if pd.notna(row['days_on_market']) else 0,
-            'price_yoy_change': round(float(row['price_yoy_change']), 4) if pd.notna(row['price_yoy_change']) else 0.0,
-        })
+    output = build_prediction_records(
+        features, equity_predictions, foreclosure_predictions, gentrification_risks, bands
+    )
+    if previous is not None:
+        # Predictions are per row, so the other block groups' records still hold
+        updated = {record['geoid']: record for record in output}
+        output = [updated.get(record['geoid'], record) for record in previous]
 
     # Save to JSON
-    output_file = '../data/block_groups/bg_predictions.json'
-    os.makedirs('../data/block_groups', exist_ok=True)
+    output_file = paths['predictions']
+    os.makedirs(paths['block_groups_dir'], exist_ok=True)
 
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    write_predictions_json(output, output_file)
+    write_predictions_binary(output, paths['predictions_bin'])
+    clear_stale(paths)
+    snapshot = publish_snapshot(paths, output)
+    build_store(paths['analytics_db'], output, read_table(features_file))
 
     print(f"   ✓ Saved {len(output)} predictions to {output_file}")
+    print(f"   ✓ Binary payload: {paths['predictions_bin']}")
+    if snapshot is None:
+        print("   ✓ Snapshot unchanged")
+    elif snapshot['diff']:
+        print(f"   ✓ Snapshot {snapshot['id']}: {snapshot['diff']['upserts']} block groups moved, "
+              f"diff {snapshot['diff']['bytes'] / 1024:.1f} KB vs {snapshot['bytes'] / 1024:.1f} KB")
+    else:
+        print(f"   ✓ Snapshot {snapshot['id']} ({snapshot['bytes'] / 1024:.1f} KB, no previous one)")
+    print(f"   ✓ Analytics store: {paths['analytics_db']}")
 
     # Calculate statistics
     equity_scores = [p['equity_score'] for p in output]
@@ -129,8 +245,9 @@ def generate_predictions():
 
     # File size
     file_size_kb = os.path.getsize(output_file) / 1024
+    bin_size_kb = os.path.getsize(paths['predictions_bin']) / 1024
     print(f"\nOutput file: {output_file}")
-    print(f"File size: {file_size_kb:.1f} KB")
+    print(f"File size: {file_size_kb:.1f} KB (binary payload: {bin_size_kb:.1f} KB)")
 
     # Top 5 by each metric
     print(f"\n🏆 TOP 5 AREAS BY EQUITY SCORE:")
@@ -152,9 +269,18 @@ def generate_predictions():
     print("\n🎉 DATA PIPELINE COMPLETE!")
     print("\n📦 Next steps:")
     print("   1. Initialize Next.js app")
-    print("   2. Copy bg_predictions.json and ingham_block_groups.geojson to public/data/")
+    print("   2. Copy bg_predictions.json/.bin and the block group geometry to public/data/")
+    print("      (snapshots: python prediction_snapshots.py --publish ../webapp/public/data/snapshots)")
     print("   3. Build frontend components")
     print("   4. Deploy to Vercel")
 
 if __name__ == "__main__":
-    generate_predictions()
+    parser = argparse.ArgumentParser(description="Generate block group predictions.")
+    parser.add_argument('--no-intervals', dest='intervals', action='store_false',
+                        help="skip the per-tree uncertainty bands")
+    parser.add_argument('--draws', type=int, default=0,
+                        help="re-draws of the synthetic MLS inputs pooled into the bands")
+    parser.add_argument('--stale', action='store_true',
+                        help="only re-predict block groups marked stale by script 05 --changed")
+    args = parser.parse_args()
+    generate_predictions(intervals=args.intervals, draws=args.draws, stale=args.stale)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Geodesic distances and accessibility features for block groups.
+
+Block group points are centroids computed in a local UTM projection (not in
+lon/lat, where centroids are skewed) and converted back to lon/lat. Distances
+are great-circle (haversine) kilometers.
+
+Two ways to get distances to points of interest (POIs):
+- haversine_km() broadcasts over arrays, so all block groups x a handful of
+  named points is one array expression (used for dist_downtown_km).
+- nearest_pois() puts the POIs in a KD-tree on the unit sphere (3-D
+  coordinates, where straight-line order equals great-circle order) and
+  answers nearest-k and within-radius queries without an n x m matrix, so
+  the POI list can grow to hundreds or thousands.
+
+POIs default to POINTS_OF_INTEREST below. Point POI_FILE at a CSV with
+name, category, lon, lat columns to use a different list.
+
+Accessibility block, one row per block group (processed/accessibility_by_bg):
+    dist_downtown_km                distance to the State Capitol
+    dist_nearest_<category>_km      nearest POI of each other category
+    mean_dist_3_nearest_km          mean distance to the 3 nearest POIs
+    poi_within_5km                  POIs within 5 km
+
+Rebuild from an existing GeoJSON without re-downloading TIGER:
+    python accessibility.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Approximate locations; the Capitol is the pipeline's "downtown" point
+POINTS_OF_INTEREST = [
+    {'name': 'Michigan State Capitol', 'category': 'downtown', 'lon': -84.5555, 'lat': 42.7325},
+    {'name': 'Michigan State University', 'category': 'education', 'lon': -84.4822, 'lat': 42.7284},
+    {'name': 'Lansing Community College', 'category': 'education', 'lon': -84.5496, 'lat': 42.7369},
+    {'name': 'Sparrow Hospital', 'category': 'hospital', 'lon': -84.5332, 'lat': 42.7334},
+    {'name': 'McLaren Greater Lansing', 'category': 'hospital', 'lon': -84.4395, 'lat': 42.7041},
+    {'name': 'GM Lansing Grand River Assembly', 'category': 'employer', 'lon': -84.5660, 'lat': 42.7224},
+    {'name': 'GM Lansing Delta Township Assembly', 'category': 'employer', 'lon': -84.6735, 'lat': 42.7196},
+]
+
+DOWNTOWN = 'Michigan State Capitol'
+NEAREST_K = 3
+RADIUS_KM = 5.0
+
+
+def load_points_of_interest(path=None):
+    """POIs as a DataFrame (name, category, lon, lat) from path, POI_FILE, or the defaults."""
+    path = path or os.environ.get('POI_FILE')
+    if path:
+        pois = pd.read_csv(path)
+        missing = {'name', 'category', 'lon', 'lat'} - set(pois.columns)
+        if missing:
+            raise ValueError(f"{path} is missing POI columns: {sorted(missing)}")
+        return pois
+    return pd.DataFrame(POINTS_OF_INTEREST)
+
+
+def block_group_points(gdf):
+    """(lon, lat) arrays of block group centroids, computed in a projected CRS."""
+    projected = gdf.geometry.to_crs(gdf.estimate_utm_crs())
+    centroids = projected.centroid.to_crs(epsg=4326)
+    return centroids.x.to_numpy(), centroids.y.to_numpy()
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """Great-circle distance in km; broadcasts like any NumPy expression."""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(a, dtype=float)) for a in (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def distance_matrix_km(lon, lat, poi_lon, poi_lat):
+    """Dense (n_points, n_pois) haversine matrix in one broadcast operation."""
+    return haversine_km(
+        np.asarray(lon)[:, None], np.asarray(lat)[:, None],
+        np.asarray(poi_lon)[None, :], np.asarray(poi_lat)[None, :],
+    )
+
+
+def _unit_vectors(lon, lat):
+    lon, lat = np.radians(lon), np.radians(lat)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def _km_to_chord(km):
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+
+def build_poi_tree(poi_lon, poi_lat):
+    from scipy.spatial import cKDTree
+
+    return cKDTree(_unit_vectors(np.asarray(poi_lon, dtype=float), np.asarray(poi_lat, dtype=float)))
+
+
+def nearest_pois(lon, lat, tree, k=1):
+    """
+    k nearest POIs in tree for every point: (distances_km, indices), each
+    (n, k). Exact great-circle order; no n x m matrix is built.
+    """
+    chord, index = tree.query(_unit_vectors(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)), k=k)
+    chord, index = np.asarray(chord).reshape(len(chord), -1), np.asarray(index).reshape(len(index), -1)
+    return _chord_to_km(chord), index
+
+
+def count_within_km(lon, lat, tree, radius_km):
+    """Number of POIs within radius_km of every point."""
+    points = _unit_vectors(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float))
+    return tree.query_ball_point(points, r=_km_to_chord(radius_km), return_length=True)
+
+
+def accessibility_features(gdf, pois=None, k=NEAREST_K, radius_km=RADIUS_KM):
+    """Accessibility block for a GeoDataFrame of block groups (GEOID + geometry)."""
+    pois = load_points_of_interest() if pois is None else pois
+    lon, lat = block_group_points(gdf)
+
+    out = pd.DataFrame({'GEOID': gdf['GEOID'].astype(str).to_numpy()})
+
+    downtown = pois[pois['name'] == DOWNTOWN]
+    if len(downtown):
+        out['dist_downtown_km'] = distance_matrix_km(
+            lon, lat, downtown['lon'].to_numpy(), downtown['lat'].to_numpy()
+        )[:, 0]
+
+    # 'downtown' is already covered by dist_downtown_km
+    for category, group in pois[pois['category'] != 'downtown'].groupby('category', sort=True):
+        dist, _ = nearest_pois(lon, lat, build_poi_tree(group['lon'], group['lat']))
+        out[f'dist_nearest_{category}_km'] = dist[:, 0]
+
+    tree = build_poi_tree(pois['lon'], pois['lat'])
+    dist, _ = nearest_pois(lon, lat, tree, k=min(k, len(pois)))
+    out[f'mean_dist_{k}_nearest_km'] = dist.mean(axis=1)
+    out[f'poi_within_{radius_km:g}km'] = count_within_km(lon, lat, tree, radius_km)
+
+    return out
+
+
+if __name__ == "__main__":
+    import geopandas as gpd
+    from pipeline_paths import county_paths
+    from storage import write_table
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    paths = county_paths()
+
+    print(f"📍 Building accessibility features from {paths['block_groups']}...")
+    access = accessibility_features(gpd.read_file(paths['block_groups']))
+    os.makedirs(paths['processed_dir'], exist_ok=True)
+    write_table(access, paths['accessibility'], 'accessibility')
+    print(f"   ✓ {paths['accessibility']}: {len(access)} block groups, "
+          f"{len(access.columns) - 1} features")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Polygon adjacency graph for block groups.
+
+Two block groups are neighbors when their polygons touch:
+- queen contiguity: any shared boundary point, including a single corner
+- rook contiguity:  a shared border of non-zero length
+
+Candidate pairs come from one bulk STRtree query (bounding-box overlap plus
+an `intersects` test), so build time grows roughly as n log n and a
+statewide set of block groups takes seconds rather than the n^2 pairwise
+tests a naive loop would need.
+
+The graph is stored in CSR form next to the GeoJSON,
+ingham_block_groups.adjacency.json:
+
+    {"version": 1, "contiguity": "queen",
+     "geoids":  [...],            # node order
+     "indptr":  [0, 5, 11, ...],  # len(geoids) + 1
+     "indices": [3, 17, ...]}     # neighbors of node i: indices[indptr[i]:indptr[i + 1]]
+
+so the neighbors of one block group are an O(degree) slice.
+
+Rebuild from an existing GeoJSON without re-downloading TIGER:
+    python adjacency.py
+    python adjacency.py --contiguity rook
+"""
+
+import json
+import os
+
+import numpy as np
+
+VERSION = 1
+CONTIGUITY = ('queen', 'rook')
+
+
+def build_adjacency(gdf, contiguity='queen'):
+    """Build the CSR adjacency graph for a GeoDataFrame with a GEOID column."""
+    import shapely  # only needed to build; loading/querying the graph is pure NumPy
+
+    if contiguity not in CONTIGUITY:
+        raise ValueError(f"contiguity must be one of {CONTIGUITY}, got {contiguity!r}")
+
+    geoms = np.asarray(gdf.geometry.values)
+    tree = shapely.STRtree(geoms)
+    left, right = tree.query(geoms, predicate='intersects')
+
+    # Each pair is reported from both sides; keep one direction for the tests
+    pair = left < right
+    left, right = left[pair], right[pair]
+
+    if contiguity == 'rook' and len(left):
+        boundaries = shapely.boundary(geoms)
+        shared = shapely.length(shapely.intersection(boundaries[left], boundaries[right]))
+        left, right = left[shared > 0], right[shared > 0]
+
+    n = len(geoms)
+    rows = np.concatenate([left, right])
+    cols = np.concatenate([right, left])
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+    return {
+        'contiguity': contiguity,
+        'geoids': gdf['GEOID'].astype(str).tolist(),
+        'indptr': indptr,
+        'indices': cols.astype(np.int64),
+    }
+
+
+def write_adjacency(graph, path):
+    with open(path, 'w') as f:
+        json.dump({
+            'version': VERSION,
+            'contiguity': graph['contiguity'],
+            'geoids': graph['geoids'],
+            'indptr': graph['indptr'].tolist(),
+            'indices': graph['indices'].tolist(),
+        }, f, separators=(',', ':'))
+
+
+def load_adjacency(path):
+    """Load a graph written by write_adjacency(), with a GEOID -> node lookup."""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != VERSION:
+        raise ValueError(f"Unsupported adjacency file version {data.get('version')}")
+    return {
+        'contiguity': data['contiguity'],
+        'geoids': data['geoids'],
+        'indptr': np.asarray(data['indptr'], dtype=np.int64),
+        'indices': np.asarray(data['indices'], dtype=np.int64),
+        'position': {g: i for i, g in enumerate(data['geoids'])},
+    }
+
+
+def neighbors(graph, geoid):
+    """GEOIDs adjacent to geoid (graph from load_adjacency())."""
+    i = graph['position'][str(geoid)]
+    geoids = graph['geoids']
+    return [geoids[j] for j in graph['indices'][graph['indptr'][i]:graph['indptr'][i + 1]]]
+
+
+def spatial_weights(graph, geoids):
+    """
+    Row-standardized sparse weights matrix W (scipy CSR) aligned to geoids:
+    W[i, j] = 1 / degree(i) when block groups i and j are adjacent, so W @ x
+    is the neighbor average of x. GEOIDs missing from the graph, and graph
+    nodes missing from geoids, simply have no edges.
+    """
+    from scipy import sparse
+
+    n = len(geoids)
+    frame_pos = {str(g): i for i, g in enumerate(geoids)}
+    node_to_row = np.array([frame_pos.get(g, -1) for g in graph['geoids']], dtype=np.int64)
+
+    node_rows = np.repeat(np.arange(len(graph['geoids'])), np.diff(graph['indptr']))
+    rows, cols = node_to_row[node_rows], node_to_row[graph['indices']]
+    keep = (rows >= 0) & (cols >= 0)
+    rows, cols = rows[keep], cols[keep]
+
+    degree = np.bincount(rows, minlength=n)
+    data = 1.0 / degree[rows]
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+
+def degree_summary(graph):
+    degree = np.diff(graph['indptr'])
+    return {
+        'nodes': len(degree),
+        'edges': int(degree.sum()) // 2,
+        'mean_degree': float(degree.mean()) if len(degree) else 0.0,
+        'max_degree': int(degree.max()) if len(degree) else 0,
+        'isolated': int((degree == 0).sum()),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import geopandas as gpd
+    from pipeline_paths import county_paths
+
+    parser = argparse.ArgumentParser(description="Build the block group adjacency graph.")
+    parser.add_argument('--contiguity', choices=CONTIGUITY, default='queen')
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    paths = county_paths()
+    geojson_file = paths['block_groups']
+
+    print(f"🕸️  Building {args.contiguity} adjacency from {geojson_file}...")
+    graph = build_adjacency(gpd.read_file(geojson_file), args.contiguity)
+    output_file = paths['adjacency']
+    write_adjacency(graph, output_file)
+    summary = degree_summary(graph)
+    print(f"   ✓ {output_file}: {summary['edges']} edges, "
+          f"mean degree {summary['mean_degree']:.1f}, max {summary['max_degree']}")
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Embedded analytical store for block group queries (written by script 07).
+
+The webapp's chat tools (getBlockGroupData, findTopAreas, compareBlockGroups,
+getAreaStatistics in webapp/lib/ai-tools.ts) sort and scan the whole
+predictions array on every call. Script 07 also writes the predictions
+and the feature table into one SQLite file, bg_analytics.sqlite, next to
+bg_predictions.json:
+
+    predictions    one row per block group (bg_predictions.json fields, plus
+                   its position in that file), keyed by geoid, with an index
+                   on (metric, position) for every RANKED_METRICS column
+    features       the bg_features table, keyed by GEOID
+    county_stats   count, mean, min, max, total and count above HIGH_RISK
+                   per numeric field, computed at build time
+    top_blocks     the TOP_N highest and lowest block groups per ranked metric
+
+so a lookup is one primary-key probe, statistics one row, and rankings up to
+TOP_N a range scan of top_blocks; longer rankings walk the metric's index.
+Ties rank in file order, as the stable sort in findTopAreas does.
+
+AnalyticsStore answers the chat tools' queries from the file;
+top_areas(), compare_block_groups() and area_statistics() compute the same
+answers from the records in memory, as ai-tools.ts does, and
+validate_store() checks the two agree:
+    python analytics_store.py              # rebuild from bg_predictions.json and validate
+    python analytics_store.py --validate   # validate the existing file
+
+SQLite ships with Python, so the store needs no extra dependency; readers in
+other languages open the same file read-only.
+"""
+
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# Columns of the predictions table, in bg_predictions.json order
+PREDICTION_COLUMNS = {
+    'geoid': 'TEXT', 'name': 'TEXT',
+    'equity_score': 'REAL', 'gentrification_risk': 'REAL', 'foreclosure_risk': 'REAL',
+    'median_income': 'INTEGER', 'median_price': 'INTEGER', 'population': 'INTEGER',
+    'days_on_market': 'INTEGER', 'price_yoy_change': 'REAL',
+    'equity_low': 'REAL', 'equity_high': 'REAL', 'foreclosure_low': 'REAL', 'foreclosure_high': 'REAL',
+}
+
+# Metrics findTopAreas ranks by
+RANKED_METRICS = ['equity_score', 'gentrification_risk', 'foreclosure_risk', 'median_income']
+SCORE_METRICS = ['equity_score', 'gentrification_risk', 'foreclosure_risk']
+TOP_N = 100
+HIGH_RISK = 70
+
+ORDERS = ('highest', 'lowest')
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if dtype.kind in 'iub':
+        return 'INTEGER'
+    if dtype.kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+# -- Reference answers, computed from the records as webapp/lib/ai-tools.ts does --
+
+def top_areas(records, metric, limit=5, order='highest'):
+    """findTopAreas: records sorted by metric (stable, so ties keep file order), first limit."""
+    return sorted(records, key=lambda r: -r[metric] if order == 'highest' else r[metric])[:limit]
+
+
+def compare_block_groups(bg1, bg2):
+    """compareBlockGroups: differences between two records, plus the records."""
+    return {
+        'comparison': {
+            'equity_score_diff': bg1['equity_score'] - bg2['equity_score'],
+            'gentrification_risk_diff': bg1['gentrification_risk'] - bg2['gentrification_risk'],
+            'foreclosure_risk_diff': bg1['foreclosure_risk'] - bg2['foreclosure_risk'],
+            'income_diff': bg1['median_income'] - bg2['median_income'],
+            'price_diff': bg1['median_price'] - bg2['median_price'],
+        },
+        'bg1': bg1,
+        'bg2': bg2,
+    }
+
+
+def _statistics_summary(count, stats):
+    """getAreaStatistics' shape from per-metric {mean, min, max, total, high_count}."""
+    return {
+        'count': count,
+        'equity_score': {k: stats['equity_score'][k] for k in ('mean', 'min', 'max')},
+        'gentrification_risk': {'mean': stats['gentrification_risk']['mean'],
+                                'high_risk_count': stats['gentrification_risk']['high_count']},
+        'foreclosure_risk': {'mean': stats['foreclosure_risk']['mean'],
+                             'high_risk_count': stats['foreclosure_risk']['high_count']},
+        'total_population': stats['population']['total'],
+    }
+
+
+def column_stats(values):
+    """{count, mean, min, max, total, high_count} of a numeric column; min, max and total keep its type."""
+    values = np.asarray(values)
+    return {
+        'count': len(values),
+        'mean': float(values.mean()) if len(values) else None,
+        'min': values.min().item() if len(values) else None,
+        'max': values.max().item() if len(values) else None,
+        'total': values.sum().item(),
+        'high_count': int((values > HIGH_RISK).sum()),
+    }
+
+
+def area_statistics(records):
+    """getAreaStatistics over the records."""
+    stats = {metric: column_stats([r[metric] for r in records]) for metric in SCORE_METRICS + ['population']}
+    return _statistics_summary(len(records), stats)
+
+
+# -- Build --
+
+def build_store(path, records, features=None):
+    """
+    Write records (bg_predictions.json schema) and the features DataFrame
+    (optional) to a fresh SQLite file at path. The file is built next to
+    path and moved into place, so readers never see a partial store.
+    """
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    columns = [col for col in PREDICTION_COLUMNS if not records or col in records[0]]
+
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+        definitions = ', '.join(f'{col} {PREDICTION_COLUMNS[col]}' for col in columns)
+        conn.execute(f'CREATE TABLE predictions ({definitions}, position INTEGER NOT NULL, '
+                     'PRIMARY KEY (geoid)) WITHOUT ROWID')
+        conn.executemany(
+            f'INSERT INTO predictions VALUES ({", ".join("?" * (len(columns) + 1))})',
+            ([r[col] for col in columns] + [i] for i, r in enumerate(records)),
+        )
+        for metric in RANKED_METRICS:
+            conn.execute(f'CREATE INDEX predictions_{metric} ON predictions ({metric}, position)')
+
+        conn.execute('CREATE TABLE county_stats (metric TEXT PRIMARY KEY, count INTEGER, mean REAL, '
+                     'min, max, total, high_count INTEGER) WITHOUT ROWID')
+        numeric = [col for col in columns if PREDICTION_COLUMNS[col] != 'TEXT']
+        conn.executemany(
+            'INSERT INTO county_stats VALUES (:metric, :count, :mean, :min, :max, :total, :high_count)',
+            ({'metric': col, **column_stats([r[col] for r in records])} for col in numeric),
+        )
+
+        conn.execute('CREATE TABLE top_blocks (metric TEXT, direction TEXT, rank INTEGER, geoid TEXT, '
+                     'PRIMARY KEY (metric, direction, rank)) WITHOUT ROWID')
+        for metric in RANKED_METRICS:
+            values = np.array([r[metric] for r in records], dtype=float)
+            for order in ORDERS:
+                # Stable sort: ties keep file order, as findTopAreas' sort does
+                ranked = np.argsort(-values if order == 'highest' else values, kind='stable')[:TOP_N]
+                conn.executemany('INSERT INTO top_blocks VALUES (?, ?, ?, ?)',
+                                 ((metric, order, rank, records[i]['geoid']) for rank, i in enumerate(ranked)))
+
+        if features is not None:
+            names = list(features.columns)
+            definitions = ', '.join(f'{_quote(col)} {_sql_type(features[col].dtype)}' for col in names)
+            conn.execute(f'CREATE TABLE features ({definitions}, PRIMARY KEY ("GEOID")) WITHOUT ROWID')
+            frame = features.astype(object).where(features.notna(), None)
+            conn.executemany(f'INSERT INTO features VALUES ({", ".join("?" * len(names))})',
+                             frame.itertuples(index=False, name=None))
+
+        conn.commit()
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+# -- Queries --
+
+class AnalyticsStore:
+    """Read-only queries on a store written by build_store(); see the module docstring."""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported analytics store version {version}")
+        # position is the last column; records leave it out
+        self.columns = [row[1] for row in self.conn.execute('PRAGMA table_info(predictions)')][:-1]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _records(self, rows):
+        return [dict(zip(self.columns, row)) for row in rows]
+
+    def block_group(self, geoid):
+        """getBlockGroupData: the record of one block group, or None."""
+        rows = self.conn.execute('SELECT * FROM predictions WHERE geoid = ?', (geoid,)).fetchall()
+        return self._records(rows)[0] if rows else None
+
+    def top_block_groups(self, metric, limit=5, order='highest'):
+        """findTopAreas: the first limit block groups by metric."""
+        if metric not in RANKED_METRICS or order not in ORDERS:
+            raise ValueError(f"metric must be one of {RANKED_METRICS} and order one of {ORDERS}")
+        if limit <= TOP_N:
+            rows = self.conn.execute(
+                'SELECT p.* FROM top_blocks t JOIN predictions p ON p.geoid = t.geoid '
+                'WHERE t.metric = ? AND t.direction = ? ORDER BY t.rank LIMIT ?',
+                (metric, order, limit),
+            )
+        else:
+            direction = 'DESC' if order == 'highest' else 'ASC'
+            rows = self.conn.execute(
+                f'SELECT * FROM predictions ORDER BY {metric} {direction}, position LIMIT ?', (limit,))
+        return self._records(rows)
+
+    def compare_block_groups(self, geoid1, geoid2):
+        """compareBlockGroups, or None when either block group is missing."""
+        bg1, bg2 = self.block_group(geoid1), self.block_group(geoid2)
+        if bg1 is None or bg2 is None:
+            return None
+        return compare_block_groups(bg1, bg2)
+
+    def area_statistics(self):
+        """getAreaStatistics, from the precomputed county_stats rows."""
+        cursor = self.conn.execute('SELECT * FROM county_stats')
+        names = [d[0] for d in cursor.description]
+        stats = {row[0]: dict(zip(names, row)) for row in cursor}
+        return _statistics_summary(stats['equity_score']['count'], stats)
+
+    def features(self, geoid):
+        """The feature row of one block group, or None."""
+        cursor = self.conn.execute('SELECT * FROM features WHERE "GEOID" = ?', (geoid,))
+        row = cursor.fetchone()
+        return dict(zip([d[0] for d in cursor.description], row)) if row else None
+
+
+# -- Validation --
+
+def _close(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_close(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return bool(np.isclose(a, b, rtol=1e-12, atol=1e-9))
+    return a == b
+
+
+def validate_store(path, records, features=None, limits=(1, 5, TOP_N, TOP_N + 25)):
+    """
+    Compare every store query with the in-memory answer over records (and
+    the features DataFrame). Returns a list of mismatch descriptions.
+    """
+    problems = []
+    with AnalyticsStore(path) as store:
+        by_geoid = {r['geoid']: r for r in records}
+        for record in records:
+            if not _close(record, store.block_group(record['geoid'])):
+                problems.append(f"block_group({record['geoid']})")
+        if store.block_group('not-a-geoid') is not None:
+            problems.append("block_group(missing)")
+
+        for metric in RANKED_METRICS:
+            for order in ORDERS:
+                for limit in limits:
+                    if not _close(top_areas(records, metric, limit, order),
+                                  store.top_block_groups(metric, limit, order)):
+                        problems.append(f"top_block_groups({metric}, {limit}, {order})")
+
+        geoids = list(by_geoid)
+        for a, b in zip(geoids[::7], geoids[3::7]):
+            if not _close(compare_block_groups(by_geoid[a], by_geoid[b]), store.compare_block_groups(a, b)):
+                problems.append(f"compare_block_groups({a}, {b})")
+
+        if not _close(area_statistics(records), store.area_statistics()):
+            problems.append("area_statistics()")
+
+        if features is not None:
+            for row in features.astype(object).where(features.notna(), None).to_dict('records')[::11]:
+                if not _close(row, store.features(row['GEOID'])):
+                    problems.append(f"features({row['GEOID']})")
+    return problems
+
+
+def main():
+    import json
+
+    from pipeline_paths import county_paths
+    from storage import read_table
+
+    parser = argparse.ArgumentParser(description="Build and validate the analytics store.")
+    parser.add_argument('--validate', action='store_true', help="only validate the existing store")
+    args = parser.parse_args()
+
+    paths = county_paths()
+    with open(paths['predictions']) as f:
+        records = json.load(f)
+    features = read_table(paths['features']) if os.path.exists(paths['features']) else None
+
+    if not args.validate:
+        build_store(paths['analytics_db'], records, features)
+        print(f"✓ Wrote {paths['analytics_db']} ({os.path.getsize(paths['analytics_db']) / 1024:.0f} KB)")
+
+    problems = validate_store(paths['analytics_db'], records, features)
+    for problem in problems:
+        print(f"❌ Mismatch: {problem}")
+    if problems:
+        raise SystemExit(1)
+    print(f"✓ Store matches {paths['predictions']} on every query ({len(records)} block groups)")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    main()
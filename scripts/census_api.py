@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Chunked, concurrent, retrying requests to the Census Data API.
+
+The API takes at most 50 variables per call, and block group queries must
+name one county (`for=block group:*&in=state:SS county:CCC`). A fetch of
+any size is split into API-legal chunks: variables in groups of
+VARIABLES_PER_CALL (NAME travels with the first group) times one call per
+county. Chunks run concurrently on a thread pool over one pooled
+requests.Session and go through http_cache, so repeated runs are served
+from disk. Responses are the API's JSON arrays (header row first); chunks
+are stacked across counties and joined column-wise on GEOID.
+
+Throttling (429) and server errors (5xx), connection errors and timeouts
+are retried up to MAX_RETRIES times with full-jitter exponential backoff
+(a random wait up to BACKOFF_BASE * 2**attempt, capped at BACKOFF_MAX),
+or after Retry-After when the server sends one. Other errors fail the
+fetch at once.
+
+Configuration (environment variables):
+    CENSUS_API_URL   API root (default https://api.census.gov/data), e.g.
+                     a local stub for benchmarks/bench_census_fetch.py
+    CENSUS_API_KEY   optional key, sent with every call
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+import http_cache
+
+CENSUS_API_URL = os.environ.get('CENSUS_API_URL', 'https://api.census.gov/data').rstrip('/')
+
+# The API rejects calls with more than 50 variables; NAME counts as one
+VARIABLES_PER_CALL = 49
+
+# Concurrent requests (and pooled connections) to the Census servers
+MAX_CONNECTIONS = 4
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_MAX = 30.0
+
+GEOGRAPHY_COLUMNS = ['state', 'county', 'tract', 'block group']
+
+
+def acs_url(year):
+    return f'{CENSUS_API_URL}/{year}/acs/acs5'
+
+
+def pooled_session(connections=MAX_CONNECTIONS):
+    """A requests.Session holding at most `connections` connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=connections, pool_maxsize=connections, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def chunk_variables(variables, size=VARIABLES_PER_CALL):
+    """Split variable codes into lists of at most `size`."""
+    variables = list(variables)
+    return [variables[i:i + size] for i in range(0, len(variables), size)]
+
+
+def block_group_requests(variables, counties):
+    """
+    Query params for every API-legal chunk: one per (variable group, county).
+    counties is a list of (state_fips, county_fips). Returns (group index,
+    params) pairs; group 0 also asks for NAME.
+    """
+    chunks = []
+    for group, codes in enumerate(chunk_variables(variables)):
+        get = ','.join((['NAME'] if group == 0 else []) + codes)
+        for state_fips, county_fips in counties:
+            params = {
+                'get': get,
+                'for': 'block group:*',
+                'in': f'state:{state_fips} county:{county_fips}',
+            }
+            api_key = os.environ.get('CENSUS_API_KEY')
+            if api_key:
+                params['key'] = api_key
+            chunks.append((group, params))
+    return chunks
+
+
+def backoff_delay(attempt, response=None):
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def fetch_json_with_retry(url, params, session=None, timeout=30, retries=MAX_RETRIES):
+    """http_cache.fetch_json(), retrying throttling, server and network errors."""
+    for attempt in range(retries + 1):
+        try:
+            return http_cache.fetch_json(url, params=params, timeout=timeout, session=session)
+        except http_cache.CacheMiss:
+            raise
+        except requests.exceptions.HTTPError as e:
+            response = e.response
+            if response is None or response.status_code not in RETRY_STATUS or attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt, response))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+def rows_to_frame(data):
+    """An API JSON array (header row + rows) as a DataFrame with GEOID."""
+    df = pd.DataFrame(data[1:], columns=data[0])
+    df['GEOID'] = df['state'] + df['county'] + df['tract'] + df['block group']
+    return df
+
+
+def merge_chunks(chunks, frames):
+    """
+    Stack each variable group's frames across counties, then join the
+    groups column-wise on GEOID (rows in the order of group 0).
+    """
+    groups = {}
+    for (group, _), frame in zip(chunks, frames):
+        groups.setdefault(group, []).append(frame)
+
+    merged = None
+    for group in sorted(groups):
+        frame = pd.concat(groups[group], ignore_index=True)
+        if merged is None:
+            merged = frame
+        else:
+            frame = frame.drop(columns=GEOGRAPHY_COLUMNS)
+            merged = merged.merge(frame, on='GEOID', how='outer', sort=False)
+    return merged
+
+
+def submit_block_groups(pool, year, variables, counties, session=None):
+    """Queue every chunk of one ACS 5-year fetch on pool; returns (chunks, futures)."""
+    chunks = block_group_requests(variables, counties)
+    futures = [pool.submit(fetch_json_with_retry, acs_url(year), params, session)
+               for _, params in chunks]
+    return chunks, futures
+
+
+def collect_block_groups(chunks, futures):
+    """Wait for submit_block_groups() futures; the merged table or the first error."""
+    return merge_chunks(chunks, [rows_to_frame(future.result()) for future in futures])
+
+
+def fetch_block_groups(year, variables, counties, session=None, connections=MAX_CONNECTIONS):
+    """
+    ACS 5-year block group data for any number of variables and counties:
+    GEOID, NAME, the geography columns and one string column per variable.
+    """
+    own_session = session is None
+    session = session or pooled_session(connections)
+    try:
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            chunks, futures = submit_block_groups(pool, year, variables, counties, session)
+            return collect_block_groups(chunks, futures)
+    finally:
+        if own_session:
+            session.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Multi-year ACS panel: block group x year, on 2020 block group boundaries.
+
+Script 02 fetches every ACS 5-year vintage in ACS_YEARS (default 2013-2022,
+the years the API publishes block groups for) concurrently over one pooled
+session (see census_api.py), and writes three tables:
+
+- census_by_bg:         the latest vintage, as before
+- census_panel_by_bg:   one row per (GEOID, year)
+- census_trends_by_bg:  one row per GEOID with year-over-year and trend features
+
+Vintages up to 2019 use 2010 block groups. They are moved onto 2020 block
+groups with the Census Bureau's block group relationship file: each 2010
+block group's counts are split across the 2020 block groups it overlaps in
+proportion to shared land area, and medians become averages of the
+overlapping 2010 medians weighted by the households (income) or owner units
+(home value) apportioned to the 2020 block group. Set ACS_CROSSWALK_FILE to
+a CSV with GEOID_10, GEOID_20 and weight columns (e.g. a population-weighted
+NHGIS crosswalk) to use other weights.
+
+ACS 5-year estimates for consecutive vintages share four of their five
+survey years, so year-over-year changes are damped; the `_trend` features
+(least-squares slope over all vintages) are the better signal for direction.
+Dollar amounts are nominal.
+
+Configuration (environment variables):
+    ACS_YEARS             vintages, e.g. '2013-2022' or '2019,2021,2022'
+    ACS_CROSSWALK_FILE    custom 2010 -> 2020 block group weights (CSV)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+import http_cache
+from census_api import MAX_CONNECTIONS, collect_block_groups, pooled_session, submit_block_groups
+
+ACS_YEARS = os.environ.get('ACS_YEARS', '2013-2022')
+ACS_CROSSWALK_FILE = os.environ.get('ACS_CROSSWALK_FILE')
+
+# First vintage on 2020 block groups
+GEOGRAPHY_2020 = 2020
+
+CROSSWALK_URL = ('https://www2.census.gov/geo/docs/maps-data/data/rel2020/blkgrp/'
+                 'tab20_blkgrp20_blkgrp10_natl.txt')
+
+# ACS 5-year variables fetched for every vintage
+ACS_VARIABLES = {
+    'B19013_001E': 'median_income',          # Median household income
+    'B25003_001E': 'total_units',            # Total housing units
+    'B25003_002E': 'owner_occupied',         # Owner-occupied units
+    'B25003_003E': 'renter_occupied',        # Renter-occupied units
+    'B25070_010E': 'rent_burden_50pct',      # Renters paying ≥50% income on rent
+    'B25070_001E': 'total_renters',          # Total renter households
+    'B01003_001E': 'total_population',       # Total population
+    'B02001_002E': 'white_population',       # White population
+    'B02001_003E': 'black_population',       # Black population
+    'B25077_001E': 'median_home_value',      # Median home value
+}
+
+# Medians and the count each is weighted by when block groups are combined
+MEDIAN_WEIGHTS = {
+    'median_income': 'total_units',
+    'median_home_value': 'owner_occupied',
+}
+COUNT_COLUMNS = [name for name in ACS_VARIABLES.values() if name not in MEDIAN_WEIGHTS]
+
+SHARE_COLUMNS = ['pct_owner_occupied', 'pct_renter_occupied', 'pct_cost_burdened', 'pct_minority']
+
+PANEL_COLUMNS = ['GEOID', 'year'] + list(ACS_VARIABLES.values()) + SHARE_COLUMNS
+
+# Panel columns that get trend features: 'growth' columns change by a
+# relative rate (log scale), 'level' columns (shares) by absolute points
+TREND_COLUMNS = {
+    'median_income': 'growth',
+    'median_home_value': 'growth',
+    'total_population': 'growth',
+    'total_units': 'growth',
+    'pct_owner_occupied': 'level',
+    'pct_cost_burdened': 'level',
+    'pct_minority': 'level',
+}
+
+# Fewer vintages than this leave a block group's trend empty
+MIN_TREND_POINTS = 3
+
+
+def parse_years(spec=None):
+    """'2013-2022' or '2019,2021,2022' -> sorted list of years."""
+    years = set()
+    for part in (spec or ACS_YEARS).split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = part.split('-')
+            years.update(range(int(first), int(last) + 1))
+        elif part:
+            years.add(int(part))
+    if not years:
+        raise ValueError(f"No ACS years in {spec!r}")
+    return sorted(years)
+
+
+def vintage_frame(df):
+    """
+    Name and parse the ACS_VARIABLES columns of a census_api fetch: GEOID,
+    NAME and numeric columns (Census sentinel values left as-is).
+    """
+    for code, name in ACS_VARIABLES.items():
+        if code in df.columns:
+            df[name] = pd.to_numeric(df[code], errors='coerce')
+    return df
+
+
+def add_share_columns(df):
+    """Tenure, cost burden and minority shares from the count columns (in place)."""
+    df['pct_owner_occupied'] = (df['owner_occupied'] / df['total_units']).fillna(0)
+    df['pct_renter_occupied'] = (df['renter_occupied'] / df['total_units']).fillna(0)
+    df['pct_cost_burdened'] = (df['rent_burden_50pct'] / df['total_renters']).fillna(0)
+    df['pct_minority'] = (1 - (df['white_population'] / df['total_population'])).fillna(0)
+
+    # Clip percentages to [0, 1]
+    for col in SHARE_COLUMNS:
+        df[col] = df[col].clip(0, 1)
+    return df
+
+
+def load_crosswalk(state_fips, county_fips, session=None):
+    """
+    2010 -> 2020 block group weights for one county: GEOID_10, GEOID_20,
+    weight, where each 2010 block group's weights sum to 1.
+    """
+    prefix = state_fips + county_fips
+    if ACS_CROSSWALK_FILE:
+        crosswalk = pd.read_csv(ACS_CROSSWALK_FILE, dtype={'GEOID_10': str, 'GEOID_20': str})
+        crosswalk = crosswalk[crosswalk['GEOID_10'].str.startswith(prefix)]
+    else:
+        # Pipe-delimited national file; keep only this county's rows
+        columns = ['GEOID_BLKGRP_10', 'GEOID_BLKGRP_20', 'AREALAND_BLKGRP_10', 'AREAWATER_BLKGRP_10',
+                   'AREALAND_PART', 'AREAWATER_PART']
+        relationship = http_cache.fetch_to_file(CROSSWALK_URL, timeout=300, session=session)
+        with pd.read_csv(relationship, sep='|', usecols=columns, dtype=str, chunksize=200_000) as chunks:
+            rel = pd.concat(chunk[chunk['GEOID_BLKGRP_10'].str.startswith(prefix, na=False)]
+                            for chunk in chunks)
+        area = rel[columns[2:]].apply(pd.to_numeric).to_numpy(float)
+        land_10, water_10, land_part, water_part = area.T
+        # Water-only 2010 block groups are split by total area
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(land_10 > 0, land_part / land_10,
+                              (land_part + water_part) / (land_10 + water_10))
+        crosswalk = pd.DataFrame({
+            'GEOID_10': rel['GEOID_BLKGRP_10'].to_numpy(),
+            'GEOID_20': rel['GEOID_BLKGRP_20'].to_numpy(),
+            'weight': weight,
+        })
+
+    crosswalk = crosswalk[crosswalk['GEOID_20'].str.startswith(prefix)].copy()
+    # Normalize so every 2010 block group is fully allocated (equal split if
+    # it has no area at all)
+    crosswalk['weight'] = crosswalk['weight'].fillna(0)
+    total = crosswalk.groupby('GEOID_10')['weight'].transform('sum')
+    parts = crosswalk.groupby('GEOID_10')['weight'].transform('size')
+    crosswalk['weight'] = np.where(total > 0, crosswalk['weight'] / total.where(total > 0), 1 / parts)
+    return crosswalk[['GEOID_10', 'GEOID_20', 'weight']].reset_index(drop=True)
+
+
+def crosswalk_to_2020(frame, crosswalk):
+    """Re-aggregate a vintage on 2010 block groups onto 2020 block groups."""
+    merged = crosswalk.merge(frame, left_on='GEOID_10', right_on='GEOID')
+    merged[COUNT_COLUMNS] = merged[COUNT_COLUMNS].mul(merged['weight'], axis=0)
+    for median, count in MEDIAN_WEIGHTS.items():
+        # count was apportioned above, so this is the weight * count share
+        w = merged[count].where(merged[median].notna(), 0)
+        merged[f'_{median}_w'] = w
+        merged[f'_{median}_wx'] = merged[median] * w
+
+    grouped = merged.groupby('GEOID_20')
+    out = grouped[COUNT_COLUMNS].sum(min_count=1)
+    for median in MEDIAN_WEIGHTS:
+        w = grouped[f'_{median}_w'].sum()
+        out[median] = grouped[f'_{median}_wx'].sum(min_count=1) / w.where(w > 0)
+    return out.reset_index().rename(columns={'GEOID_20': 'GEOID'})
+
+
+def build_panel(vintages, crosswalk=None):
+    """
+    Stack {year: vintage_frame()} into the long GEOID x year panel on
+    2020 block groups. Pre-2020 vintages are skipped without a crosswalk.
+    """
+    frames = []
+    for year, frame in sorted(vintages.items()):
+        values = frame[['GEOID'] + list(ACS_VARIABLES.values())].copy()
+        # Negative values are Census annotations (-666666666 = not available)
+        numeric = list(ACS_VARIABLES.values())
+        values[numeric] = values[numeric].where(values[numeric] >= 0)
+        if year < GEOGRAPHY_2020:
+            if crosswalk is None:
+                continue
+            values = crosswalk_to_2020(values, crosswalk)
+        add_share_columns(values)
+        values['year'] = year
+        frames.append(values[PANEL_COLUMNS])
+    if not frames:
+        return pd.DataFrame(columns=PANEL_COLUMNS)
+    return pd.concat(frames, ignore_index=True).sort_values(['GEOID', 'year'], ignore_index=True)
+
+
+def trend_features(panel):
+    """
+    Per-GEOID change features from the panel, computed on one
+    (block groups x columns x years) array:
+
+    - <col>_yoy_change: change between the two latest vintages (relative for
+      'growth' columns, absolute for shares), per year if vintages are apart
+    - <col>_trend: least-squares slope over all vintages with data, as an
+      annual rate for 'growth' columns (slope of the log) or points per year
+    """
+    columns = list(TREND_COLUMNS)
+    years = sorted(panel['year'].unique())
+    geoids = sorted(panel['GEOID'].unique())
+    out = pd.DataFrame({'GEOID': geoids})
+    if len(years) < 2:
+        for col in columns:
+            out[f'{col}_yoy_change'] = np.nan
+            out[f'{col}_trend'] = np.nan
+        return out
+
+    wide = panel.pivot(index='GEOID', columns='year', values=columns)
+    wide = wide.reindex(index=geoids, columns=pd.MultiIndex.from_product([columns, years]))
+    values = wide.to_numpy(float).reshape(len(geoids), len(columns), len(years))
+
+    growth = np.array([TREND_COLUMNS[col] == 'growth' for col in columns])[None, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(growth, np.log(np.where(values > 0, values, np.nan)), values)
+
+        x = np.array(years, dtype=float)
+        yoy = (values[..., -1] - values[..., -2]) / (x[-1] - x[-2])
+
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=-1)
+        x_mean = (valid * x).sum(axis=-1) / n
+        y_mean = np.nansum(values, axis=-1) / n
+        dx = np.where(valid, x - x_mean[..., None], 0)
+        slope = np.nansum(dx * (values - y_mean[..., None]), axis=-1) / (dx ** 2).sum(axis=-1)
+        slope = np.where(n >= MIN_TREND_POINTS, slope, np.nan)
+
+    growth = growth[..., 0]
+    yoy = np.where(growth, np.expm1(yoy), yoy)
+    slope = np.where(growth, np.expm1(slope), slope)
+    for i, col in enumerate(columns):
+        out[f'{col}_yoy_change'] = yoy[:, i]
+        out[f'{col}_trend'] = slope[:, i]
+    return out
+
+
+def fetch_panel(paths, years=None, connections=MAX_CONNECTIONS):
+    """
+    Fetch all vintages (and the crosswalk, if a pre-2020 vintage is wanted)
+    concurrently. Returns ({year: frame}, crosswalk or None, {year or
+    'crosswalk': error}) for whatever succeeded and failed.
+    """
+    years = years or parse_years()
+    state_fips, county_fips = paths['state_fips'], paths['county_fips']
+    session = pooled_session(connections)
+    # Every vintage's API chunks and the crosswalk share one pool
+    with session, ThreadPoolExecutor(max_workers=connections) as pool:
+        jobs = {year: submit_block_groups(pool, year, ACS_VARIABLES, [(state_fips, county_fips)], session)
+                for year in years}
+        if min(years) < GEOGRAPHY_2020:
+            crosswalk_job = pool.submit(load_crosswalk, state_fips, county_fips, session)
+
+        results, errors = {}, {}
+        for year, (chunks, futures) in jobs.items():
+            try:
+                results[year] = vintage_frame(collect_block_groups(chunks, futures))
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                errors[year] = e
+        if min(years) < GEOGRAPHY_2020:
+            try:
+                results['crosswalk'] = crosswalk_job.result()
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                errors['crosswalk'] = e
+
+    crosswalk = results.pop('crosswalk', None)
+    return results, crosswalk, errors
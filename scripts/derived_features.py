@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Derived feature formulas shared by feature engineering (script 05) and the
+what-if scenario engine, so perturbed inputs flow into ratios and
+percentages exactly as they do in the pipeline.
+
+Spatial lags (neighbor averages over the adjacency graph, see adjacency.py)
+are also defined here. They depend on other block groups' rows, so the
+scenario engine keeps them at their pipeline values.
+"""
+
+import numpy as np
+
+# Columns written by add_derived_features(); they are recomputed from their
+# inputs, so they can't be perturbed directly
+DERIVED_COLUMNS = [
+    'affordability_ratio', 'cost_burden_pct', 'gentrification_pressure',
+    'market_liquidity', 'owner_stability', 'foreclosure_rate',
+    'price_to_assessed_ratio', 'pop_per_unit',
+]
+
+
+def add_derived_features(features):
+    """Add the 8 engineered columns to a merged Census/MLS/assessor frame (in place)."""
+
+    # 1. Affordability Ratio (higher = less affordable)
+    features['affordability_ratio'] = (
+        features['median_sale_price'] / features['median_income']
+    ).fillna(3.0).clip(0, 10)
+
+    # 2. Cost Burden (percentage)
+    features['cost_burden_pct'] = (features['pct_cost_burdened'] * 100).clip(0, 100)
+
+    # 3. Gentrification Pressure (composite indicator)
+    features['gentrification_pressure'] = (
+        features['price_yoy_change'] * 100 *  # Price momentum
+        (50000 / features['median_income'].clip(lower=20000)) *  # Income vulnerability
+        features['pct_minority']  # Displacement risk
+    ).fillna(0).clip(0, 100)
+
+    # 4. Market Liquidity (inverse of days on market)
+    features['market_liquidity'] = (
+        100 - (features['days_on_market'] / 180 * 100)
+    ).clip(0, 100)
+
+    # 5. Owner Stability (owner-occupied rate as percentage)
+    features['owner_stability'] = (features['pct_owner_occupied'] * 100).clip(0, 100)
+
+    # 6. Foreclosure Rate Proxy (placeholder - cost burden is main predictor)
+    features['foreclosure_rate'] = (features['cost_burden_pct'] / 100).clip(0, 1)
+
+    # 7. Price-to-Assessed Ratio (market heat indicator)
+    features['price_to_assessed_ratio'] = (
+        features['median_sale_price'] / features['assessed_value_median']
+    ).fillna(1.0).clip(0.5, 2.0)
+
+    # 8. Population Density Proxy (population per unit)
+    features['pop_per_unit'] = (
+        features['total_population'] / features['total_units']
+    ).fillna(2.5).clip(1, 8)
+
+    return features
+
+
+# Columns averaged over each block group's neighbors; output is lag_<column>
+SPATIAL_LAG_INPUTS = [
+    'price_yoy_change', 'cost_burden_pct', 'median_income',
+    'median_sale_price', 'pct_minority', 'days_on_market',
+]
+SPATIAL_LAG_COLUMNS = [f'lag_{col}' for col in SPATIAL_LAG_INPUTS]
+
+# Census API annotation codes for unavailable estimates run from -222222222
+# to -999999999; they must not be averaged into a neighbor's lag
+CENSUS_ANNOTATION_MAX = -222222222
+
+
+def spatial_lag_values(X, weights, rows=None):
+    """
+    Neighbor means of each column of X (block groups x columns), as sparse
+    multiplies with W. Missing values (NaN or Census annotation codes) are
+    left out of the mean; block groups with no valid neighbor value keep
+    their own value. rows (indices) limits the output to those block groups
+    (still averaging over all of X), for incremental updates.
+    """
+    valid = np.isfinite(X) & (X > CENSUS_ANNOTATION_MAX)
+    own = X
+    if rows is not None:
+        weights, own = weights[rows], X[rows]
+
+    total = weights @ np.where(valid, X, 0.0)
+    share = weights @ valid.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(share > 0, total / share, own)
+
+
+def add_spatial_lags(features, weights):
+    """
+    Add lag_<column> for every SPATIAL_LAG_INPUTS column (in place): the
+    mean over each block group's neighbors (spatial_lag_values()) with W
+    from adjacency.spatial_weights() aligned to features' rows.
+    """
+    lagged = spatial_lag_values(features[SPATIAL_LAG_INPUTS].to_numpy(dtype=float), weights)
+
+    for i, col in enumerate(SPATIAL_LAG_COLUMNS):
+        features[col] = lagged[:, i]
+    return features
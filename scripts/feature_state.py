@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+State for recomputing only some rows of the feature matrix (script 05
+--changed), and the list of block groups whose predictions are stale.
+
+A full run of script 05 saves processed/bg_features_state.npz next to
+bg_features.csv:
+
+    geoids    row order of the feature table
+    columns   the numeric columns filled with their median
+    raw       those columns before filling (NaN where a source had no value)
+    integral  which of them are integer columns
+    sorted    each column's non-NaN values, sorted (streaming_stats.ColumnMedians)
+    lags      the spatial lag columns
+
+Given the GEOIDs whose inputs changed, script 05 merges and derives just
+those rows, swaps their raw values in the sorted columns to get the new
+medians, fills the raw values again, and recomputes the spatial lags of the
+rows whose values changed (the changed rows, and rows with a missing value
+in a column whose median moved) and of their neighbors. The numbers come
+from the state rather than from re-parsing bg_features.csv, so the result
+is the table a full run would write, bit for bit, without re-sorting every
+column or multiplying the whole adjacency matrix. Only the lines of those
+rows are rewritten in the CSV (storage.patch_csv_rows), unless a column
+turned from integers to floats or back.
+
+Every block group whose feature row was rewritten is added to
+processed/stale_predictions.json. Script 07 --stale re-predicts only those
+and clears the list; a full run of script 07 clears it too.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from streaming_stats import ColumnMedians
+
+
+def new_state(geoids, raw, lags):
+    """
+    State for a feature table: geoids, its numeric columns before filling
+    and its spatial lag columns (DataFrames).
+    """
+    values = raw.to_numpy(dtype=float, copy=True)
+    return {
+        'geoids': np.asarray(geoids, dtype=str),
+        'columns': np.asarray(raw.columns, dtype=str),
+        'raw': values,
+        'integral': np.array([raw[col].dtype.kind in 'iu' for col in raw.columns]),
+        'medians': ColumnMedians.from_values(values),
+        'lags': lags.to_numpy(dtype=float, copy=True),
+    }
+
+
+def load_state(path):
+    with np.load(path, allow_pickle=False) as data:
+        offsets = np.cumsum(data['sorted_counts'])[:-1]
+        return {
+            'geoids': data['geoids'],
+            'columns': data['columns'],
+            'raw': data['raw'],
+            'integral': data['integral'],
+            'medians': ColumnMedians(np.split(data['sorted'], offsets)),
+            'lags': data['lags'],
+        }
+
+
+def save_state(state, path):
+    columns = state['medians'].columns
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(
+            f, geoids=state['geoids'], columns=state['columns'], raw=state['raw'], lags=state['lags'],
+            integral=state['integral'],
+            sorted=np.concatenate(columns) if columns else np.empty(0),
+            sorted_counts=np.array([len(col) for col in columns], dtype=np.int64),
+        )
+    os.replace(tmp, path)
+
+
+def replace_rows(state, rows, raw):
+    """
+    Swap the raw values of rows (indices) for raw ((rows, columns) array).
+    Returns the mask of columns whose median changed.
+    """
+    before = state['medians'].medians()
+    state['medians'].replace(state['raw'][rows], raw)
+    state['raw'][rows] = raw
+    after = state['medians'].medians()
+    return ~((before == after) | (np.isnan(before) & np.isnan(after)))
+
+
+def filled_values(state):
+    """The raw values with NaNs replaced by their column median."""
+    return np.where(np.isnan(state['raw']), state['medians'].medians(), state['raw'])
+
+
+def neighbor_rows(weights, rows):
+    """rows and every row adjacent to one of them (the adjacency graph is symmetric)."""
+    return np.union1d(rows, weights[rows].indices)
+
+
+def read_stale(paths):
+    """GEOIDs whose predictions are older than their features."""
+    if not os.path.exists(paths['stale_predictions']):
+        return []
+    with open(paths['stale_predictions']) as f:
+        return json.load(f)['geoids']
+
+
+def mark_stale(paths, geoids):
+    """Add geoids to the stale list; returns its new length."""
+    stale = sorted(set(read_stale(paths)) | {str(g) for g in geoids})
+    tmp = paths['stale_predictions'] + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'geoids': stale}, f)
+    os.replace(tmp, paths['stale_predictions'])
+    return len(stale)
+
+
+def clear_stale(paths):
+    if os.path.exists(paths['stale_predictions']):
+        os.remove(paths['stale_predictions'])
+
+
+def read_changed(geoids=None, changed_file=None):
+    """GEOIDs from --changed and/or --changed-file (one per line); None when neither is given."""
+    if geoids is None and changed_file is None:
+        return None
+    changed = list(geoids or [])
+    if changed_file:
+        with open(changed_file) as f:
+            changed.extend(line.strip() for line in f if line.strip())
+    return changed
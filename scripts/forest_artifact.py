@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Flat, memory-mapped Random Forest artifacts and a NumPy-only predictor.
+
+Pickled forests (models/*.pkl) are slow to load, private to each process
+that unpickles them, and unsafe to accept from anyone else: unpickling runs
+code. export_forest() flattens a fitted RandomForestRegressor into a few
+node arrays and writes them next to the pickle as <model>.forest.
+load_forest() maps that file read-only and FlatForest.predict() walks all
+trees for a batch of rows with NumPy. Loading reads no tree data up front,
+never imports scikit-learn, and every process that opens the same file
+shares its pages through the OS page cache.
+
+File layout (all integers little-endian), as in predictions_payload.py:
+
+    magic      4 bytes   b'BGRF'
+    header_len uint32    length of the JSON header that follows
+    header     JSON      {"version": 1, "feature_names": [...], "n_outputs",
+                          "n_trees", "n_nodes", "arrays": [...]},
+                         space-padded so the data section is 8-byte aligned
+    data       one block per array, each starting on an 8-byte boundary
+
+Arrays cover all trees back to back; child indices are global and each
+tree's root is listed in `roots`:
+
+    roots         int64    (n_trees,)
+    feature       int32    (n_nodes,)     split feature, -1 at leaves
+    threshold     float64  (n_nodes,)     go left when x <= threshold
+    left, right   int32    (n_nodes,)     child node, -1 at leaves
+    missing_left  uint8    (n_nodes,)     NaN goes left (sklearn >= 1.3 trees)
+    value         float64  (n_nodes, n_outputs)
+
+Predictions match sklearn's to the last bit: inputs are cast to float32
+before comparing (as sklearn's trees do) and tree outputs are summed in tree
+order before dividing by the tree count.
+
+Export the current pickles without retraining:
+    python forest_artifact.py
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'BGRF'
+VERSION = 1
+
+# Rows per traversal block; bounds the (rows x trees) node-index matrix
+BLOCK_ROWS = 4096
+
+
+def _pad(n, align=8):
+    return -n % align
+
+
+def artifact_path(model_file):
+    """<model>.forest next to a <model>.pkl."""
+    return os.path.splitext(model_file)[0] + '.forest'
+
+
+def flatten_forest(model):
+    """Node arrays (see module docstring) for a fitted RandomForestRegressor."""
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    sizes = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    def stacked(get, dtype):
+        return np.concatenate([np.asarray(get(tree)) for tree in trees]).astype(dtype)
+
+    left = stacked(lambda t: t.children_left, np.int64)
+    right = stacked(lambda t: t.children_right, np.int64)
+    offsets = np.repeat(roots, sizes)
+    leaf = left < 0
+    left = np.where(leaf, -1, left + offsets)
+    right = np.where(leaf, -1, right + offsets)
+
+    feature = np.where(leaf, -1, stacked(lambda t: t.feature, np.int64))
+    missing = [getattr(t, 'missing_go_to_left', None) for t in trees]
+    if all(m is not None for m in missing):
+        missing_left = np.concatenate(missing).astype(np.uint8)
+    else:
+        missing_left = np.zeros(len(left), dtype=np.uint8)
+
+    return {
+        'roots': roots,
+        'feature': feature.astype(np.int32),
+        'threshold': stacked(lambda t: t.threshold, np.float64),
+        'left': left.astype(np.int32),
+        'right': right.astype(np.int32),
+        'missing_left': missing_left,
+        # tree_.value is (n_nodes, n_outputs, 1) for regression
+        'value': np.concatenate([t.value[:, :, 0] for t in trees]).astype(np.float64),
+    }
+
+
+def export_forest(model, path):
+    """Write a fitted RandomForestRegressor as a .forest artifact."""
+    arrays = flatten_forest(model)
+    blocks = []
+    entries = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        entries.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape),
+                        'offset': offset})
+        block = array.tobytes()
+        block += b'\0' * _pad(len(block))
+        blocks.append(block)
+        offset += len(block)
+
+    header = json.dumps({
+        'version': VERSION,
+        'feature_names': [str(name) for name in model.feature_names_in_],
+        'n_outputs': int(model.n_outputs_),
+        'n_trees': len(arrays['roots']),
+        'n_nodes': len(arrays['feature']),
+        'arrays': entries,
+    }, separators=(',', ':')).encode()
+    header += b' ' * _pad(len(MAGIC) + 4 + len(header))
+
+    with open(path + '.tmp', 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        for block in blocks:
+            f.write(block)
+    os.replace(path + '.tmp', path)
+
+
+class FlatForest:
+    """A forest loaded by load_forest(); predict() mirrors RandomForestRegressor.predict()."""
+
+    def __init__(self, header, arrays, buffer=None):
+        self.feature_names_in_ = np.array(header['feature_names'], dtype=object)
+        self.n_outputs_ = header['n_outputs']
+        self.n_trees = header['n_trees']
+        self._buffer = buffer  # keeps the mapping open while arrays use it
+        for name in ('roots', 'feature', 'threshold', 'left', 'right', 'missing_left', 'value'):
+            setattr(self, name, arrays[name])
+
+    def _inputs(self, X):
+        if hasattr(X, 'columns'):
+            X = X[list(self.feature_names_in_)]
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names_in_):
+            raise ValueError(f"Expected {len(self.feature_names_in_)} features, got shape {X.shape}")
+        return X
+
+    def predict(self, X):
+        X = self._inputs(X)
+        out = np.empty((len(X), self.n_outputs_))
+        for start in range(0, len(X), BLOCK_ROWS):
+            leaves = self._leaf_values(X[start:start + BLOCK_ROWS])
+            # Sum in tree order, as sklearn accumulates, for bit-identical means
+            total = np.zeros((len(leaves), self.n_outputs_))
+            for t in range(self.n_trees):
+                total += leaves[:, t]
+            out[start:start + BLOCK_ROWS] = total / self.n_trees
+        return out[:, 0] if self.n_outputs_ == 1 else out
+
+    def predict_trees(self, X):
+        """
+        Every tree's prediction: (n_rows, n_trees), or (n_rows, n_trees,
+        n_outputs) for multi-output forests. predict() is their mean.
+        """
+        X = self._inputs(X)
+        out = np.empty((len(X), self.n_trees, self.n_outputs_))
+        for start in range(0, len(X), BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self._leaf_values(X[start:start + BLOCK_ROWS])
+        return out[..., 0] if self.n_outputs_ == 1 else out
+
+    def _leaf_values(self, X):
+        # One node index per (row, tree), all advanced one level per pass
+        rows = np.repeat(np.arange(len(X)), self.n_trees)
+        node = np.tile(self.roots, len(X))
+        active = np.flatnonzero(self.feature[node] >= 0)
+        while len(active):
+            at = node[active]
+            x = X[rows[active], self.feature[at]].astype(np.float64)
+            go_left = (x <= self.threshold[at]) | (np.isnan(x) & (self.missing_left[at] == 1))
+            at = np.where(go_left, self.left[at], self.right[at])
+            node[active] = at
+            active = active[self.feature[at] >= 0]
+
+        return self.value[node].reshape(len(X), self.n_trees, self.n_outputs_)
+
+
+def _validate(header, arrays):
+    n_nodes, n_features = header['n_nodes'], len(header['feature_names'])
+    feature, left, right = arrays['feature'], arrays['left'], arrays['right']
+    internal = feature >= 0
+    index = np.arange(n_nodes)
+    ok = (
+        arrays['value'].shape == (n_nodes, header['n_outputs'])
+        and len(arrays['roots']) == header['n_trees']
+        and ((arrays['roots'] >= 0) & (arrays['roots'] < n_nodes)).all()
+        and (feature < n_features).all()
+        # Children come after their parent, so traversal always terminates
+        and (left[internal] > index[internal]).all() and (left[internal] < n_nodes).all()
+        and (right[internal] > index[internal]).all() and (right[internal] < n_nodes).all()
+    )
+    if not ok:
+        raise ValueError("Corrupt forest artifact: node arrays are inconsistent")
+
+
+def load_forest(path, mmap_mode=True, validate=True):
+    """
+    Open a .forest artifact. With mmap_mode (default) the arrays are
+    read-only views of a shared file mapping; otherwise the file is read into
+    private memory. validate checks node indices before first use.
+    """
+    with open(path, 'rb') as f:
+        if mmap_mode:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    if buffer[:4] != MAGIC:
+        raise ValueError(f"{path} is not a forest artifact")
+    (header_len,) = struct.unpack_from('<I', buffer, 4)
+    header = json.loads(bytes(buffer[8:8 + header_len]))
+    if header['version'] != VERSION:
+        raise ValueError(f"Unsupported forest artifact version {header['version']}")
+
+    data_start = 8 + header_len
+    arrays = {}
+    for entry in header['arrays']:
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape']))
+        end = data_start + entry['offset'] + count * dtype.itemsize
+        if end > len(buffer):
+            raise ValueError(f"{path} is truncated")
+        arrays[entry['name']] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + entry['offset']
+        ).reshape(entry['shape'])
+
+    if validate:
+        _validate(header, arrays)
+    return FlatForest(header, arrays, buffer)
+
+
+if __name__ == "__main__":
+    import joblib
+    from pipeline_paths import county_paths
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    paths = county_paths()
+
+    print("📦 Exporting forest artifacts...")
+    for model_file in (paths['equity_model'], paths['foreclosure_model'], paths['joint_model']):
+        if os.path.exists(model_file):
+            out = artifact_path(model_file)
+            export_forest(joblib.load(model_file), out)
+            print(f"   ✓ {out} ({os.path.getsize(out) / 1024:.0f} KB)")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache for the Census API and TIGER downloads.
+
+Responses are stored under data/.http_cache/, keyed by URL and query params
+(the Census API key is excluded from the key so cached data is shareable).
+Each entry is a body file plus a small JSON sidecar with its fetch time,
+ETag and Last-Modified headers.
+
+- Fresh entries (younger than the TTL) are served without touching the network.
+- Stale entries are re-validated with If-None-Match / If-Modified-Since, so an
+  unchanged resource costs a 304 instead of a full download.
+- If the network is unreachable or times out, a stale entry is served rather
+  than failing the run; HTTP errors (4xx/5xx) are raised.
+- Offline mode serves only from the cache and raises CacheMiss otherwise.
+- After each write, least-recently-used entries are evicted until the cache
+  fits its size budget.
+
+Fetches may run from several threads or processes at once (see census_api.py
+and run_counties.py). Bodies and sidecars are written to unique temp files
+and moved into place, and a miss or re-validation holds a per-entry file lock,
+so concurrent callers for the same URL wait for one download and share it.
+Pass a shared requests.Session to reuse its connection pool.
+
+Configuration (environment variables):
+    PIPELINE_OFFLINE=1        serve only from the cache (CI / build hosts)
+    HTTP_CACHE_DIR            cache location (default: ../data/.http_cache)
+    HTTP_CACHE_TTL_DAYS       freshness window (default: 30)
+    HTTP_CACHE_MAX_MB         size budget before LRU eviction (default: 1024)
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, temp files still keep entries whole
+    fcntl = None
+
+CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', '../data/.http_cache')
+TTL_SECONDS = float(os.environ.get('HTTP_CACHE_TTL_DAYS', 30)) * 86400
+MAX_BYTES = int(float(os.environ.get('HTTP_CACHE_MAX_MB', 1024)) * 1024 * 1024)
+
+# Query params that identify the caller rather than the resource
+UNCACHED_PARAMS = {'key'}
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+def is_offline():
+    return os.environ.get('PIPELINE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def cache_key(url, params=None):
+    """Stable key for a URL plus its query params (order-independent)."""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in UNCACHED_PARAMS)
+    return hashlib.sha256(json.dumps([url, items]).encode()).hexdigest()
+
+
+def _entry_paths(key, url):
+    # Keep the URL's extension on the body so readers that sniff file types
+    # (e.g. GDAL on .zip) work on the cached copy directly.
+    ext = os.path.splitext(url.split('?')[0])[1]
+    return os.path.join(CACHE_DIR, key + ext), os.path.join(CACHE_DIR, key + '.meta.json')
+
+
+def _read_meta(meta_file):
+    try:
+        with open(meta_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write, mode='w'):
+    """write(f) into a unique temp file next to path, then move it into place."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def _write_meta(meta_file, meta):
+    _write_atomic(meta_file, lambda f: json.dump(meta, f, indent=2))
+
+
+@contextlib.contextmanager
+def _entry_lock(key):
+    """Exclusive lock on one cache entry, across threads and processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(CACHE_DIR, key + '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _cached(meta_file, body_file):
+    meta = _read_meta(meta_file)
+    if meta is not None and not os.path.exists(body_file):
+        return None
+    return meta
+
+
+def _touch(meta_file, meta):
+    meta['last_access'] = time.time()
+    _write_meta(meta_file, meta)
+
+
+def evict(max_bytes=None, keep=None):
+    """Remove least-recently-used entries (except `keep`) until the cache fits max_bytes."""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith('.meta.json'):
+            continue
+        meta_file = os.path.join(CACHE_DIR, name)
+        meta = _read_meta(meta_file)
+        if meta is None or meta['body'] == keep:
+            continue
+        try:
+            size = os.path.getsize(meta['body'])
+        except OSError:  # missing, or evicted by another thread meanwhile
+            continue
+        entries.append((meta.get('last_access', 0), size, meta['body'], meta_file))
+        total += size
+
+    removed = 0
+    for _, size, body_file, meta_file in sorted(entries):
+        if total <= max_bytes:
+            break
+        for path in (body_file, meta_file):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def fetch_to_file(url, params=None, timeout=30, ttl=None, session=None):
+    """
+    Return the path of a cached copy of url, downloading or re-validating it
+    as needed. Raises CacheMiss in offline mode when nothing is cached, and
+    requests exceptions when a download fails with nothing cached to fall back on.
+    Downloads go through session (a requests.Session) when one is given.
+    """
+    ttl = TTL_SECONDS if ttl is None else ttl
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    key = cache_key(url, params)
+    body_file, meta_file = _entry_paths(key, url)
+    meta = _cached(meta_file, body_file)
+
+    if is_offline():
+        if meta is None:
+            raise CacheMiss(f"Offline mode: {url} is not in the HTTP cache ({CACHE_DIR})")
+        _touch(meta_file, meta)
+        return body_file
+
+    if meta is not None and time.time() - meta['fetched_at'] < ttl:
+        _touch(meta_file, meta)
+        return body_file
+
+    with _entry_lock(key):
+        # Another thread or process may have fetched it while we waited
+        meta = _cached(meta_file, body_file)
+        if meta is not None and time.time() - meta['fetched_at'] < ttl:
+            _touch(meta_file, meta)
+            return body_file
+        return _download(url, params, timeout, session, body_file, meta_file, meta)
+
+
+def _download(url, params, timeout, session, body_file, meta_file, meta):
+    """Fetch or re-validate one entry (under its lock); returns body_file."""
+    # Stale or missing: conditional request when we have validators
+    headers = {}
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        get = session.get if session is not None else requests.get
+        # Closing the response returns its connection to the session's pool,
+        # also when it is an error
+        with get(url, params=params, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and meta is not None:
+                meta['fetched_at'] = time.time()
+                _touch(meta_file, meta)
+                return body_file
+            response.raise_for_status()
+
+            def write_body(f):
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+            _write_atomic(body_file, write_body, mode='wb')
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        if meta is None:
+            raise
+        print(f"   ⚠️  Network error ({e.__class__.__name__}); using cached copy of {url}")
+        _touch(meta_file, meta)
+        return body_file
+
+    now = time.time()
+    _write_meta(meta_file, {
+        'url': url,
+        'params': {k: v for k, v in (params or {}).items() if k not in UNCACHED_PARAMS},
+        'body': body_file,
+        'fetched_at': now,
+        'last_access': now,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    })
+    evict(keep=body_file)
+    return body_file
+
+
+def fetch_json(url, params=None, timeout=30, ttl=None, session=None):
+    """fetch_to_file() and parse the body as JSON."""
+    with open(fetch_to_file(url, params=params, timeout=timeout, ttl=ttl, session=session)) as f:
+        return json.load(f)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+ingham: one command-line entry point for the data pipeline.
+
+Stages run in this process, in the order given. Each stage module is only
+imported when it runs, and heavy dependencies (geopandas, scikit-learn,
+shapely) are imported inside the code paths that use them, so
+`ingham features train predict` pays for pandas once instead of once per
+script, and stages that don't need geopandas or scikit-learn never load them.
+
+Usage (from the repo root, or `python ingham.py ...` from scripts/):
+    ./ingham all                            # stages 01-07
+    ./ingham mls features train predict     # 04-07 in one process
+    ./ingham 05 06 07                       # stage numbers work too
+    ./ingham train --search --multi-output  # options for the train stage
+    ./ingham predict --draws 50             # options for the predict stage
+    ./ingham mls --rebuild                  # re-ingest every MLS_FILES export
+    ./ingham features predict --changed 260650001001 --stale  # update changed block groups only
+    ./ingham all --county 26037             # partitioned layout, as run_counties.py
+
+Tools take their own arguments:
+    ./ingham run [--force 06]               # incremental DAG runner (run_pipeline.py)
+    ./ingham counties 26065 26037           # multi-county runner (run_counties.py)
+    ./ingham serve [--port 8765]            # prediction service
+    ./ingham snapshots --publish ../webapp/public/data/snapshots
+    ./ingham analytics --validate           # check the analytics store against the predictions
+    ./ingham scenarios median_income --scale 1.05 1.10
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from pipeline_paths import county_paths
+from run_counties import STEPS
+
+# Short names for the pipeline steps, in run order
+STAGE_NAMES = ['blocks', 'census', 'assessor', 'mls', 'features', 'train', 'predict']
+STAGES = {
+    name: {'code': module[:2], 'module': module, 'function': function, 'output': output_key}
+    for name, (module, function, output_key) in zip(STAGE_NAMES, STEPS)
+}
+
+# name -> module whose main() parses the remaining arguments
+TOOLS = {
+    'run': 'run_pipeline',
+    'counties': 'run_counties',
+    'serve': 'prediction_service',
+    'scenarios': 'scenarios',
+    'snapshots': 'prediction_snapshots',
+    'analytics': 'analytics_store',
+}
+
+
+def resolve_stages(names):
+    """Stage names or numbers (or 'all') -> stage names, in the order given."""
+    by_code = {stage['code']: name for name, stage in STAGES.items()}
+    resolved = []
+    for name in names:
+        if name == 'all':
+            resolved.extend(STAGE_NAMES)
+        elif name in STAGES:
+            resolved.append(name)
+        elif name.zfill(2) in by_code:
+            resolved.append(by_code[name.zfill(2)])
+        else:
+            raise SystemExit(f"Unknown stage {name!r}; choose from {', '.join(STAGE_NAMES)}, "
+                             f"01-07, all, or a tool: {', '.join(TOOLS)}")
+    return resolved
+
+
+def run_stages(names, paths, stage_options=None):
+    """
+    Run stages in order; stop at the first one that fails. stage_options maps
+    a stage name to keyword arguments for its function. Returns True on success.
+    """
+    timings = []
+    ok = True
+    for name in names:
+        stage = STAGES[name]
+        started_at = time.time()
+        start = time.perf_counter()
+        module = importlib.import_module(stage['module'])
+        imported = time.perf_counter()
+
+        kwargs = (stage_options or {}).get(name, {})
+        getattr(module, stage['function'])(paths, **kwargs)
+        done = time.perf_counter()
+        timings.append((name, stage['code'], imported - start, done - imported))
+
+        # Stages report missing inputs by printing and returning, so require
+        # every output to have been written by this run, as run_pipeline.py
+        # does (an output left from an earlier run is not success)
+        outputs = paths[stage['output']]
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        missing = [out for out in outputs
+                   if not (os.path.exists(out) and os.path.getmtime(out) >= started_at - 1)]
+        if missing:
+            print(f"\n❌ Stage {stage['code']} ({name}) did not write {missing[0]}")
+            ok = False
+            break
+
+    print("\n" + "=" * 60)
+    print("STAGE TIMINGS")
+    print("=" * 60)
+    for name, code, t_import, t_run in timings:
+        print(f"   {code} {name:<9} import {t_import:6.2f}s   run {t_run:7.2f}s")
+    total = sum(t_import + t_run for _, _, t_import, t_run in timings)
+    print(f"   Total: {total:.2f}s in one process")
+    return ok
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Step paths are relative to scripts/
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if argv and argv[0] in TOOLS:
+        sys.argv = [f'ingham {argv[0]}'] + argv[1:]
+        importlib.import_module(TOOLS[argv[0]]).main()
+        return
+
+    parser = argparse.ArgumentParser(
+        prog='ingham', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('stages', nargs='+', help=f"{', '.join(STAGE_NAMES)}, 01-07 or all")
+    parser.add_argument('--county', help="5-digit county FIPS; writes to data/counties/<fips>/")
+    mls = parser.add_argument_group('mls stage')
+    mls.add_argument('--rebuild', action='store_true',
+                     help="with MLS_FILES, discard the sales state and re-ingest every file")
+    features = parser.add_argument_group('features stage')
+    features.add_argument('--changed', nargs='+', metavar='GEOID',
+                          help="recompute only these block groups (and the rows depending on them)")
+    features.add_argument('--changed-file', help="file of changed GEOIDs, one per line")
+    train = parser.add_argument_group('train stage')
+    train.add_argument('--search', action='store_true', help="tune hyperparameters first")
+    train.add_argument('--jobs', type=int, default=None, help="worker processes for --search")
+    train.add_argument('--no-halving', dest='halving', action='store_false',
+                       help="score every candidate at full size")
+    train.add_argument('--multi-output', action='store_true', default=None,
+                       help="one multi-output forest for both targets")
+    predict = parser.add_argument_group('predict stage')
+    predict.add_argument('--no-intervals', dest='intervals', action='store_false',
+                         help="skip the per-tree uncertainty bands")
+    predict.add_argument('--draws', type=int, default=0,
+                         help="re-draws of the synthetic MLS inputs pooled into the bands")
+    predict.add_argument('--stale', action='store_true',
+                         help="only re-predict block groups marked stale by features --changed")
+    args = parser.parse_args(argv)
+
+    if args.county:
+        if not (len(args.county) == 5 and args.county.isdigit()):
+            parser.error(f"--county expects a 5-digit FIPS code, got {args.county!r}")
+        paths = county_paths(args.county[:2], args.county[2:], partitioned=True)
+        os.makedirs(paths['root'], exist_ok=True)
+    else:
+        paths = county_paths()
+
+    from feature_state import read_changed
+
+    stage_options = {
+        'mls': {'rebuild': args.rebuild},
+        'features': {'changed': read_changed(args.changed, args.changed_file)},
+        'train': {'search': args.search, 'jobs': args.jobs, 'halving': args.halving,
+                  'multi_output': args.multi_output},
+        'predict': {'intervals': args.intervals, 'draws': args.draws, 'stale': args.stale},
+    }
+    ok = run_stages(resolve_stages(args.stages), paths, stage_options)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
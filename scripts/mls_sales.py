@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Transaction-level MLS sales aggregated to block groups (used by script 04).
+
+MLS_FILES names the sale exports: one file, a directory, or a glob (e.g.
+'../data/mls/*.csv'), CSV or Parquet, one row per closed sale with a close
+date, sale price and lon/lat (or a WKT geometry); days on market and living
+area are optional. Columns are matched case-insensitively against
+SALE_FIELDS. Each file is streamed CHUNK_ROWS sales at a time and every
+sale is assigned to a block group with the STRtree index of parcels.py.
+
+Sales are not kept. The state file (processed/mls_sales_state.npz) holds a
+histogram per (month, block group) of sale price, days on market and price
+per square foot, stored sparsely (streaming_stats.KeyedCounts), plus the
+SHA-256 of every file ingested. A run ingests only files not in the state,
+so adding next month's export costs that file alone; the table is then read
+off the histograms of the months in the window:
+
+    median_sale_price   median over the 12 months up to the as-of month
+    price_yoy_change    that median vs the median of the 12 months before
+    days_on_market      median days on market, same 12 months
+    sale_count_12mo     sales in the same 12 months
+    price_per_sqft      median of sale price / living area, same 12 months
+
+Monthly histograms merge by adding counts, so every window is exact up to
+the bin width (prices within about 1%, days on market exact). Medians of
+block groups with fewer than MIN_SALES sales in a window are NaN (script 04
+fills them with synthetic values).
+
+Files must not overlap (a sale in two files is counted twice). After
+correcting a file that was already ingested, or when the block groups
+change, rebuild the state: script 04 --rebuild.
+
+Configuration (environment variables):
+    MLS_FILES     sale exports (file, directory or glob)
+    MLS_AS_OF     last month of the window, YYYY-MM (default: latest sale month)
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from parcels import (
+    CHUNK_ROWS, PARCEL_FIELDS, assign_block_groups, block_group_index, frame_lonlat, numeric_column,
+    table_batches,
+)
+from streaming_stats import GroupedHistogram, KeyedCounts
+
+MLS_FILES = os.environ.get('MLS_FILES')
+MLS_AS_OF = os.environ.get('MLS_AS_OF')
+
+# Accepted column names per role (compared lower-case)
+SALE_FIELDS = {
+    'price': ['close_price', 'closeprice', 'sold_price', 'soldprice', 'sale_price', 'saleprice', 'price'],
+    'date': ['close_date', 'closedate', 'sold_date', 'solddate', 'sale_date', 'saledate', 'date'],
+    'dom': ['days_on_market', 'daysonmarket', 'dom', 'cdom'],
+    'sqft': ['living_area', 'livingarea', 'sqft', 'square_feet', 'sqft_living'],
+    'lon': PARCEL_FIELDS['lon'],
+    'lat': PARCEL_FIELDS['lat'],
+    'geometry': PARCEL_FIELDS['geometry'],
+}
+
+SALE_EXTENSIONS = ('.csv', '.csv.gz', '.parquet')
+
+WINDOW_MONTHS = 12
+MIN_SALES = 3
+
+# Histogram bins: prices ~1.2% wide, price per sqft ~2.4%, one per day on market
+PRICE_RANGE = (1e4, 5e6)
+PRICE_BINS = 512
+PPSF_RANGE = (10, 2000)
+PPSF_BINS = 224
+DOM_MAX = 730
+
+
+def sale_histograms(n_groups):
+    """Empty histograms for each statistic, with the bins the state is keyed on."""
+    return {
+        'price': GroupedHistogram.log_spaced(n_groups, *PRICE_RANGE, PRICE_BINS),
+        'dom': GroupedHistogram.integers(n_groups, 0, DOM_MAX),
+        'ppsf': GroupedHistogram.log_spaced(n_groups, *PPSF_RANGE, PPSF_BINS),
+    }
+
+
+def list_sale_files(pattern):
+    """Sale files named by MLS_FILES: a file, every CSV/Parquet file in a directory, or a glob."""
+    if os.path.isdir(pattern):
+        return sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                      if name.endswith(SALE_EXTENSIONS))
+    return sorted(glob.glob(pattern))
+
+
+def month_index(year, month):
+    """Months since year 0: consecutive months are consecutive integers."""
+    return year * 12 + month - 1
+
+
+def parse_month(text):
+    """'YYYY-MM' -> month_index()."""
+    year, month = (int(part) for part in text.split('-')[:2])
+    return month_index(year, month)
+
+
+def month_label(index):
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def _pack(months, groups, bins, n_groups, n_bins):
+    """Key of the (month, block group, bin) cell; keys sort by month first."""
+    return (np.asarray(months, dtype=np.int64) * n_groups + groups) * n_bins + bins
+
+
+def new_state(geoids):
+    return {
+        'geoids': np.asarray(geoids, dtype=str),
+        'files': [],
+        'counts': {name: KeyedCounts() for name in sale_histograms(0)},
+    }
+
+
+def load_state(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            'geoids': data['geoids'],
+            'files': json.loads(str(data['files'])),
+            'counts': {name: KeyedCounts(data[f'{name}_keys'], data[f'{name}_counts'])
+                       for name in sale_histograms(0)},
+        }
+
+
+def save_state(state, path):
+    arrays = {'geoids': state['geoids'], 'files': np.array(json.dumps(state['files']))}
+    for name, counts in state['counts'].items():
+        arrays[f'{name}_keys'] = counts.keys
+        arrays[f'{name}_counts'] = counts.counts
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ingest_file(state, path, polygons, tree, chunk_rows=CHUNK_ROWS):
+    """
+    Stream one sale file into the state's monthly histograms. Returns counts
+    of the rows read, ingested and skipped (no price/date, no location,
+    outside every block group).
+    """
+    n_groups = len(state['geoids'])
+    histograms = sale_histograms(1)
+    fields, batches = table_batches(path, SALE_FIELDS, ['price', 'date'], chunk_rows)
+    stats = {'read': 0, 'sales': 0, 'incomplete': 0, 'outside': 0}
+
+    for frame in batches:
+        lon, lat = frame_lonlat(frame, fields, path)
+        price = numeric_column(frame, fields, 'price')
+        dates = pd.to_datetime(frame[fields['date']], errors='coerce')
+        months = month_index(dates.dt.year, dates.dt.month).to_numpy(dtype=float)
+
+        complete = np.isfinite(price) & (price > 0) & np.isfinite(months)
+        located = complete & np.isfinite(lon) & np.isfinite(lat)
+        groups = np.full(len(frame), -1, dtype=np.int64)
+        groups[located] = assign_block_groups(polygons, tree, lon[located], lat[located])
+        inside = groups >= 0
+
+        stats['read'] += len(frame)
+        stats['incomplete'] += int((~located).sum())
+        stats['outside'] += int((located & ~inside).sum())
+        stats['sales'] += int(inside.sum())
+
+        dom = numeric_column(frame, fields, 'dom')
+        sqft = numeric_column(frame, fields, 'sqft')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = {
+                'price': price,
+                'dom': np.where(dom >= 0, dom, np.nan),
+                'ppsf': np.where(sqft > 0, price / sqft, np.nan),
+            }
+        months, groups = months[inside].astype(np.int64), groups[inside]
+        for name, hist in histograms.items():
+            keep, bins = hist.bin_index(values[name][inside])
+            state['counts'][name].add(_pack(months[keep], groups[keep], bins, n_groups, hist.n_bins))
+    return stats
+
+
+def update_sales(paths, files, rebuild=False, chunk_rows=CHUNK_ROWS):
+    """
+    Load the state (a new one with rebuild=True or when there is none),
+    ingest the files it has not seen, save it. Returns (state, [(file,
+    ingest stats)] for the files ingested this run).
+    """
+    geoids, polygons, tree = block_group_index(paths['block_groups'])
+    state_file = paths['mls_state']
+
+    state = None
+    if not rebuild and os.path.exists(state_file):
+        state = load_state(state_file)
+        if not np.array_equal(state['geoids'], geoids):
+            raise ValueError(f"{state_file} was built for other block groups; rerun with --rebuild")
+    if state is None:
+        state = new_state(geoids)
+
+    seen = {entry['sha256'] for entry in state['files']}
+    ingested = []
+    for path in files:
+        digest = file_sha256(path)
+        if digest in seen:
+            continue
+        stats = ingest_file(state, path, polygons, tree, chunk_rows)
+        state['files'].append({'name': os.path.basename(path), 'sha256': digest, **stats})
+        seen.add(digest)
+        # Saved per file, so an interrupted backfill resumes where it stopped
+        save_state(state, state_file)
+        ingested.append((path, stats))
+
+    if not os.path.exists(state_file):
+        save_state(state, state_file)
+    return state, ingested
+
+
+def latest_month(state):
+    """Month of the latest sale in the state, or None when it has no sales."""
+    keys = state['counts']['price'].keys
+    if not len(keys):
+        return None
+    return int(keys[-1] // (len(state['geoids']) * PRICE_BINS))
+
+
+def window_histogram(state, name, first_month, last_month):
+    """The per-block-group histogram of one statistic over months first..last."""
+    n_groups = len(state['geoids'])
+    hist = sale_histograms(n_groups)[name]
+    keys, counts = state['counts'][name].select(
+        _pack(first_month, 0, 0, n_groups, hist.n_bins), _pack(last_month + 1, 0, 0, n_groups, hist.n_bins))
+    cells = keys % (n_groups * hist.n_bins)
+    hist.add_counts(cells // hist.n_bins, cells % hist.n_bins, counts)
+    return hist
+
+
+def sales_table(state, as_of=None):
+    """
+    The MLS table (one row per block group in the state, columns as in the
+    module docstring) for the WINDOW_MONTHS ending at as_of ('YYYY-MM';
+    default: the latest sale month), and the as-of month as 'YYYY-MM'.
+    """
+    last = parse_month(as_of) if as_of else latest_month(state)
+    if last is None:
+        raise ValueError("No sales ingested yet")
+    first = last - WINDOW_MONTHS + 1
+
+    current = {name: window_histogram(state, name, first, last) for name in state['counts']}
+    prior = window_histogram(state, 'price', first - WINDOW_MONTHS, first - 1)
+
+    def median(hist):
+        return np.where(hist.totals() >= MIN_SALES, hist.quantiles([0.5])[:, 0], np.nan)
+
+    price = median(current['price'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        yoy = price / median(prior) - 1
+
+    table = pd.DataFrame({
+        'GEOID': state['geoids'],
+        'median_sale_price': price.round(),
+        'price_yoy_change': yoy.round(4),
+        'days_on_market': median(current['dom']).round(),
+        'sale_count_12mo': current['price'].totals(),
+        'price_per_sqft': median(current['ppsf']).round(),
+    })
+    return table, month_label(last)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter search for the Random Forest models (script 06 --search).
+
+Both targets are searched in one process pool over the same K-fold splits:
+every (target, candidate, fold) fit is an independent task, so the equity
+and foreclosure searches share workers instead of running one after the
+other.
+
+Successive halving (on by default) uses the number of trees as the budget:
+every candidate is first scored with a few trees, then only the best
+1/factor per target moves on to the next round with factor x more trees,
+until the last round runs at max_estimators. With the default grid (108
+candidates, 11 -> 33 -> 100 trees) that is about a third of the trees an
+exhaustive search fits.
+
+Each fitted fold model is cached under cache_dir (joblib, plus a small JSON
+with its validation R²), keyed by a hash of the data, target, parameters,
+tree count and fold. An interrupted search picks up where it stopped, and
+re-running with a larger grid only fits the new candidates.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+PARAM_GRID = {
+    'max_depth': [6, 10, 14, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': [1.0, 0.5, 'sqrt'],
+}
+
+CV_FOLDS = 5
+HALVING_FACTOR = 3
+MIN_ESTIMATORS = 10
+MAX_ESTIMATORS = 100
+RANDOM_STATE = 42
+
+# Set in each worker by _init_worker so tasks only carry indices and params
+_X = None
+_TARGETS = None
+_FOLDS = None
+
+
+def expand_grid(param_grid):
+    """Every combination of a {param: [values]} grid, as a list of dicts."""
+    names = sorted(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+
+def halving_schedule(n_candidates, factor=HALVING_FACTOR,
+                     min_estimators=MIN_ESTIMATORS, max_estimators=MAX_ESTIMATORS):
+    """
+    [(candidates kept, n_estimators), ...] per round. Tree counts grow by
+    factor up to max_estimators in the last round; the candidate count
+    shrinks by factor, never below 1.
+    """
+    n_rounds = 1 + max(0, int(math.log(max_estimators / min_estimators, factor) + 1e-9))
+    n_rounds = min(n_rounds, 1 + math.ceil(math.log(max(n_candidates, 1), factor)))
+    schedule = []
+    for r in range(n_rounds):
+        n_estimators = int(round(max_estimators / factor ** (n_rounds - 1 - r)))
+        schedule.append((max(1, math.ceil(n_candidates / factor ** r)), n_estimators))
+    return schedule
+
+
+def _fingerprint(X, targets, folds):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    for name in sorted(targets):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(targets[name]).tobytes())
+    for _, val in folds:
+        digest.update(val.tobytes())
+    return digest.hexdigest()
+
+
+def _task_key(fingerprint, target, params, n_estimators, fold):
+    spec = json.dumps([fingerprint, target, params, n_estimators, fold], sort_keys=True, default=str)
+    return hashlib.sha256(spec.encode()).hexdigest()[:24]
+
+
+def _read_cached_score(cache_dir, key):
+    try:
+        with open(os.path.join(cache_dir, key + '.json')) as f:
+            return json.load(f)['r2']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _init_worker(X, targets, folds):
+    global _X, _TARGETS, _FOLDS
+    _X, _TARGETS, _FOLDS = X, targets, folds
+
+
+def _fit_fold(target, params, n_estimators, fold, cache_dir, key):
+    """Fit one fold model, cache it, and return its validation R²."""
+    train, val = _FOLDS[fold]
+    y = _TARGETS[target]
+    model = RandomForestRegressor(
+        n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=1, **params
+    )
+    model.fit(_X[train], y[train])
+    r2 = float(r2_score(y[val], model.predict(_X[val])))
+
+    if cache_dir:
+        # Model first, score last: the JSON marks a complete entry
+        model_file = os.path.join(cache_dir, key + '.joblib')
+        joblib.dump(model, model_file + '.tmp', compress=3)
+        os.replace(model_file + '.tmp', model_file)
+        score_file = os.path.join(cache_dir, key + '.json')
+        with open(score_file + '.tmp', 'w') as f:
+            json.dump({'target': target, 'params': params, 'n_estimators': n_estimators,
+                       'fold': fold, 'r2': r2}, f, default=str)
+        os.replace(score_file + '.tmp', score_file)
+    return r2
+
+
+def search_hyperparameters(X, targets, param_grid=None, cv=CV_FOLDS, cache_dir=None, jobs=None,
+                           halving=True, factor=HALVING_FACTOR, min_estimators=MIN_ESTIMATORS,
+                           max_estimators=MAX_ESTIMATORS):
+    """
+    Search param_grid for every target in targets ({name: y}) at once.
+
+    Returns ({name: best}, results), where best has 'params' (including
+    n_estimators), 'cv_r2_mean' and 'cv_r2_std' from the final round, and
+    results is a DataFrame with one row per (target, candidate, round).
+    """
+    candidates = expand_grid(param_grid or PARAM_GRID)
+    X = np.asarray(X, dtype=float)
+    targets = {name: np.asarray(y, dtype=float) for name, y in targets.items()}
+    folds = list(KFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE).split(X))
+    fingerprint = _fingerprint(X, targets, folds)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    if halving:
+        schedule = halving_schedule(len(candidates), factor, min_estimators, max_estimators)
+    else:
+        schedule = [(len(candidates), max_estimators)]
+
+    alive = {name: list(range(len(candidates))) for name in targets}
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(X, targets, folds)) as pool:
+        for round_index, (n_keep, n_estimators) in enumerate(schedule):
+            scores = {}
+            pending = {}
+            cached = 0
+            for name, indices in alive.items():
+                for c in indices[:n_keep]:
+                    for fold in range(cv):
+                        key = _task_key(fingerprint, name, candidates[c], n_estimators, fold)
+                        r2 = _read_cached_score(cache_dir, key) if cache_dir else None
+                        if r2 is not None:
+                            scores[name, c, fold] = r2
+                            cached += 1
+                        else:
+                            pending[name, c, fold] = pool.submit(
+                                _fit_fold, name, candidates[c], n_estimators, fold, cache_dir, key
+                            )
+            for task, future in pending.items():
+                scores[task] = future.result()
+
+            print(f"   Round {round_index + 1}/{len(schedule)}: "
+                  f"{sum(min(n_keep, len(i)) for i in alive.values())} candidates × {cv} folds "
+                  f"at {n_estimators} trees ({len(pending)} fitted, {cached} cached)")
+
+            final = {}
+            for name, indices in alive.items():
+                ranked = []
+                for c in indices[:n_keep]:
+                    fold_scores = [scores[name, c, fold] for fold in range(cv)]
+                    mean, std = float(np.mean(fold_scores)), float(np.std(fold_scores))
+                    ranked.append((mean, c))
+                    final[name, c] = (mean, std)
+                    rows.append({'target': name, 'round': round_index + 1,
+                                 'n_estimators': n_estimators, **candidates[c],
+                                 'cv_r2_mean': mean, 'cv_r2_std': std})
+                # Stable sort keeps grid order among ties
+                ranked.sort(key=lambda item: -item[0])
+                alive[name] = [c for _, c in ranked]
+
+    best = {}
+    for name, indices in alive.items():
+        mean, std = final[name, indices[0]]
+        best[name] = {
+            'params': {**candidates[indices[0]], 'n_estimators': schedule[-1][1]},
+            'cv_r2_mean': mean,
+            'cv_r2_std': std,
+        }
+    return best, pd.DataFrame(rows)
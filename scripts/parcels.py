@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Parcel-level assessor data aggregated to block groups (used by script 03).
+
+PARCEL_FILE points at a county parcel extract: a CSV with lon/lat columns
+(or a WKT geometry column), a Parquet file with the same columns, or
+anything GDAL reads (GeoPackage, shapefile, FlatGeobuf, ...). The file is
+streamed CHUNK_ROWS parcels at a time:
+
+1. each parcel becomes a point: its lon/lat, or a point on the surface of
+   its polygon (always inside the parcel, unlike a centroid)
+2. an STRtree over the block group polygons assigns the points to block
+   groups; a point on a shared boundary goes to one of them, points outside
+   every block group (e.g. a statewide file run per county) are dropped
+3. per-block-group counts, sums and histograms (streaming_stats.py) are
+   updated and the chunk is released
+
+Memory is one chunk plus block groups x histogram bins, however many
+parcels the file holds. GDAL formats are paged with skip_features, which
+is cheap for GeoPackage, shapefile and FlatGeobuf; GDAL reads a GeoJSON
+file whole, so convert large GeoJSON extracts first.
+
+Columns are matched case-insensitively against the names in PARCEL_FIELDS.
+The assessed value is required; year built is optional. Non-positive values
+and years outside YEAR_BUILT_MIN..REFERENCE_YEAR are treated as missing
+(exempt parcels, vacant land).
+
+Columns of the assessor table (processed/assessor_by_bg):
+    assessed_value_median/_mean/_p25/_p75   over parcels with a value
+    parcel_count_estimated                  every parcel in the block group
+    property_age_estimate                   REFERENCE_YEAR - median year built
+    year_built_median/_mean                 over parcels with a year
+    pct_built_pre1940                       share of those built before 1940
+
+Configuration (environment variables):
+    PARCEL_FILE           parcel extract; unset, script 03 uses Census values
+    PARCEL_LAYER          layer of a multi-layer file (GeoPackage)
+    PARCEL_VALUE_SCALE    multiplier for the value column; Michigan assessed
+                          and state equalized values are half of market
+                          value, so 2 turns them into market values
+    PARCEL_REFERENCE_YEAR year property ages are measured from (default:
+                          the current year)
+"""
+
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from streaming_stats import GroupedHistogram
+
+PARCEL_FILE = os.environ.get('PARCEL_FILE')
+PARCEL_LAYER = os.environ.get('PARCEL_LAYER')
+PARCEL_VALUE_SCALE = float(os.environ.get('PARCEL_VALUE_SCALE', 1.0))
+REFERENCE_YEAR = int(os.environ.get('PARCEL_REFERENCE_YEAR', datetime.date.today().year))
+
+# Accepted column names per role (compared lower-case; shapefiles cut names
+# to 10 characters)
+PARCEL_FIELDS = {
+    'value': ['assessed_value', 'assessed_v', 'assessedvalue', 'assessed', 'sev', 'true_cash_value', 'tcv'],
+    'year_built': ['year_built', 'yearbuilt', 'yr_built', 'yrbuilt', 'res_year_built'],
+    'lon': ['lon', 'longitude'],
+    'lat': ['lat', 'latitude'],
+    'geometry': ['geometry', 'wkt', 'geom', 'the_geom'],
+}
+
+# Parcels read per chunk
+CHUNK_ROWS = 50_000
+
+# Value histogram: log-spaced bins, ~1.8% wide
+VALUE_RANGE = (1e3, 1e7)
+VALUE_BINS = 512
+
+YEAR_BUILT_MIN = 1800
+PRE_WAR_YEAR = 1940
+
+# Coordinate systems read as lon/lat without reprojecting (NAD83 and WGS84
+# differ by about a meter)
+LONLAT_CRS = {'EPSG:4326', 'EPSG:4269', 'OGC:CRS84'}
+
+
+def resolve_fields(columns, field_names=PARCEL_FIELDS):
+    """{role: column name} for the roles in field_names present in columns."""
+    lower = {str(col).lower(): col for col in columns}
+    fields = {}
+    for role, names in field_names.items():
+        for name in names:
+            if name in lower:
+                fields[role] = lower[name]
+                break
+    return fields
+
+
+def require_fields(fields, roles, path, field_names=PARCEL_FIELDS):
+    missing = [role for role in roles if role not in fields]
+    if missing:
+        expected = '; '.join(f"{role}: {', '.join(field_names[role])}" for role in missing)
+        raise ValueError(f"{path} has no column for {', '.join(missing)} (expected one of {expected})")
+
+
+def numeric_column(frame, fields, role):
+    """A role's column as float64 (unparseable values NaN); all NaN when the file lacks it."""
+    if role not in fields:
+        return np.full(len(frame), np.nan)
+    return pd.to_numeric(frame[fields[role]], errors='coerce').to_numpy(dtype=float)
+
+
+def _surface_xy(geometries):
+    """(x, y) of a point on the surface of each geometry; NaN for missing or empty ones."""
+    import shapely
+
+    points = shapely.point_on_surface(geometries)
+    return shapely.get_x(points), shapely.get_y(points)
+
+
+def frame_lonlat(frame, fields, path):
+    """(lon, lat) of a chunk of a CSV or Parquet file (lon/lat or WKT/WKB geometry)."""
+    import shapely
+
+    if 'lon' in fields and 'lat' in fields:
+        return numeric_column(frame, fields, 'lon'), numeric_column(frame, fields, 'lat')
+    require_fields(fields, ['geometry'], path)
+    column = frame[fields['geometry']]
+    geometry = column.astype(object).where(column.notna(), None).to_numpy()
+    first = next((g for g in geometry if g is not None), None)
+    parse = shapely.from_wkb if isinstance(first, bytes) else shapely.from_wkt
+    return _surface_xy(parse(geometry))
+
+
+def table_batches(path, field_names, required, chunk_rows=CHUNK_ROWS):
+    """
+    (resolved fields, DataFrame chunks) of a CSV or Parquet file, reading
+    only the columns that resolve to a role of field_names.
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        fields = resolve_fields(parquet.schema_arrow.names, field_names)
+        require_fields(fields, required, path, field_names)
+        return fields, (batch.to_pandas() for batch in parquet.iter_batches(
+            batch_size=chunk_rows, columns=sorted(set(fields.values()))))
+
+    fields = resolve_fields(pd.read_csv(path, nrows=0).columns, field_names)
+    require_fields(fields, required, path, field_names)
+    return fields, pd.read_csv(path, usecols=sorted(set(fields.values())), chunksize=chunk_rows)
+
+
+def _table_chunks(path, chunk_rows):
+    """(lon, lat, value, year_built) chunks of a CSV or Parquet parcel file."""
+    fields, batches = table_batches(path, PARCEL_FIELDS, ['value'], chunk_rows)
+    for frame in batches:
+        yield (*frame_lonlat(frame, fields, path),
+               numeric_column(frame, fields, 'value'), numeric_column(frame, fields, 'year_built'))
+
+
+def _ogr_chunks(path, chunk_rows, layer=None):
+    """(lon, lat, value, year_built) chunks of a GDAL-readable parcel file."""
+    import pyogrio
+    import shapely
+    from pyogrio.raw import read
+
+    info = pyogrio.read_info(path, layer=layer)
+    fields = resolve_fields(info['fields'])
+    require_fields(fields, ['value'], path)
+    columns = [fields[role] for role in ('value', 'year_built') if role in fields]
+
+    transformer = None
+    if info['crs'] and info['crs'] not in LONLAT_CRS:
+        from pyproj import Transformer
+        transformer = Transformer.from_crs(info['crs'], 'EPSG:4326', always_xy=True)
+
+    for skip in range(0, info['features'], chunk_rows):
+        _, _, wkb, field_data = read(path, layer=layer, columns=columns,
+                                     skip_features=skip, max_features=chunk_rows)
+        x, y = _surface_xy(shapely.from_wkb(wkb))
+        if transformer is not None:
+            x, y = transformer.transform(x, y)
+        data = dict(zip(columns, field_data))
+        year = (pd.to_numeric(data[fields['year_built']], errors='coerce').astype(float)
+                if 'year_built' in fields else np.full(len(x), np.nan))
+        yield x, y, pd.to_numeric(data[fields['value']], errors='coerce').astype(float), year
+
+
+def read_parcel_chunks(path, chunk_rows=CHUNK_ROWS, layer=None):
+    """
+    Stream a parcel file as (lon, lat, assessed value, year built) arrays
+    of at most chunk_rows parcels; missing values and locations are NaN.
+    """
+    if path.endswith(('.csv', '.csv.gz', '.parquet')):
+        yield from _table_chunks(path, chunk_rows)
+    else:
+        yield from _ogr_chunks(path, chunk_rows, layer=layer)
+
+
+def block_group_index(block_groups_file):
+    """(GEOIDs, prepared polygons, STRtree of the polygons) for a block group GeoJSON."""
+    import shapely
+    from pyogrio.raw import read
+
+    _, _, wkb, (geoids,) = read(block_groups_file, columns=['GEOID'])
+    polygons = shapely.from_wkb(wkb)
+    shapely.prepare(polygons)
+    return geoids.astype(str), polygons, shapely.STRtree(polygons)
+
+
+def assign_block_groups(polygons, tree, lon, lat):
+    """
+    Index of the polygon containing each point; -1 when none does. The tree
+    only finds candidate polygons by bounding box; the exact test then runs
+    once per polygon over all of its candidates (intersects_xy on the
+    prepared polygon), which is several times faster than a per-point
+    predicate query.
+    """
+    import shapely
+
+    assigned = np.full(len(lon), -1, dtype=np.int64)
+    points, candidates = tree.query(shapely.points(lon, lat))
+    if not len(points):
+        return assigned
+
+    order = np.argsort(candidates, kind='stable')
+    points, candidates = points[order], candidates[order]
+    starts = np.flatnonzero(np.r_[True, candidates[1:] != candidates[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(candidates)]):
+        block = points[start:end]
+        inside = shapely.intersects_xy(polygons[candidates[start]], lon[block], lat[block])
+        # A point on a shared boundary is in both polygons; the last one wins
+        assigned[block[inside]] = candidates[start]
+    return assigned
+
+
+def aggregate_parcels(parcel_file, block_groups_file, chunk_rows=CHUNK_ROWS, layer=None):
+    """
+    Stream parcel_file into per-block-group statistics. Returns the
+    assessor table (one row per block group with at least one parcel; see
+    the module docstring for its columns) and a dict of parcel counts.
+    """
+    geoids, polygons, tree = block_group_index(block_groups_file)
+    n = len(geoids)
+
+    parcels = np.zeros(n, dtype=np.int64)
+    value_sum = np.zeros(n)
+    year_sum = np.zeros(n)
+    pre_war = np.zeros(n, dtype=np.int64)
+    values = GroupedHistogram.log_spaced(n, *VALUE_RANGE, VALUE_BINS)
+    years = GroupedHistogram.integers(n, YEAR_BUILT_MIN, REFERENCE_YEAR)
+    stats = {'read': 0, 'outside': 0, 'no_geometry': 0, 'valued': 0, 'dated': 0}
+
+    for lon, lat, value, year in read_parcel_chunks(parcel_file, chunk_rows, layer=layer):
+        stats['read'] += len(lon)
+        located = np.isfinite(lon) & np.isfinite(lat)
+        stats['no_geometry'] += int((~located).sum())
+
+        bg = np.full(len(lon), -1, dtype=np.int64)
+        bg[located] = assign_block_groups(polygons, tree, lon[located], lat[located])
+        stats['outside'] += int(((bg < 0) & located).sum())
+        inside = bg >= 0
+        bg, value, year = bg[inside], value[inside] * PARCEL_VALUE_SCALE, year[inside]
+
+        parcels += np.bincount(bg, minlength=n)
+
+        valued = np.isfinite(value) & (value > 0)
+        value_sum += np.bincount(bg[valued], weights=value[valued], minlength=n)
+        values.add(bg[valued], value[valued])
+        stats['valued'] += int(valued.sum())
+
+        dated = np.isfinite(year) & (year >= YEAR_BUILT_MIN) & (year <= REFERENCE_YEAR)
+        year_sum += np.bincount(bg[dated], weights=year[dated], minlength=n)
+        pre_war += np.bincount(bg[dated & (year < PRE_WAR_YEAR)], minlength=n)
+        years.add(bg[dated], year[dated])
+        stats['dated'] += int(dated.sum())
+
+    n_valued, n_dated = values.totals(), years.totals()
+    value_q = values.quantiles([0.5, 0.25, 0.75])
+    year_median = years.quantiles([0.5])[:, 0]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table = pd.DataFrame({
+            'GEOID': geoids,
+            'assessed_value_median': value_q[:, 0].round(),
+            'assessed_value_mean': (value_sum / n_valued).round(2),
+            'parcel_count_estimated': parcels,
+            'property_age_estimate': REFERENCE_YEAR - np.round(year_median),
+            'assessed_value_p25': value_q[:, 1].round(),
+            'assessed_value_p75': value_q[:, 2].round(),
+            'year_built_median': np.round(year_median),
+            'year_built_mean': (year_sum / n_dated).round(1),
+            'pct_built_pre1940': (pre_war / n_dated).round(4),
+        })
+    return table[parcels > 0].reset_index(drop=True), stats
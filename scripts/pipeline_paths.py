@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Artifact paths for the data pipeline.
+
+Every step takes a `paths` dict from county_paths() so the same code can run
+for Ingham County (the default, flat layout under data/ and models/) or for any
+other county in its own partition directory:
+
+    data/counties/<state><county>/block_groups/block_groups.geojson
+    data/counties/<state><county>/processed/census_by_bg.csv
+    data/counties/<state><county>/models/equity_model.pkl
+    ...
+
+Paths are relative to the scripts/ directory, like the rest of the pipeline.
+The processed tables use the extension of the storage format selected with
+PIPELINE_STORAGE (csv or parquet, see storage.py). PIPELINE_MODELS picks
+what script 06 trains: 'separate' (one forest per target, the default) or
+'joint' (one multi-output forest, see trained_models.py); 'model_files'
+lists the files of the selected layout and 'model_artifacts' their flat
+.forest exports (forest_artifact.py).
+"""
+
+import os
+
+DEFAULT_STATE = '26'   # Michigan
+DEFAULT_COUNTY = '065'  # Ingham County
+
+DATA_ROOT = '../data'
+MODELS_ROOT = '../models'
+PARTITION_ROOT = os.path.join(DATA_ROOT, 'counties')
+
+STORAGE_FORMAT = os.environ.get('PIPELINE_STORAGE', 'csv').lower()
+if STORAGE_FORMAT not in ('csv', 'parquet'):
+    raise ValueError(f"PIPELINE_STORAGE must be 'csv' or 'parquet', got {STORAGE_FORMAT!r}")
+TABLE_EXTENSION = '.' + STORAGE_FORMAT
+
+MODEL_LAYOUT = os.environ.get('PIPELINE_MODELS', 'separate').lower()
+if MODEL_LAYOUT not in ('separate', 'joint'):
+    raise ValueError(f"PIPELINE_MODELS must be 'separate' or 'joint', got {MODEL_LAYOUT!r}")
+
+
+def county_paths(state_fips=DEFAULT_STATE, county_fips=DEFAULT_COUNTY, partitioned=False):
+    """
+    Return input/output paths for one county.
+
+    With partitioned=False (the default) this is the original single-county
+    layout the webapp reads from. With partitioned=True every artifact,
+    including the trained models, lives under data/counties/<state><county>/
+    so one county can be recomputed without touching the others.
+    """
+    if partitioned:
+        root = os.path.join(PARTITION_ROOT, f'{state_fips}{county_fips}')
+        block_groups_dir = os.path.join(root, 'block_groups')
+        processed_dir = os.path.join(root, 'processed')
+        models_dir = os.path.join(root, 'models')
+        block_groups_file = os.path.join(block_groups_dir, 'block_groups.geojson')
+    else:
+        root = DATA_ROOT
+        block_groups_dir = os.path.join(DATA_ROOT, 'block_groups')
+        processed_dir = os.path.join(DATA_ROOT, 'processed')
+        models_dir = MODELS_ROOT
+        block_groups_file = os.path.join(block_groups_dir, 'ingham_block_groups.geojson')
+
+    equity_model = os.path.join(models_dir, 'equity_model.pkl')
+    foreclosure_model = os.path.join(models_dir, 'foreclosure_model.pkl')
+    joint_model = os.path.join(models_dir, 'housing_model.pkl')
+    model_files = [joint_model] if MODEL_LAYOUT == 'joint' else [equity_model, foreclosure_model]
+
+    return {
+        'state_fips': state_fips,
+        'county_fips': county_fips,
+        'root': root,
+        'block_groups_dir': block_groups_dir,
+        'processed_dir': processed_dir,
+        'models_dir': models_dir,
+        'block_groups': block_groups_file,
+        'adjacency': os.path.splitext(block_groups_file)[0] + '.adjacency.json',
+        'census': os.path.join(processed_dir, 'census_by_bg' + TABLE_EXTENSION),
+        'census_panel': os.path.join(processed_dir, 'census_panel_by_bg' + TABLE_EXTENSION),
+        'census_trends': os.path.join(processed_dir, 'census_trends_by_bg' + TABLE_EXTENSION),
+        'assessor': os.path.join(processed_dir, 'assessor_by_bg' + TABLE_EXTENSION),
+        'mls': os.path.join(processed_dir, 'synthetic_mls_by_bg' + TABLE_EXTENSION),
+        'mls_state': os.path.join(processed_dir, 'mls_sales_state.npz'),
+        'accessibility': os.path.join(processed_dir, 'accessibility_by_bg' + TABLE_EXTENSION),
+        'features': os.path.join(processed_dir, 'bg_features' + TABLE_EXTENSION),
+        'features_state': os.path.join(processed_dir, 'bg_features_state.npz'),
+        'stale_predictions': os.path.join(processed_dir, 'stale_predictions.json'),
+        'equity_model': equity_model,
+        'foreclosure_model': foreclosure_model,
+        'joint_model': joint_model,
+        'model_files': model_files,
+        'model_artifacts': [os.path.splitext(f)[0] + '.forest' for f in model_files],
+        'search_cache': os.path.join(models_dir, 'search_cache'),
+        'predictions': os.path.join(block_groups_dir, 'bg_predictions.json'),
+        'predictions_bin': os.path.join(block_groups_dir, 'bg_predictions.bin'),
+        'snapshots': os.path.join(block_groups_dir, 'snapshots'),
+        'analytics_db': os.path.join(block_groups_dir, 'bg_analytics.sqlite'),
+    }
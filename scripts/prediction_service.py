@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Prediction Service
+
+Long-running local HTTP service that keeps both models and the feature
+matrix in memory, so callers don't pay joblib.load() and CSV parsing per
+request the way script 07 does.
+
+Endpoints:
+    GET  /health                      model/feature status
+    GET  /predictions                 every block group (bg_predictions.json schema)
+    GET  /predictions?geoids=A,B      a subset
+    GET  /predictions/<GEOID>         one block group
+    POST /score                       what-if scenario(s), see scenarios.py:
+                                      {"geoids": [...], "scale": {...}, "shift": {...}}
+                                      or a list of those
+
+Baseline predictions are computed once at startup. Scenario requests that
+arrive concurrently are micro-batched: the batcher thread waits up to
+--batch-wait-ms for more requests, then scores all of them with one
+predict() call per model.
+
+Usage (from scripts/):
+    python prediction_service.py --port 8765
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pipeline_paths import county_paths
+from scenarios import load_engine, score_scenarios
+from scoring import gentrification_risk
+from trained_models import predict_targets
+from uncertainty import prediction_intervals
+
+predictions_step = importlib.import_module('07_generate_predictions')
+
+
+def load_service_state(paths=None):
+    """Warm everything once: models, feature matrix and baseline predictions."""
+    paths = paths or county_paths()
+    engine = load_engine(paths)
+
+    # Baseline exactly as script 07 computes it
+    features = engine['base'].reset_index()
+    X = features[engine['feature_cols']]
+    X = X.fillna(X.median())
+    records = predictions_step.build_prediction_records(
+        features,
+        *predict_targets(engine['models'], X),
+        gentrification_risk(features),
+        prediction_intervals(engine['models'], X, len(X)),
+    )
+
+    return {
+        'engine': engine,
+        'records': records,
+        'by_geoid': {r['geoid']: r for r in records},
+        'loaded_at': time.time(),
+    }
+
+
+def parse_scenarios(payload):
+    """Scenario list from a /score body; ValueError when it is malformed."""
+    scenarios = payload if isinstance(payload, list) else [payload]
+    if not scenarios:
+        raise ValueError("Expected a scenario or a non-empty list of scenarios")
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            raise ValueError(f"Scenario {i} must be an object")
+        geoids = scenario.get('geoids')
+        if geoids is not None and not (isinstance(geoids, list) and all(
+                isinstance(g, (str, int)) and not isinstance(g, bool) for g in geoids)):
+            raise ValueError(f"Scenario {i}: geoids must be a list of GEOIDs")
+        for key in ('scale', 'shift'):
+            values = scenario.get(key, {})
+            if not isinstance(values, dict):
+                raise ValueError(f"Scenario {i}: {key} must map feature columns to numbers")
+            for col, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                    raise ValueError(f"Scenario {i}: {key}.{col} must be a finite number")
+    return scenarios
+
+
+def start_batcher(engine, max_batch=256, max_wait_ms=2.0):
+    """
+    Start the micro-batching thread. Returns submit(scenarios) which blocks
+    until the scenarios are scored and returns their result rows.
+    """
+    requests_q = queue.Queue()
+    max_wait = max_wait_ms / 1000
+
+    def run_batch(batch):
+        # Number scenarios across the whole batch so results can be split back
+        scenarios = []
+        for item in batch:
+            item['ids'] = []
+            for s in item['scenarios']:
+                item['ids'].append(len(scenarios))
+                scenarios.append({**s, 'name': len(scenarios)})
+        results = score_scenarios(engine, scenarios)
+        groups = {k: g.drop(columns='scenario') for k, g in results.groupby('scenario', sort=False)}
+        for item in batch:
+            item['result'] = [
+                {'scenario': item['scenarios'][j].get('name', j),
+                 'rows': groups[sid].to_dict(orient='records') if sid in groups else []}
+                for j, sid in enumerate(item['ids'])
+            ]
+
+    def loop():
+        while True:
+            batch = [requests_q.get()]
+            n_scenarios = len(batch[0]['scenarios'])
+            deadline = time.monotonic() + max_wait
+            while n_scenarios < max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = requests_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_scenarios += len(item['scenarios'])
+
+            try:
+                run_batch(batch)
+            except Exception:
+                # A bad request shouldn't fail its batch-mates: score one by one
+                for item in batch:
+                    try:
+                        run_batch([item])
+                    except (KeyError, ValueError) as e:
+                        item['error'] = str(e.args[0]) if e.args else str(e)
+                    except Exception as e:
+                        item['error'] = f"{type(e).__name__}: {e}"
+
+            for item in batch:
+                item['done'].set()
+
+    threading.Thread(target=loop, name='score-batcher', daemon=True).start()
+
+    def submit(scenarios):
+        item = {'scenarios': scenarios, 'done': threading.Event()}
+        requests_q.put(item)
+        item['done'].wait()
+        if 'error' in item:
+            raise ValueError(item['error'])
+        return item['result']
+
+    return submit
+
+
+def make_handler(state, submit):
+    """Build the request handler class bound to the warm state."""
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; without this, Nagle +
+        # delayed ACK adds ~40ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split('/') if p]
+
+            if parts == ['health']:
+                self._send_json(200, {
+                    'status': 'ok',
+                    'block_groups': len(state['records']),
+                    'loaded_at': state['loaded_at'],
+                })
+            elif parts == ['predictions']:
+                geoids = parse_qs(url.query).get('geoids')
+                if geoids:
+                    wanted = geoids[0].split(',')
+                    self._send_json(200, [state['by_geoid'][g] for g in wanted if g in state['by_geoid']])
+                else:
+                    self._send_json(200, state['records'])
+            elif len(parts) == 2 and parts[0] == 'predictions':
+                record = state['by_geoid'].get(parts[1])
+                if record is None:
+                    self._send_json(404, {'error': f'Unknown GEOID: {parts[1]}'})
+                else:
+                    self._send_json(200, record)
+            else:
+                self._send_json(404, {'error': f'Unknown endpoint: {url.path}'})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/score':
+                self._send_json(404, {'error': f'Unknown endpoint: {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                self._send_json(200, submit(parse_scenarios(payload)))
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet under load
+
+    return PredictionHandler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    request_queue_size = 128  # default backlog of 5 drops bursts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve predictions from warm models.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help="max scenarios per predict() call (default: 256)")
+    parser.add_argument('--batch-wait-ms', type=float, default=2.0,
+                        help="how long to wait for more requests to batch (default: 2)")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("PREDICTION SERVICE")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    state = load_service_state()
+    print(f"\n✓ Models and features loaded in {time.perf_counter() - start:.2f}s "
+          f"({len(state['records'])} block groups)")
+
+    # Models were fitted with n_jobs=-1; inside a server, thread fan-out per
+    # small batch costs more than it saves
+    for model in state['engine']['models'].values():
+        if hasattr(model, 'set_params'):  # pickled sklearn forests only
+            model.set_params(n_jobs=1)
+
+    submit = start_batcher(state['engine'], args.max_batch, args.batch_wait_ms)
+    server = PredictionServer((args.host, args.port), make_handler(state, submit))
+    print(f"🚀 Listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
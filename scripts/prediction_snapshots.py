@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Versioned, content-addressed prediction snapshots with diffs (script 07).
+
+bg_predictions.json/.bin are rewritten on every run, so a client always
+downloads every block group. Each run of script 07 also publishes a
+snapshot into data/block_groups/snapshots/:
+
+    manifest.json                 latest snapshot id and the kept history
+    objects/<id>.bin              snapshot (predictions_payload binary format)
+    objects/<from>-<to>.bin       diff: the records that changed, same format
+
+A snapshot's id is the first 16 hex digits of the SHA-256 of its bytes, so
+files under objects/ never change and can be cached indefinitely; only the
+manifest is mutable. A client holding snapshot <from> fetches the diffs
+along the manifest's history up to the latest snapshot instead of the whole
+payload, or the latest snapshot when its own has been evicted. Each
+manifest entry names its diff and the GEOIDs it removes (block groups only
+disappear with new boundaries, so the list is almost always empty):
+
+    {"id": "<to>", "file": "objects/<to>.bin", ...,
+     "diff": {"from": "<from>", "file": "objects/<from>-<to>.bin", "remove": [...], ...}}
+
+A diff carries only the block groups whose scores (equity, gentrification
+and foreclosure, and their bands) moved by more than DIFF_THRESHOLD points
+since the previous snapshot, whose other fields changed, or that are new.
+The snapshot keeps the previous record of every other block group, so
+applying a diff to its base (apply_diff()) reproduces the next snapshot
+exactly, and every published score is within DIFF_THRESHOLD of the latest
+prediction. Set the threshold to 0 for snapshots equal to
+bg_predictions.bin.
+
+Eviction: the manifest keeps the KEEP_SNAPSHOTS newest snapshots. Older
+snapshots, and the diff into the oldest kept one, are deleted once the new
+manifest is written.
+
+Copy the snapshots to the webapp (new objects first, then the manifest,
+then evicted objects are removed, so a reader never sees a manifest
+pointing at a missing file):
+    python prediction_snapshots.py --publish ../webapp/public/data/snapshots
+
+Configuration (environment variables):
+    PREDICTIONS_DIFF_THRESHOLD    score change that goes into a diff (default: 0.5)
+    PREDICTIONS_KEEP_SNAPSHOTS    snapshots kept (default: 12)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from predictions_payload import decode_records, encode_predictions
+
+DIFF_THRESHOLD = float(os.environ.get('PREDICTIONS_DIFF_THRESHOLD', 0.5))
+KEEP_SNAPSHOTS = int(os.environ.get('PREDICTIONS_KEEP_SNAPSHOTS', 12))
+
+MANIFEST_VERSION = 1
+
+# Fields compared against the threshold; any other field goes into a diff on any change
+SCORE_FIELDS = {
+    'equity_score', 'gentrification_risk', 'foreclosure_risk',
+    'equity_low', 'equity_high', 'foreclosure_low', 'foreclosure_high',
+}
+
+
+def snapshot_id(payload):
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def _write_atomic(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(directory):
+    """The manifest in directory, or an empty one."""
+    path = os.path.join(directory, 'manifest.json')
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'latest': None, 'snapshots': []}
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported snapshot manifest version {manifest.get('version')}")
+    return manifest
+
+
+def moved(previous, record, threshold=DIFF_THRESHOLD):
+    """Whether record differs from previous enough to go into a diff."""
+    if previous.keys() != record.keys():
+        return True
+    for field, value in record.items():
+        if field in SCORE_FIELDS:
+            if abs(value - previous[field]) > threshold + 1e-9:
+                return True
+        elif value != previous[field]:
+            return True
+    return False
+
+
+def diff_records(previous, records, threshold=DIFF_THRESHOLD):
+    """
+    (snapshot records, diff upserts, removed GEOIDs) for new records against
+    the previous snapshot's. The snapshot keeps the previous order with
+    moved records replaced and removed ones dropped; new block groups are
+    appended in the order of records, as apply_diff() does.
+    """
+    current = {record['geoid']: record for record in records}
+    known = {record['geoid'] for record in previous}
+
+    snapshot, upserts, removed = [], [], []
+    for old in previous:
+        record = current.get(old['geoid'])
+        if record is None:
+            removed.append(old['geoid'])
+        elif moved(old, record, threshold):
+            snapshot.append(record)
+            upserts.append(record)
+        else:
+            snapshot.append(old)
+    added = [record for record in records if record['geoid'] not in known]
+    return snapshot + added, upserts + added, removed
+
+
+def apply_diff(records, upserts, removed):
+    """The next snapshot's records from the previous one's and a diff (what clients do)."""
+    upserts = {record['geoid']: record for record in upserts}
+    removed = set(removed)
+    out = [upserts.pop(record['geoid'], record) for record in records if record['geoid'] not in removed]
+    return out + list(upserts.values())
+
+
+def read_records(directory, name):
+    """Records of a snapshot or diff object."""
+    with open(os.path.join(directory, name), 'rb') as f:
+        return decode_records(f.read())
+
+
+def publish_snapshot(paths, records, threshold=DIFF_THRESHOLD, keep=KEEP_SNAPSHOTS):
+    """
+    Add a snapshot of records (bg_predictions.json schema) to the
+    snapshots directory, with a diff from the latest one, and evict
+    snapshots beyond keep. Returns the manifest entry, or None when the
+    snapshot equals the latest one.
+    """
+    directory = paths['snapshots']
+    os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+    manifest = load_manifest(directory)
+    latest = manifest['snapshots'][-1] if manifest['snapshots'] else None
+    if latest is not None and not os.path.exists(os.path.join(directory, latest['file'])):
+        latest = None  # deleted by hand: start over from a full snapshot
+
+    if latest is not None:
+        snapshot, upserts, removed = diff_records(read_records(directory, latest['file']), records, threshold)
+    else:
+        snapshot = list(records)
+
+    payload = encode_predictions(snapshot)
+    sid = snapshot_id(payload)
+    if latest is not None and sid == latest['id']:
+        return None
+
+    entry = {
+        'id': sid,
+        'file': f'objects/{sid}.bin',
+        'bytes': len(payload),
+        'count': len(snapshot),
+        'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'diff': None,
+    }
+    snapshot_file = os.path.join(directory, entry['file'])
+    if not os.path.exists(snapshot_file):
+        _write_atomic(snapshot_file, payload)
+    if latest is not None:
+        encoded = encode_predictions(upserts)
+        diff_file = f"objects/{latest['id']}-{sid}.bin"
+        _write_atomic(os.path.join(directory, diff_file), encoded)
+        entry['diff'] = {'from': latest['id'], 'file': diff_file, 'bytes': len(encoded),
+                         'upserts': len(upserts), 'remove': removed}
+
+    manifest['snapshots'].append(entry)
+    manifest['latest'] = sid
+    manifest['threshold'] = threshold
+    evicted = evict(manifest, keep)
+    _write_atomic(os.path.join(directory, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+    remove_unreferenced(directory, manifest, evicted)
+    return entry
+
+
+def manifest_files(manifest):
+    """Object files the manifest refers to."""
+    files = set()
+    for entry in manifest['snapshots']:
+        files.add(entry['file'])
+        if entry['diff']:
+            files.add(entry['diff']['file'])
+    return files
+
+
+def evict(manifest, keep):
+    """Drop all but the keep newest snapshots from manifest (in place); returns the files they used."""
+    before = manifest_files(manifest)
+    manifest['snapshots'] = manifest['snapshots'][-max(keep, 1):]
+    # The oldest kept snapshot has no base left to diff from
+    manifest['snapshots'][0]['diff'] = None
+    return before - manifest_files(manifest)
+
+
+def remove_unreferenced(directory, manifest, files):
+    """Delete the files no longer in the manifest (a snapshot can recur, so check)."""
+    referenced = manifest_files(manifest)
+    for name in files - referenced:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def sync_snapshots(source, destination):
+    """
+    Copy the snapshots in source to destination (e.g. the webapp's
+    public/data/snapshots): new objects, then the manifest, then delete the
+    objects the manifest dropped. Returns (copied, removed) counts.
+    """
+    manifest = load_manifest(source)
+    os.makedirs(os.path.join(destination, 'objects'), exist_ok=True)
+    files = manifest_files(manifest)
+
+    copied = 0
+    for name in sorted(files):
+        target = os.path.join(destination, name)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(source, name), target + '.tmp')
+            os.replace(target + '.tmp', target)
+            copied += 1
+    _write_atomic(os.path.join(destination, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+
+    stale = {f'objects/{name}' for name in os.listdir(os.path.join(destination, 'objects'))} - files
+    remove_unreferenced(destination, manifest, stale)
+    return copied, len(stale)
+
+
+def main():
+    from pipeline_paths import county_paths
+
+    parser = argparse.ArgumentParser(description="Inspect or publish prediction snapshots.")
+    parser.add_argument('--publish', metavar='DIR',
+                        help="copy the snapshots to DIR, e.g. ../webapp/public/data/snapshots")
+    args = parser.parse_args()
+
+    source = county_paths()['snapshots']
+    manifest = load_manifest(source)
+    if not manifest['snapshots']:
+        print(f"No snapshots in {source}; run script 07 first")
+        return
+
+    print(f"{'snapshot':<18} {'created':<21} {'rows':>6} {'KB':>7} {'diff KB':>8} {'upserts':>8}")
+    for entry in manifest['snapshots']:
+        diff = entry['diff']
+        print(f"{entry['id']:<18} {entry['created']:<21} {entry['count']:>6} {entry['bytes'] / 1024:>7.1f} "
+              f"{diff['bytes'] / 1024 if diff else 0:>8.1f} {diff['upserts'] if diff else '-':>8}")
+
+    if args.publish:
+        copied, removed = sync_snapshots(source, args.publish)
+        print(f"\n✓ Published to {args.publish}: {copied} new objects, {removed} evicted")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    main()
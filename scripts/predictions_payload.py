@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Compact predictions payloads for the webapp.
+
+bg_predictions.json is an array of objects, so every field name is repeated
+for every block group. Two smaller forms are written next to it:
+
+- Compact JSON: the same array with no indentation. Set
+  PREDICTIONS_COMPACT=1 to write bg_predictions.json this way.
+- bg_predictions.bin: a struct-of-arrays binary layout. Decoding it needs no
+  JSON parse of the rows and yields typed arrays directly.
+
+Binary layout (all integers little-endian):
+
+    magic      4 bytes   b'BGPR'
+    header_len uint32    length of the JSON header that follows
+    header     JSON      {"version": 1, "count": n, "columns": [...]},
+                         space-padded so the data section is 8-byte aligned
+    data       one block per column, each starting on an 8-byte boundary
+
+Each column entry in the header gives its name, type, byte offset into the
+data section and, for fixed-point columns, a scale (stored = round(value *
+scale)). Numeric columns are plain arrays of `type`. String columns ("str")
+are n + 1 uint32 end offsets into a UTF-8 blob that follows them. Readers
+must check `version` and look columns up by name, so columns can be added
+without breaking old readers.
+
+Scores are stored as uint16 tenths and price_yoy_change as int32
+ten-thousandths: exactly the precision of the JSON output, so decoding
+reproduces bg_predictions.json value for value. The uncertainty band
+columns (equity_low/high, foreclosure_low/high) are optional: they are
+written when the records carry them (script 07 without --no-intervals).
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'BGPR'
+VERSION = 1
+
+COMPACT_JSON = os.environ.get('PREDICTIONS_COMPACT') == '1'
+
+# (field, type, fixed-point scale) in bg_predictions.json order
+COLUMNS = [
+    ('geoid', 'str', None),
+    ('name', 'str', None),
+    ('equity_score', 'u16', 10),
+    ('gentrification_risk', 'u16', 10),
+    ('foreclosure_risk', 'u16', 10),
+    ('median_income', 'i32', None),
+    ('median_price', 'i32', None),
+    ('population', 'i32', None),
+    ('days_on_market', 'i32', None),
+    ('price_yoy_change', 'i32', 10000),
+    ('equity_low', 'u16', 10),
+    ('equity_high', 'u16', 10),
+    ('foreclosure_low', 'u16', 10),
+    ('foreclosure_high', 'u16', 10),
+]
+
+# Columns left out of the payload when the records don't have them
+OPTIONAL_COLUMNS = {'equity_low', 'equity_high', 'foreclosure_low', 'foreclosure_high'}
+
+_DTYPES = {'u16': '<u2', 'i32': '<i4'}
+
+
+def _pad(n, align=8):
+    return -n % align
+
+
+def write_predictions_json(records, path, compact=COMPACT_JSON):
+    """Write the array-of-objects JSON, indented (default) or compact."""
+    with open(path, 'w') as f:
+        if compact:
+            json.dump(records, f, separators=(',', ':'))
+        else:
+            json.dump(records, f, indent=2)
+
+
+def encode_predictions(records):
+    """Encode prediction records (bg_predictions.json schema) as bytes."""
+    blocks = []
+    columns = []
+    offset = 0
+    for field, kind, scale in COLUMNS:
+        if field in OPTIONAL_COLUMNS and not (records and field in records[0]):
+            continue
+        values = [r[field] for r in records]
+        if kind == 'str':
+            encoded = [v.encode('utf-8') for v in values]
+            ends = np.cumsum([0] + [len(v) for v in encoded], dtype='<u4')
+            block = ends.tobytes() + b''.join(encoded)
+        else:
+            data = np.asarray(values, dtype=float)
+            if scale:
+                data = np.rint(data * scale)
+            info = np.iinfo(_DTYPES[kind])
+            if len(data) and (data.min() < info.min or data.max() > info.max):
+                raise ValueError(f"{field} does not fit in {kind}")
+            block = data.astype(_DTYPES[kind]).tobytes()
+
+        column = {'name': field, 'type': kind, 'offset': offset}
+        if scale:
+            column['scale'] = scale
+        columns.append(column)
+        block += b'\0' * _pad(len(block))
+        blocks.append(block)
+        offset += len(block)
+
+    header = json.dumps(
+        {'version': VERSION, 'count': len(records), 'columns': columns},
+        separators=(',', ':'),
+    ).encode()
+    header += b' ' * _pad(len(MAGIC) + 4 + len(header))
+    return MAGIC + struct.pack('<I', len(header)) + header + b''.join(blocks)
+
+
+def decode_predictions(payload):
+    """Decode bytes from encode_predictions() back into a dict of columns."""
+    if payload[:4] != MAGIC:
+        raise ValueError("Not a predictions payload")
+    (header_len,) = struct.unpack_from('<I', payload, 4)
+    header = json.loads(payload[8:8 + header_len])
+    if header['version'] != VERSION:
+        raise ValueError(f"Unsupported predictions payload version {header['version']}")
+
+    n = header['count']
+    data = memoryview(payload)[8 + header_len:]
+    columns = {}
+    for column in header['columns']:
+        start = column['offset']
+        if column['type'] == 'str':
+            ends = np.frombuffer(data, dtype='<u4', count=n + 1, offset=start)
+            blob = bytes(data[start + 4 * (n + 1):start + 4 * (n + 1) + int(ends[-1])])
+            columns[column['name']] = [
+                blob[a:b].decode('utf-8') for a, b in zip(ends[:-1], ends[1:])
+            ]
+        else:
+            values = np.frombuffer(data, dtype=_DTYPES[column['type']], count=n, offset=start)
+            columns[column['name']] = values / column['scale'] if 'scale' in column else values
+    return columns
+
+
+def decode_records(payload):
+    """Decode to the bg_predictions.json array-of-objects form."""
+    columns = decode_predictions(payload)
+    fields = [field for field, _, _ in COLUMNS if field in columns]
+    rows = zip(*(columns[f] if isinstance(columns[f], list) else columns[f].tolist() for f in fields))
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def write_predictions_binary(records, path):
+    with open(path, 'wb') as f:
+        f.write(encode_predictions(records))
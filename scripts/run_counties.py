@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Multi-County Pipeline Runner
+
+Runs steps 01-07 for a list of counties (or every county in a state) in a
+process pool, one county per worker. Each county writes into its own
+partition under data/counties/<state><county>/, so re-running a single county
+leaves the others untouched. After the pool finishes, all completed
+partitions are merged into data/counties/merged/.
+
+Usage (from scripts/):
+    python run_counties.py 26065 26037     # Ingham + Clinton counties
+    python run_counties.py 26              # every county in Michigan
+    python run_counties.py 26 39 --jobs 8  # Michigan and Ohio
+    python run_counties.py 26 --skip-existing
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+from pipeline_paths import PARTITION_ROOT, TABLE_EXTENSION, county_paths
+
+# (module, function, paths key of the artifact the step must produce)
+STEPS = [
+    ('01_fetch_block_groups', 'fetch_block_groups', 'block_groups'),
+    ('02_fetch_census', 'fetch_census_data', 'census'),
+    ('03_fetch_assessor', 'fetch_assessor_data', 'assessor'),
+    ('04_generate_synthetic_mls', 'generate_synthetic_mls', 'mls'),
+    ('05_engineer_features', 'engineer_features', 'features'),
+    ('06_train_model', 'train_models', 'model_files'),
+    ('07_generate_predictions', 'generate_predictions', 'predictions'),
+]
+
+MERGED_DIR = os.path.join(PARTITION_ROOT, 'merged')
+
+
+def list_state_counties(state_fips):
+    """Return the 3-digit county FIPS codes for a state from the Census API."""
+    import http_cache
+
+    params = {'get': 'NAME', 'for': 'county:*', 'in': f'state:{state_fips}'}
+    api_key = os.environ.get('CENSUS_API_KEY')
+    if api_key:
+        params['key'] = api_key
+
+    rows = http_cache.fetch_json('https://api.census.gov/data/2022/acs/acs5', params=params, timeout=30)
+    county_col = rows[0].index('county')
+    return sorted(row[county_col] for row in rows[1:])
+
+
+def expand_targets(specs):
+    """Turn '26065' / '26' specs into a sorted list of (state, county) pairs."""
+    targets = set()
+    for spec in specs:
+        if len(spec) == 5 and spec.isdigit():
+            targets.add((spec[:2], spec[2:]))
+        elif len(spec) == 2 and spec.isdigit():
+            targets.update((spec, county) for county in list_state_counties(spec))
+        else:
+            raise ValueError(f"Expected a 2-digit state or 5-digit county FIPS, got {spec!r}")
+    return sorted(targets)
+
+
+def _as_list(path_or_paths):
+    return [path_or_paths] if isinstance(path_or_paths, str) else path_or_paths
+
+
+def run_county(state_fips, county_fips):
+    """Run all pipeline steps for one county. Executed inside a worker process."""
+    paths = county_paths(state_fips, county_fips, partitioned=True)
+    os.makedirs(paths['root'], exist_ok=True)
+
+    # Steps report failures by printing and returning early, so each step's
+    # output file is its success marker; drop stale copies of every step's
+    # output first (downloads come back from the HTTP cache).
+    for _, _, output_key in STEPS:
+        for output in _as_list(paths[output_key]):
+            if os.path.exists(output):
+                os.remove(output)
+
+    log_file = os.path.join(paths['root'], 'pipeline.log')
+    start = time.perf_counter()
+    error = None
+    with open(log_file, 'w') as log, redirect_stdout(log):
+        for module_name, func_name, output_key in STEPS:
+            try:
+                getattr(importlib.import_module(module_name), func_name)(paths)
+            except Exception as e:
+                error = f"{module_name}: {type(e).__name__}: {e}"
+                print(f"\n❌ {error}")
+                break
+            missing = [out for out in _as_list(paths[output_key]) if not os.path.exists(out)]
+            if missing:
+                error = f"{module_name} did not write {missing[0]} (see {log_file})"
+                break
+
+    return f'{state_fips}{county_fips}', time.perf_counter() - start, error
+
+
+def merge_partitions():
+    """Concatenate every completed county partition into data/counties/merged/."""
+    import geopandas as gpd
+    import pandas as pd
+    from adjacency import build_adjacency, write_adjacency
+    from predictions_payload import write_predictions_binary, write_predictions_json
+    from storage import read_table, write_table
+
+    partitions = sorted(
+        d for d in glob.glob(os.path.join(PARTITION_ROOT, '*'))
+        if os.path.basename(d).isdigit()
+    )
+    fips_list = []
+    predictions = []
+    geo_features = []
+    feature_frames = []
+
+    for root in partitions:
+        fips = os.path.basename(root)
+        paths = county_paths(fips[:2], fips[2:], partitioned=True)
+        if not os.path.exists(paths['predictions']):
+            continue
+
+        with open(paths['predictions']) as f:
+            predictions.extend(json.load(f))
+        with open(paths['block_groups']) as f:
+            geo_features.extend(json.load(f)['features'])
+        feature_frames.append(read_table(paths['features']))
+        fips_list.append(fips)
+
+    if not fips_list:
+        return []
+
+    os.makedirs(MERGED_DIR, exist_ok=True)
+
+    write_predictions_json(predictions, os.path.join(MERGED_DIR, 'bg_predictions.json'))
+    write_predictions_binary(predictions, os.path.join(MERGED_DIR, 'bg_predictions.bin'))
+    with open(os.path.join(MERGED_DIR, 'block_groups.geojson'), 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': geo_features}, f)
+
+    # Rebuilt rather than concatenated, so block groups on either side of a
+    # county line become neighbors
+    merged_bg = gpd.GeoDataFrame.from_features(geo_features)
+    write_adjacency(build_adjacency(merged_bg), os.path.join(MERGED_DIR, 'block_groups.adjacency.json'))
+    write_table(
+        pd.concat(feature_frames, ignore_index=True),
+        os.path.join(MERGED_DIR, 'bg_features' + TABLE_EXTENSION),
+        'features',
+    )
+
+    return fips_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline for many counties in parallel.")
+    parser.add_argument('targets', nargs='+',
+                        help="5-digit county FIPS (26065) or 2-digit state FIPS (26) for every county")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="skip counties whose partition already has predictions")
+    args = parser.parse_args()
+
+    # Step paths are relative to scripts/
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("MULTI-COUNTY PIPELINE")
+    print("=" * 60)
+
+    targets = expand_targets(args.targets)
+    if args.skip_existing:
+        targets = [
+            (s, c) for s, c in targets
+            if not os.path.exists(county_paths(s, c, partitioned=True)['predictions'])
+        ]
+
+    print(f"\n▶️  Running {len(targets)} counties with {args.jobs} workers...")
+
+    failures = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run_county, s, c) for s, c in targets]
+        for future in as_completed(futures):
+            fips, elapsed, error = future.result()
+            if error:
+                failures.append(fips)
+                print(f"   ❌ {fips} ({elapsed:.1f}s): {error}")
+            else:
+                print(f"   ✓ {fips} ({elapsed:.1f}s)")
+
+    print("\n🔗 Merging county partitions...")
+    merged = merge_partitions()
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"Counties run: {len(targets)} ({len(failures)} failed)")
+    print(f"Partitions merged: {len(merged)}")
+    print(f"Output directory: {MERGED_DIR}")
+
+    if failures:
+        print(f"\n⚠️  Failed counties: {', '.join(sorted(failures))}")
+        print("   Logs: data/counties/<fips>/pipeline.log")
+    else:
+        print("\n✅ Multi-county pipeline complete!")
+
+
+if __name__ == "__main__":
+    main()
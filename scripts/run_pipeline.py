@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Incremental Pipeline Runner
+
+Runs scripts 01-07 as a dependency graph instead of a fixed sequence:
+- Each step declares the files it reads and writes.
+- A step is skipped (cache hit) when the SHA-256 of its inputs and its source
+  code matches the last successful run and its outputs still exist. The code
+  is the script plus every scripts/ module it imports, directly or through
+  other modules, found by scanning their import statements (local_imports()).
+- Steps 01 and 02 read nothing local, only the TIGER and Census downloads, so
+  they also rerun once their last run is older than the HTTP cache TTL
+  (HTTP_CACHE_TTL_DAYS, default 30); the rerun re-validates the cached
+  downloads, and unchanged outputs keep the downstream steps cached.
+- Steps whose dependencies are satisfied run in parallel (01 and 02 have no
+  data dependency on each other).
+
+Run state is kept in data/.pipeline_state.json. Per-step wall time and cache
+hit/miss are reported at the end.
+
+Usage (from scripts/):
+    python run_pipeline.py               # run whatever is out of date
+    python run_pipeline.py --force 06    # rerun step 06 and everything downstream (6 works too)
+    python run_pipeline.py --force all   # rerun everything
+"""
+
+import argparse
+import ast
+import functools
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from http_cache import TTL_SECONDS as FETCH_TTL_SECONDS
+from mls_sales import MLS_FILES, list_sale_files
+from parcels import PARCEL_FILE
+from pipeline_paths import DATA_ROOT, county_paths
+from topology import ZOOM_TOLERANCES_M, topojson_path
+
+STATE_FILE = os.path.join(DATA_ROOT, '.pipeline_state.json')
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.lru_cache(maxsize=None)
+def _direct_imports(script):
+    """
+    scripts/ modules that script imports: import statements anywhere in the
+    file (lazy ones included) and importlib.import_module('<literal>') calls.
+    """
+    with open(os.path.join(SCRIPTS_DIR, script)) as f:
+        tree = ast.parse(f.read(), filename=script)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+              and node.func.attr == 'import_module' and node.args
+              and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            names.add(node.args[0].value)
+    files = {name.split('.')[0] + '.py' for name in names}
+    return frozenset(f for f in files if os.path.exists(os.path.join(SCRIPTS_DIR, f)))
+
+
+def local_imports(script):
+    """Every scripts/ module script imports, directly or transitively, sorted."""
+    found = set()
+    todo = [script]
+    while todo:
+        for module in _direct_imports(todo.pop()):
+            if module not in found and module != script:
+                found.add(module)
+                todo.append(module)
+    return sorted(found)
+
+
+def build_steps(paths):
+    """Declare the pipeline DAG: script, upstream steps, input and output files."""
+    return {
+        '01': {
+            'script': '01_fetch_block_groups.py',
+            'after': [],
+            'inputs': [],
+            'max_age': FETCH_TTL_SECONDS,
+            'outputs': [paths['block_groups'], paths['adjacency'], paths['accessibility']] + [
+                topojson_path(paths['block_groups'], zoom) for zoom in sorted(ZOOM_TOLERANCES_M)
+            ],
+        },
+        '02': {
+            'script': '02_fetch_census.py',
+            'after': [],
+            'inputs': [],
+            'max_age': FETCH_TTL_SECONDS,
+            'outputs': [paths['census'], paths['census_panel'], paths['census_trends']],
+        },
+        '03': {
+            'script': '03_fetch_assessor.py',
+            'after': ['01', '02'],
+            'inputs': [paths['census']] + ([paths['block_groups'], PARCEL_FILE] if PARCEL_FILE else []),
+            'outputs': [paths['assessor']],
+        },
+        '04': {
+            'script': '04_generate_synthetic_mls.py',
+            'after': ['01', '02'],
+            'inputs': [paths['census'], paths['accessibility'], paths['block_groups']] + (
+                list_sale_files(MLS_FILES) if MLS_FILES else []),
+            'outputs': [paths['mls']] + ([paths['mls_state']] if MLS_FILES else []),
+        },
+        '05': {
+            'script': '05_engineer_features.py',
+            'after': ['01', '02', '03', '04'],
+            'inputs': [paths['census'], paths['mls'], paths['assessor'],
+                       paths['accessibility'], paths['adjacency'], paths['census_trends']],
+            'outputs': [paths['features']],
+        },
+        '06': {
+            'script': '06_train_model.py',
+            'after': ['05'],
+            'inputs': [paths['features']],
+            'outputs': paths['model_files'] + paths['model_artifacts'],
+        },
+        '07': {
+            'script': '07_generate_predictions.py',
+            'after': ['05', '06'],
+            'inputs': [paths['features']] + paths['model_files'] + paths['model_artifacts'],
+            'outputs': [paths['predictions'], paths['predictions_bin'], paths['analytics_db']],
+        },
+    }
+
+
+def hash_files(files):
+    """SHA-256 over the names and contents of files (missing files hash as absent)."""
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.encode())
+        if not os.path.exists(path):
+            digest.update(b'<missing>')
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def step_key(step):
+    """Cache key for a step: its script, the modules it imports, and every input file."""
+    return hash_files([step['script']] + local_imports(step['script']) + step['inputs'])
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE) as f:
+        return json.load(f)
+
+
+def save_state(state):
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def run_step(step):
+    """Run one script in a subprocess. Returns (ok, wall_time, captured output)."""
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, step['script']],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    elapsed = time.time() - start
+
+    # The scripts print an error and return (exit code 0) when something is
+    # missing, so also require every output to have been written by this run.
+    ok = proc.returncode == 0 and all(
+        os.path.exists(out) and os.path.getmtime(out) >= start - 1
+        for out in step['outputs']
+    )
+    return ok, elapsed, proc.stdout
+
+
+def resolve_force(steps, names):
+    """--force arguments -> step names ('6' is '06'); ValueError on an unknown one."""
+    if 'all' in names:
+        return set(steps)
+    resolved = set()
+    for name in names:
+        if name.zfill(2) not in steps:
+            raise ValueError(f"Unknown step {name!r} for --force; choose from {', '.join(sorted(steps))} or all")
+        resolved.add(name.zfill(2))
+    return resolved
+
+
+def downstream(steps, roots):
+    """All steps reachable from roots (inclusive)."""
+    found = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for name, step in steps.items():
+            if name not in found and found.intersection(step['after']):
+                found.add(name)
+                changed = True
+    return found
+
+
+def run_pipeline(force=(), jobs=2):
+    """Run out-of-date steps in dependency order, in parallel where possible."""
+
+    print("=" * 60)
+    print("INCREMENTAL PIPELINE RUNNER")
+    print("=" * 60)
+
+    steps = build_steps(county_paths())
+    state = load_state()
+    forced = downstream(steps, resolve_force(steps, force))
+
+    pipeline_start = time.time()
+    results = {}   # name -> {'status': 'hit'|'miss'|'failed'|'blocked', 'time': float}
+    pending = set(steps)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Start every step whose upstream steps have all finished
+            for name in sorted(pending):
+                step = steps[name]
+                if any(dep not in results for dep in step['after']):
+                    continue
+                pending.discard(name)
+
+                if any(results[dep]['status'] in ('failed', 'blocked') for dep in step['after']):
+                    results[name] = {'status': 'blocked', 'time': 0.0}
+                    continue
+
+                # Inputs are final once upstream steps are done, so hash now
+                key = step_key(step)
+                cached = state.get(name, {})
+                expired = 'max_age' in step and time.time() - cached.get('finished_at', 0) > step['max_age']
+                if (name not in forced and not expired and cached.get('key') == key
+                        and all(os.path.exists(out) for out in step['outputs'])
+                        and cached.get('outputs') == hash_files(step['outputs'])):
+                    results[name] = {'status': 'hit', 'time': 0.0}
+                    print(f"\n⏭️  {name} {step['script']}: cache hit")
+                    continue
+
+                print(f"\n▶️  {name} {step['script']}: running...")
+                running[pool.submit(run_step, step)] = (name, key)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                ok, elapsed, output = future.result()
+                print(f"\n----- {name} {steps[name]['script']} output -----")
+                print(output.rstrip())
+
+                if ok:
+                    results[name] = {'status': 'miss', 'time': elapsed}
+                    state[name] = {
+                        'key': key,
+                        'outputs': hash_files(steps[name]['outputs']),
+                        'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'finished_at': time.time(),
+                    }
+                    save_state(state)
+                else:
+                    results[name] = {'status': 'failed', 'time': elapsed}
+                    state.pop(name, None)
+                    save_state(state)
+
+    # Report
+    print("\n" + "=" * 60)
+    print("PIPELINE SUMMARY")
+    print("=" * 60)
+    labels = {'hit': 'cache hit', 'miss': 'ran', 'failed': '❌ failed', 'blocked': 'blocked'}
+    for name in sorted(steps):
+        r = results[name]
+        print(f"  {name} {steps[name]['script']:<32} {labels[r['status']]:<10} {r['time']:>7.1f}s")
+
+    hits = sum(1 for r in results.values() if r['status'] == 'hit')
+    total = sum(r['time'] for r in results.values())
+    print(f"\nCache hits: {hits}/{len(steps)}")
+    print(f"Step time:  {total:.1f}s")
+    print(f"Wall time:  {time.time() - pipeline_start:.1f}s")
+
+    failed = [n for n, r in results.items() if r['status'] in ('failed', 'blocked')]
+    if failed:
+        print(f"\n❌ Pipeline incomplete (failed or blocked: {', '.join(sorted(failed))})")
+        return False
+
+    print("\n✅ Pipeline up to date!")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data pipeline incrementally.")
+    parser.add_argument('--force', nargs='*', default=[],
+                        help="step numbers to rerun with everything downstream, or 'all'")
+    parser.add_argument('--jobs', type=int, default=2,
+                        help="steps to run in parallel (default: 2)")
+    args = parser.parse_args()
+
+    # Step scripts use paths relative to scripts/
+    os.chdir(SCRIPTS_DIR)
+    try:
+        resolve_force(build_steps(county_paths()), args.force)
+    except ValueError as e:
+        parser.error(str(e))
+
+    ok = run_pipeline(force=args.force, jobs=args.jobs)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
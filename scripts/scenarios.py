@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Batch What-If Scoring Engine
+
+Scores many feature perturbations against the trained Random Forest models
+in one go. The models and feature matrix are loaded once; every scenario's
+affected block groups are stacked into a single matrix, derived features are
+recomputed with the pipeline's own formulas, and each model gets exactly one
+predict() call for the whole batch.
+
+A scenario is a dict:
+    {
+        'name': 'income +10%',
+        'geoids': ['260650001001', ...],     # None = every block group
+        'scale': {'median_income': 1.10},    # multiply a column
+        'shift': {'days_on_market': -5},     # add to a column
+    }
+
+Usage (from scripts/):
+    python scenarios.py median_income --scale 1.05 1.10 1.20
+    python scenarios.py days_on_market --shift -10 -5 5 --geoids 260650001001 260650001002
+    python scenarios.py median_income --scale 1.10 --output ../data/processed/scenario_deltas.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from derived_features import DERIVED_COLUMNS, SPATIAL_LAG_COLUMNS, add_derived_features
+from pipeline_paths import county_paths
+from storage import read_table
+from trained_models import feature_columns, load_models, predict_targets
+
+# Share columns are kept inside [0, 1] after perturbation
+FRACTION_COLUMNS = [
+    'pct_owner_occupied', 'pct_renter_occupied', 'pct_cost_burdened', 'pct_minority',
+]
+
+
+def model_matrix(frame, feature_cols):
+    """Recompute derived features for (possibly perturbed) rows and select model inputs."""
+    frame = add_derived_features(frame)
+    return frame[feature_cols]
+
+
+def load_engine(paths=None):
+    """Load both models and the feature table once, and score the baseline."""
+    paths = paths or county_paths()
+
+    models = load_models(paths)
+    feature_cols = feature_columns(models)
+
+    base = read_table(paths['features']).set_index('GEOID')
+    X = model_matrix(base.copy(), feature_cols)
+
+    # Baseline is scored through the same path as scenarios, so an empty
+    # perturbation gives exactly zero delta
+    baseline_equity, baseline_foreclosure = predict_targets(models, X)
+    return {
+        'models': models,
+        'feature_cols': feature_cols,
+        'base': base,
+        'baseline_equity': baseline_equity,
+        'baseline_foreclosure': baseline_foreclosure,
+    }
+
+
+def _scenario_rows(base, scenario):
+    """Row positions in base for a scenario's GEOIDs."""
+    geoids = scenario.get('geoids')
+    if geoids is None:
+        return np.arange(len(base))
+    rows = base.index.get_indexer([str(g) for g in geoids])
+    if (rows < 0).any():
+        missing = [g for g, r in zip(geoids, rows) if r < 0]
+        raise KeyError(f"Unknown GEOIDs in scenario {scenario.get('name')!r}: {missing[:5]}")
+    return rows
+
+
+def score_scenarios(engine, scenarios):
+    """
+    Score a batch of scenarios. Returns one row per (scenario, GEOID) with the
+    new equity and foreclosure predictions and their change from baseline.
+    """
+    base = engine['base']
+
+    row_blocks = [_scenario_rows(base, s) for s in scenarios]
+    sizes = np.array([len(r) for r in row_blocks])
+    rows = np.concatenate(row_blocks) if row_blocks else np.array([], dtype=int)
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+
+    # Validate perturbed columns up front
+    perturbed = set()
+    for s in scenarios:
+        for col in list(s.get('scale', {})) + list(s.get('shift', {})):
+            if col in DERIVED_COLUMNS or col in SPATIAL_LAG_COLUMNS:
+                raise ValueError(f"{col} is derived from other columns; perturb its inputs instead")
+            if col not in base.columns:
+                raise ValueError(f"Unknown feature column: {col}")
+            perturbed.add(col)
+
+    stacked = base.iloc[rows].reset_index()
+
+    # One multiplier/offset vector per perturbed column, filled per scenario slice
+    for col in perturbed:
+        factor = np.ones(len(rows))
+        offset = np.zeros(len(rows))
+        for i, s in enumerate(scenarios):
+            block = slice(starts[i], starts[i + 1])
+            factor[block] = s.get('scale', {}).get(col, 1.0)
+            offset[block] = s.get('shift', {}).get(col, 0.0)
+        values = stacked[col].to_numpy(dtype=float) * factor + offset
+        if col in FRACTION_COLUMNS:
+            values = np.clip(values, 0, 1)
+        stacked[col] = values
+
+    X = model_matrix(stacked, engine['feature_cols'])
+    equity, foreclosure = predict_targets(engine['models'], X)
+
+    return pd.DataFrame({
+        'scenario': np.repeat([s.get('name', str(i)) for i, s in enumerate(scenarios)], sizes),
+        'GEOID': stacked['GEOID'].to_numpy(),
+        'equity_score': equity,
+        'equity_delta': equity - engine['baseline_equity'][rows],
+        'foreclosure_risk': foreclosure,
+        'foreclosure_delta': foreclosure - engine['baseline_foreclosure'][rows],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score what-if scenarios against the trained models.")
+    parser.add_argument('feature', help="feature column to perturb, e.g. median_income")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--scale', type=float, nargs='+', help="multipliers to sweep, e.g. 1.05 1.10")
+    group.add_argument('--shift', type=float, nargs='+', help="offsets to sweep, e.g. -10 10")
+    parser.add_argument('--geoids', nargs='+', help="block groups to perturb (default: all)")
+    parser.add_argument('--output', help="write per-GEOID deltas to this CSV")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("WHAT-IF SCENARIO SCORING")
+    print("=" * 60)
+
+    engine = load_engine()
+    print(f"\n✓ Models and features loaded: {len(engine['base'])} block groups")
+
+    kind = 'scale' if args.scale else 'shift'
+    scenarios = [
+        {'name': f'{args.feature} {kind} {v:g}', 'geoids': args.geoids, kind: {args.feature: v}}
+        for v in (args.scale or args.shift)
+    ]
+    results = score_scenarios(engine, scenarios)
+
+    print(f"\n📊 Mean change per scenario ({len(results)} scored rows):")
+    summary = results.groupby('scenario', sort=False)[['equity_delta', 'foreclosure_delta']].mean()
+    for name, row in summary.iterrows():
+        print(f"   {name:<32} equity {row['equity_delta']:+6.2f}   foreclosure {row['foreclosure_delta']:+6.2f}")
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nOutput file: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Rule-based scoring formulas shared by model training (script 06, target
+construction) and prediction (script 07, gentrification risk), so the
+formulas live in one place.
+
+Each function takes a DataFrame and returns a float Series on the same
+index, computed column-wise with NumPy instead of DataFrame.apply(axis=1).
+NaN handling matches the original per-row versions: Python's min(x, 100)
+keeps a NaN, max(0, x) turns it into 0 (np.fmax).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _col(frame, name):
+    return frame[name].to_numpy(dtype=float)
+
+
+def equity_score(frame):
+    """
+    Housing Equity Score (0-100).
+    Composite of: affordability, stability, opportunity, quality.
+    """
+    # 1. Affordability (40% weight) - lower cost burden = higher score
+    affordability = 100 - np.minimum(_col(frame, 'cost_burden_pct'), 100)
+
+    # 2. Stability (30% weight) - lower foreclosure risk = higher score
+    stability = 100 - (_col(frame, 'foreclosure_rate') * 100)
+
+    # 3. Opportunity (20% weight) - proxy: income level vs county median
+    opportunity = np.minimum((_col(frame, 'median_income') / 55000) * 50, 100)
+
+    # 4. Quality (10% weight) - proxy: property age and market liquidity
+    quality = (100 - _col(frame, 'property_age_estimate')) * 0.5 + _col(frame, 'market_liquidity') * 0.5
+
+    # Weighted average
+    score = (
+        0.40 * affordability +
+        0.30 * stability +
+        0.20 * opportunity +
+        0.10 * quality
+    )
+
+    return pd.Series(np.clip(score, 0, 100), index=frame.index)
+
+
+def foreclosure_risk(frame):
+    """
+    Foreclosure Risk Score (0-100).
+    Based on: cost burden, price volatility, income stability.
+    """
+    # 1. Cost Burden Risk (50% weight)
+    cost_burden_risk = np.minimum(_col(frame, 'cost_burden_pct'), 100)
+
+    # 2. Price Volatility Risk (30% weight) - high volatility = higher risk
+    price_volatility = np.minimum(np.abs(_col(frame, 'price_yoy_change')) * 500, 100)
+
+    # 3. Income Risk (20% weight) - low income = higher risk
+    income_risk = np.fmax(0, 100 - (_col(frame, 'median_income') / 75000 * 100))
+
+    # Weighted average
+    risk = (
+        0.50 * cost_burden_risk +
+        0.30 * price_volatility +
+        0.20 * income_risk
+    )
+
+    return pd.Series(np.clip(risk, 0, 100), index=frame.index)
+
+
+def gentrification_risk(frame):
+    """
+    Gentrification risk (0-100), rule-based.
+    Based on price growth, income, and demographics.
+    """
+    # High price growth + low income + minority population = higher risk
+    price_factor = np.clip(_col(frame, 'price_yoy_change') * 1000, 0, 50)
+    income_factor = np.fmax(0, (1 - _col(frame, 'median_income') / 75000) * 30)
+    displacement_risk = _col(frame, 'pct_minority') * 20
+
+    risk = price_factor + income_factor + displacement_risk
+    return pd.Series(np.clip(risk, 0, 100), index=frame.index)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Storage backend for the data/processed intermediates.
+
+Tables are CSV by default. Set PIPELINE_STORAGE=parquet to store them as
+Parquet instead (requires pyarrow): county_paths() then hands out .parquet
+paths, and read_table()/write_table() pick the format from the extension.
+
+Parquet files are written with the typed schemas below, so GEOID comes back
+as a string without re-casting in every step, and read_table(columns=...)
+only decodes the requested columns.
+
+CSV copies for humans:
+    python storage.py                  # export Ingham intermediates to CSV
+    python storage.py 26037            # export a county partition
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Column dtypes per table. Identifiers are strings; anything the Census API
+# can leave blank is float64.
+_CENSUS = {
+    'GEOID': 'string',
+    'NAME': 'string',
+    'median_income': 'float64',
+    'total_units': 'float64',
+    'owner_occupied': 'float64',
+    'renter_occupied': 'float64',
+    'total_renters': 'float64',
+    'total_population': 'float64',
+    'white_population': 'float64',
+    'black_population': 'float64',
+    'median_home_value': 'float64',
+    'pct_owner_occupied': 'float64',
+    'pct_renter_occupied': 'float64',
+    'pct_cost_burdened': 'float64',
+    'pct_minority': 'float64',
+}
+
+_ASSESSOR = {
+    'GEOID': 'string',
+    'assessed_value_median': 'float64',
+    'assessed_value_mean': 'float64',
+    'parcel_count_estimated': 'int64',
+    'property_age_estimate': 'int64',
+    # Only with a parcel file (see parcels.py)
+    'assessed_value_p25': 'float64',
+    'assessed_value_p75': 'float64',
+    'year_built_median': 'float64',
+    'year_built_mean': 'float64',
+    'pct_built_pre1940': 'float64',
+}
+
+_MLS = {
+    'GEOID': 'string',
+    'median_sale_price': 'int64',
+    'price_yoy_change': 'float64',
+    'days_on_market': 'int64',
+    'sale_count_12mo': 'int64',
+    'price_per_sqft': 'int64',
+    'dist_to_downtown': 'float64',
+}
+
+_CENSUS_PANEL = {
+    'GEOID': 'string',
+    'year': 'int64',
+    **{col: 'float64' for col in _CENSUS if col not in ('GEOID', 'NAME')},
+    'rent_burden_50pct': 'float64',
+}
+
+SCHEMAS = {
+    'census': _CENSUS,
+    'census_panel': _CENSUS_PANEL,
+    # Change features are all float64 (see census_panel.TREND_COLUMNS)
+    'census_trends': {'GEOID': 'string'},
+    'assessor': _ASSESSOR,
+    'mls': _MLS,
+    # Distances are float64, POI counts int64 (column names follow the POI list)
+    'accessibility': {'GEOID': 'string'},
+    # Features are filled with medians, so every numeric column is float64
+    'features': {'GEOID': 'string', 'NAME': 'string'},
+}
+
+# Columns read back as strings from CSV (numeric columns keep pandas'
+# inference there so CSV output stays byte-for-byte as before)
+STRING_COLUMNS = {'GEOID': str, 'NAME': str}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "PIPELINE_STORAGE=parquet requires pyarrow: pip install pyarrow"
+        ) from None
+
+
+def apply_schema(df, table):
+    """Cast the columns of df that appear in the table's schema."""
+    schema = SCHEMAS.get(table, {})
+    casts = {col: dtype for col, dtype in schema.items() if col in df.columns}
+    if table in ('features', 'census_trends'):
+        casts.update({
+            col: 'float64' for col in df.columns
+            if col not in schema and pd.api.types.is_numeric_dtype(df[col])
+        })
+    return df.astype(casts)
+
+
+def write_table(df, path, table):
+    """Write df to path as CSV or Parquet, depending on the extension."""
+    if path.endswith('.parquet'):
+        _require_pyarrow()
+        apply_schema(df, table).to_parquet(path, index=False, engine='pyarrow')
+    else:
+        df.to_csv(path, index=False)
+
+
+def read_table(path, columns=None):
+    """
+    Read a table written by write_table(). columns limits the read to those
+    columns (Parquet skips the rest on disk; CSV still parses every row).
+    """
+    if path.endswith('.parquet'):
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns, engine='pyarrow')
+
+    dtype = {c: t for c, t in STRING_COLUMNS.items() if columns is None or c in columns}
+    return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+
+def patch_csv_rows(df, path, rows):
+    """
+    Rewrite only the lines of rows (positions in df) in a CSV that
+    write_table() wrote from a frame with df's columns and row count; the
+    other rows must be unchanged. Formatting a few rows is much cheaper than
+    formatting every float of a large table. Returns False, leaving the file
+    alone, when the file can't be patched (Parquet, another header or row
+    count, values spanning lines); write the whole table instead.
+    """
+    if path.endswith('.parquet') or not os.path.exists(path):
+        return False
+    with open(path, newline='') as f:
+        lines = f.read().split(os.linesep)
+    header = df.head(0).to_csv(index=False).split(os.linesep)[0]
+    patched = df.iloc[rows].to_csv(index=False, header=False).split(os.linesep)
+    if lines[0] != header or len(lines) != len(df) + 2 or len(patched) != len(rows) + 1:
+        return False
+
+    for row, line in zip(rows, patched):
+        lines[row + 1] = line
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='') as f:
+        f.write(os.linesep.join(lines))
+    os.replace(tmp, path)
+    return True
+
+
+def export_csv(paths):
+    """Write a CSV copy next to every Parquet intermediate in a county's paths."""
+    exported = []
+    for table in SCHEMAS:
+        path = paths[table]
+        if not path.endswith('.parquet') or not os.path.exists(path):
+            continue
+        csv_file = os.path.splitext(path)[0] + '.csv'
+        read_table(path).to_csv(csv_file, index=False)
+        exported.append(csv_file)
+    return exported
+
+
+if __name__ == "__main__":
+    from pipeline_paths import county_paths
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if len(sys.argv) > 1:
+        fips = sys.argv[1]
+        paths = county_paths(fips[:2], fips[2:], partitioned=True)
+    else:
+        paths = county_paths()
+
+    # Export whatever Parquet files exist, regardless of PIPELINE_STORAGE
+    paths = {k: os.path.splitext(v)[0] + '.parquet' if k in SCHEMAS else v
+             for k, v in paths.items()}
+    for csv_file in export_csv(paths):
+        print(f"✓ {csv_file}")
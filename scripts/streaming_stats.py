@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Per-block-group statistics accumulated one chunk of rows at a time.
+
+GroupedHistogram keeps a fixed-bin histogram per group (block group), so
+medians and other quantiles can be read off at the end without holding the
+rows: memory is groups x bins counts, whatever the number of rows. Adding a
+chunk is one np.bincount over (group, bin) pairs, and two histograms with
+the same bins merge by adding their counts.
+
+Each item is placed within its bin, so quantiles are off by at most one
+bin width:
+- integer data (years) with one bin per value: exact
+- log-spaced bins (dollar amounts): relative error below the bin ratio,
+  e.g. 512 bins over 1e3..1e7 are 1.8% wide
+Values outside the bin range are counted in the first or last bin.
+
+KeyedCounts is the sparse counterpart for histograms kept over many
+periods (e.g. one per month, see mls_sales.py): counts per int64 key, where
+the key packs (period, group, bin), so only non-empty cells take memory.
+
+ColumnMedians keeps each column of a table sorted, so exact column medians
+follow row replacements (see feature_state.py): replacing r rows is a
+searchsorted delete and insert per column, O(r log n) to locate plus one
+memmove, instead of re-sorting every column.
+"""
+
+import numpy as np
+
+
+class GroupedHistogram:
+    """Fixed-bin histograms for n_groups groups; see the module docstring."""
+
+    def __init__(self, n_groups, edges, log=False):
+        self.edges = np.asarray(edges, dtype=float)
+        self.log = log
+        self._edges = np.log(self.edges) if log else self.edges
+        self.counts = np.zeros((n_groups, len(self.edges) - 1), dtype=np.int64)
+
+    @classmethod
+    def log_spaced(cls, n_groups, low, high, bins):
+        return cls(n_groups, np.geomspace(low, high, bins + 1), log=True)
+
+    @classmethod
+    def integers(cls, n_groups, low, high):
+        """One bin per integer value in [low, high], centered on the value."""
+        return cls(n_groups, np.arange(low, high + 2) - 0.5, log=False)
+
+    @property
+    def n_groups(self):
+        return self.counts.shape[0]
+
+    @property
+    def n_bins(self):
+        return self.counts.shape[1]
+
+    def bin_index(self, values):
+        """
+        (mask of the values that can be counted, bin of each of those);
+        NaNs, and values <= 0 on log-spaced bins, can't.
+        """
+        values = np.asarray(values, dtype=float)
+        keep = np.isfinite(values)
+        if self.log:
+            keep &= values > 0
+        values = np.log(values[keep]) if self.log else values[keep]
+        return keep, np.clip(np.searchsorted(self._edges, values, side='right') - 1, 0, self.n_bins - 1)
+
+    def add(self, groups, values):
+        """Count values (1-D) into the histograms of their groups; NaNs are skipped."""
+        keep, bins = self.bin_index(values)
+        self.add_counts(np.asarray(groups)[keep], bins)
+
+    def add_counts(self, groups, bins, counts=None):
+        """Add counts (default 1 each) to the given (group, bin) cells."""
+        self.counts += np.bincount(
+            groups * self.n_bins + bins, weights=counts, minlength=self.counts.size
+        ).astype(np.int64).reshape(self.counts.shape)
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Can only merge histograms with the same bin edges")
+        self.counts += other.counts
+        return self
+
+    def totals(self):
+        return self.counts.sum(axis=1)
+
+    def _order_statistics(self, cumulative, counts, k):
+        """Value of the k-th smallest item (0-based) per row, placed at its share of its bin."""
+        rows = np.arange(len(cumulative))
+        b = np.minimum((cumulative <= k[:, None]).sum(axis=1), self.n_bins - 1)
+        before = np.where(b > 0, cumulative[rows, b - 1], 0)
+        frac = np.clip((k - before + 0.5) / np.maximum(counts[rows, b], 1), 0, 1)
+        value = self._edges[b] + frac * (self._edges[b + 1] - self._edges[b])
+        return np.exp(value) if self.log else value
+
+    def quantiles(self, qs):
+        """
+        (n_groups, len(qs)) array of quantiles; NaN for empty groups. Like
+        np.quantile's default (linear) method, a quantile between two items
+        interpolates between them; each item sits in its bin at the center
+        of its share of the bin (so one-value bins give the value itself).
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        cumulative = np.cumsum(self.counts, axis=1)
+        totals = cumulative[:, -1]
+
+        out = np.full((self.n_groups, len(qs)), np.nan)
+        filled = totals > 0
+        cumulative, counts = cumulative[filled], self.counts[filled]
+        for j, q in enumerate(qs):
+            rank = q * (totals[filled] - 1)
+            lower = self._order_statistics(cumulative, counts, np.floor(rank))
+            upper = self._order_statistics(cumulative, counts, np.ceil(rank))
+            out[filled, j] = lower + (rank - np.floor(rank)) * (upper - lower)
+        return out
+
+
+class KeyedCounts:
+    """Counts per int64 key, sorted by key; see the module docstring."""
+
+    def __init__(self, keys=None, counts=None):
+        self.keys = np.asarray([] if keys is None else keys, dtype=np.int64)
+        self.counts = np.asarray([] if counts is None else counts, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys, counts=None):
+        """Add counts (default 1 each) to keys; repeated keys accumulate."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if counts is None:
+            keys, counts = np.unique(keys, return_counts=True)
+        else:
+            keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts, minlength=len(keys))
+        counts = counts.astype(np.int64)
+
+        # Merge into the sorted keys: existing keys add up, new ones are inserted
+        position = np.searchsorted(self.keys, keys)
+        found = position < len(self.keys)
+        found[found] = self.keys[position[found]] == keys[found]
+        self.counts[position[found]] += counts[found]
+        self.keys = np.insert(self.keys, position[~found], keys[~found])
+        self.counts = np.insert(self.counts, position[~found], counts[~found])
+
+    def select(self, low, high):
+        """(keys, counts) with low <= key < high."""
+        start, end = np.searchsorted(self.keys, [low, high])
+        return self.keys[start:end], self.counts[start:end]
+
+
+class ColumnMedians:
+    """Exact per-column medians of a table under row replacement; see the module docstring."""
+
+    def __init__(self, columns):
+        """columns: one sorted 1-D array of non-NaN values per column."""
+        self.columns = [np.asarray(col, dtype=float) for col in columns]
+
+    @classmethod
+    def from_values(cls, values):
+        """From a (rows, columns) array; NaNs are left out, as pandas' median does."""
+        values = np.asarray(values, dtype=float)
+        return cls(np.sort(col[~np.isnan(col)]) for col in values.T)
+
+    def replace(self, old, new):
+        """
+        Swap rows of the table: remove the (rows, columns) values old, which
+        must be in it, and insert new. NaNs are skipped on both sides.
+        """
+        old, new = np.asarray(old, dtype=float), np.asarray(new, dtype=float)
+        for j, col in enumerate(self.columns):
+            gone = np.sort(old[:, j][~np.isnan(old[:, j])])
+            # Equal values occupy consecutive positions: offset each repeat by its rank
+            position = np.searchsorted(col, gone) + np.arange(len(gone)) - np.searchsorted(gone, gone)
+            col = np.delete(col, position)
+            added = np.sort(new[:, j][~np.isnan(new[:, j])])
+            self.columns[j] = np.insert(col, np.searchsorted(col, added), added)
+
+    def medians(self):
+        """Median of each column (NaN for columns with no values)."""
+        out = np.full(len(self.columns), np.nan)
+        for j, col in enumerate(self.columns):
+            n = len(col)
+            if n:
+                out[j] = (col[(n - 1) // 2] + col[n // 2]) / 2
+        return out
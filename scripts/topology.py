@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Quantized, simplified TopoJSON for the webapp map.
+
+Block group polygons are converted to a TopoJSON topology: coordinates are
+snapped to an integer grid (quantization), rings are cut into arcs at the
+points where neighboring polygons meet, and every shared border is stored
+once. Each arc is simplified once (Douglas-Peucker) and reused by both
+polygons on either side, so simplification can never open a gap or overlap
+between adjacent block groups. Arcs are delta-encoded.
+
+One file is written per zoom level, keeping only GEOID as a property:
+
+    ingham_block_groups.z9.topojson    county overview
+    ingham_block_groups.z12.topojson   neighborhood view
+    ingham_block_groups.z15.topojson   street view
+
+Rebuild from an existing GeoJSON without re-downloading TIGER:
+    python topology.py
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+QUANTIZATION = 100_000   # grid cells per axis across the bounding box
+
+# Zoom level -> Douglas-Peucker tolerance in meters (roughly one screen
+# pixel at that zoom at Michigan's latitude)
+ZOOM_TOLERANCES_M = {
+    9: 150.0,
+    12: 20.0,
+    15: 2.5,
+}
+
+OBJECT_NAME = 'block_groups'
+
+
+def _rings(geom):
+    """Yield (polygon_index, ring_index, exterior/interior coords) for a (Multi)Polygon."""
+    polygons = geom.geoms if geom.geom_type == 'MultiPolygon' else [geom]
+    for p, poly in enumerate(polygons):
+        yield p, 0, poly.exterior.coords
+        for r, interior in enumerate(poly.interiors, start=1):
+            yield p, r, interior.coords
+
+
+def _quantize_ring(coords, translate, scale):
+    """Snap a ring to the integer grid and drop repeated points (ring stays closed)."""
+    xy = np.asarray(coords)[:, :2]
+    q = np.rint((xy - translate) / scale).astype(np.int64)
+    keep = np.ones(len(q), dtype=bool)
+    keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+    q = q[keep]
+    return [tuple(p) for p in q.tolist()]
+
+
+def _find_junctions(rings):
+    """
+    Points where the rings stop sharing a border. A point is a junction when
+    it is visited with different neighbors by different rings (or the same
+    ring twice).
+    """
+    neighbors = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring) - 1  # closed ring: last point == first
+        for i in range(n):
+            point = ring[i]
+            pair = (ring[i - 1], ring[i + 1])
+            seen = neighbors.get(point)
+            if seen is None:
+                neighbors[point] = pair
+            elif seen != pair and seen != (pair[1], pair[0]):
+                junctions.add(point)
+    return junctions
+
+
+def _cut_ring(ring, junctions):
+    """Split a closed ring into arcs that start and end at junctions."""
+    points = ring[:-1]
+    cut = [i for i, p in enumerate(points) if p in junctions]
+    if not cut:
+        # Whole ring is one arc; start it at its smallest point so the same
+        # ring seen from the other side (an enclave) dedupes to one arc.
+        start = points.index(min(points))
+        rotated = points[start:] + points[:start]
+        return [rotated + [rotated[0]]]
+
+    rotated = points[cut[0]:] + points[:cut[0]]
+    offsets = [i - cut[0] for i in cut] + [len(points)]
+    rotated = rotated + [rotated[0]]
+    return [rotated[a:b + 1] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def _closed_ring_arc(arc):
+    """Canonical form of a single-arc ring for the reversed lookup."""
+    rev = arc[::-1]
+    start = rev[:-1].index(min(rev[:-1]))
+    body = rev[:-1]
+    body = body[start:] + body[:start]
+    return body + [body[0]]
+
+
+def _douglas_peucker(points, tolerance):
+    """Boolean keep-mask for an (n, 2) array of metric coordinates."""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    if n < 3:
+        return keep
+
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = points[b] - points[a]
+        rel = points[a + 1:b] - points[a]
+        seg_len = math.hypot(*seg)
+        if seg_len == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return keep
+
+
+def _simplify_arc(arc, tolerance, meters_per_unit):
+    """Simplify one arc, keeping closed single-arc rings at >= 4 points."""
+    if len(arc) <= 2 or tolerance <= 0:
+        return arc
+    points = np.asarray(arc, dtype=float) * meters_per_unit
+    keep = _douglas_peucker(points, tolerance)
+    if arc[0] == arc[-1] and keep.sum() < 4:
+        # Closed ring: keep the two interior points that best preserve its shape
+        rel = points - points[0]
+        far = int(np.argmax(np.hypot(rel[:, 0], rel[:, 1])))
+        keep[far] = True
+        seg = points[far] - points[0]
+        cross = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0])
+        cross[[0, far, len(arc) - 1]] = -1
+        keep[int(np.argmax(cross))] = True
+    return [p for p, k in zip(arc, keep) if k]
+
+
+def _encode_arc(arc):
+    """Delta-encode an arc of absolute grid points."""
+    out = [list(arc[0])]
+    for (x0, y0), (x1, y1) in zip(arc[:-1], arc[1:]):
+        out.append([x1 - x0, y1 - y0])
+    return out
+
+
+def build_topology(gdf, quantization=QUANTIZATION):
+    """
+    Build the shared arc topology for a GeoDataFrame of block groups in
+    lon/lat. Returns a dict consumed by simplified_topojson().
+    """
+    minx, miny, maxx, maxy = gdf.total_bounds
+    translate = np.array([minx, miny])
+    scale = np.array([
+        (maxx - minx) / (quantization - 1) or 1.0,
+        (maxy - miny) / (quantization - 1) or 1.0,
+    ])
+
+    # Quantize every ring first so shared borders share exact grid points
+    shapes = []  # (GEOID, [(polygon_index, ring)])
+    all_rings = []
+    for geoid, geom in zip(gdf['GEOID'].astype(str), gdf.geometry):
+        rings = []
+        for p, _, coords in _rings(geom):
+            ring = _quantize_ring(coords, translate, scale)
+            if len(ring) >= 4:
+                rings.append((p, ring))
+                all_rings.append(ring)
+        shapes.append((geoid, rings))
+
+    junctions = _find_junctions(all_rings)
+
+    arcs = []
+    arc_index = {}
+    geometries = []
+    for geoid, rings in shapes:
+        polygons = {}
+        for p, ring in rings:
+            refs = []
+            for arc in _cut_ring(ring, junctions):
+                key = tuple(arc)
+                if key in arc_index:
+                    refs.append(arc_index[key])
+                    continue
+                if arc[0] == arc[-1] and arc[0] not in junctions:
+                    reverse = tuple(_closed_ring_arc(arc))
+                else:
+                    reverse = tuple(arc[::-1])
+                if reverse in arc_index:
+                    refs.append(~arc_index[reverse])
+                    continue
+                arc_index[key] = len(arcs)
+                refs.append(len(arcs))
+                arcs.append(arc)
+            polygons.setdefault(p, []).append(refs)
+        geometries.append((geoid, [polygons[p] for p in sorted(polygons)]))
+
+    # Meters per grid unit, for metric simplification tolerances
+    lat0 = math.radians((miny + maxy) / 2)
+    meters_per_unit = np.array([
+        scale[0] * 111_320 * math.cos(lat0),
+        scale[1] * 110_540,
+    ])
+
+    return {
+        'arcs': arcs,
+        'geometries': geometries,
+        'translate': translate.tolist(),
+        'scale': scale.tolist(),
+        'meters_per_unit': meters_per_unit,
+    }
+
+
+def simplified_topojson(topology, tolerance_m):
+    """Serialize a topology as a TopoJSON dict with every arc simplified once."""
+    arcs = [
+        _encode_arc(_simplify_arc(arc, tolerance_m, topology['meters_per_unit']))
+        for arc in topology['arcs']
+    ]
+
+    geometries = []
+    for geoid, polygons in topology['geometries']:
+        geometry = {'properties': {'GEOID': geoid}}
+        if len(polygons) == 1:
+            geometry.update({'type': 'Polygon', 'arcs': polygons[0]})
+        else:
+            geometry.update({'type': 'MultiPolygon', 'arcs': polygons})
+        geometries.append(geometry)
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': topology['scale'], 'translate': topology['translate']},
+        'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': arcs,
+    }
+
+
+def topojson_path(geojson_file, zoom):
+    """ingham_block_groups.geojson -> ingham_block_groups.z12.topojson"""
+    return f'{os.path.splitext(geojson_file)[0]}.z{zoom}.topojson'
+
+
+def write_topojson_levels(gdf, geojson_file, zoom_tolerances=ZOOM_TOLERANCES_M):
+    """Write one simplified TopoJSON per zoom level next to geojson_file."""
+    topology = build_topology(gdf)
+    written = []
+    for zoom, tolerance in sorted(zoom_tolerances.items()):
+        output_file = topojson_path(geojson_file, zoom)
+        with open(output_file, 'w') as f:
+            json.dump(simplified_topojson(topology, tolerance), f, separators=(',', ':'))
+        written.append(output_file)
+    return written
+
+
+if __name__ == "__main__":
+    import geopandas as gpd
+    from pipeline_paths import county_paths
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    geojson_file = county_paths()['block_groups']
+
+    print(f"📐 Building TopoJSON levels from {geojson_file}...")
+    source_kb = os.path.getsize(geojson_file) / 1024
+    for output_file in write_topojson_levels(gpd.read_file(geojson_file), geojson_file):
+        size_kb = os.path.getsize(output_file) / 1024
+        print(f"   ✓ {output_file}: {size_kb:.1f} KB ({source_kb / size_kb:.1f}x smaller)")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Load the trained models in either layout and predict both targets.
+
+Script 06 saves one of two layouts (see PIPELINE_MODELS in pipeline_paths.py):
+- separate: equity_model.pkl and foreclosure_model.pkl, one forest per target
+- joint:    housing_model.pkl, one multi-output forest whose predict()
+            returns an (n, 2) array of [equity, foreclosure]
+
+06 deletes the other layout's files when it saves, so whichever is on disk
+is current. Scripts 07, scenarios.py and the prediction service go through
+this module and don't care which one it is.
+
+06 also exports every model as a flat <model>.forest artifact (see
+forest_artifact.py). When those exist they are loaded instead of the
+pickles: memory-mapped, no unpickling and no scikit-learn import.
+"""
+
+import os
+
+import numpy as np
+
+from forest_artifact import artifact_path, load_forest
+
+# Column order of the joint model's output
+TARGETS = ['equity', 'foreclosure']
+
+
+def models_available(paths):
+    """True if a complete set of model files (either layout) exists."""
+    return os.path.exists(paths['joint_model']) or (
+        os.path.exists(paths['equity_model']) and os.path.exists(paths['foreclosure_model'])
+    )
+
+
+def load_models(paths, artifacts=True):
+    """
+    {'joint': model} or {'equity': model, 'foreclosure': model}, whichever is
+    on disk. With artifacts (default), .forest files are used when present
+    for every model; artifacts=False always unpickles.
+    """
+    if os.path.exists(paths['joint_model']):
+        files = {'joint': paths['joint_model']}
+    else:
+        files = {'equity': paths['equity_model'], 'foreclosure': paths['foreclosure_model']}
+
+    if artifacts and all(os.path.exists(artifact_path(f)) for f in files.values()):
+        return {name: load_forest(artifact_path(f)) for name, f in files.items()}
+
+    import joblib
+
+    return {name: joblib.load(f) for name, f in files.items()}
+
+
+def feature_columns(models):
+    """Model input columns, in training order."""
+    return list(next(iter(models.values())).feature_names_in_)
+
+
+def predict_targets(models, X):
+    """(equity, foreclosure) prediction arrays for the rows of X."""
+    if 'joint' in models:
+        predictions = models['joint'].predict(X)
+        return predictions[:, 0], predictions[:, 1]
+    return models['equity'].predict(X), models['foreclosure'].predict(X)
+
+
+def tree_predictions(model, X):
+    """
+    Every tree's prediction for the rows of X: (n_rows, n_trees), plus a
+    trailing output axis for multi-output models. Works for .forest
+    artifacts and for unpickled RandomForestRegressors.
+    """
+    if hasattr(model, 'predict_trees'):
+        return model.predict_trees(X)
+    # The fitted trees take the float32 matrix sklearn's forest would pass them
+    X = np.asarray(X[list(model.feature_names_in_)], dtype=np.float32)
+    return np.stack([tree.predict(X) for tree in model.estimators_], axis=1)
+
+
+def predict_target_trees(models, X):
+    """(equity, foreclosure) per-tree predictions, each (n_rows, n_trees)."""
+    if 'joint' in models:
+        trees = tree_predictions(models['joint'], X)
+        return trees[..., 0], trees[..., 1]
+    return tree_predictions(models['equity'], X), tree_predictions(models['foreclosure'], X)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Prediction intervals for the equity and foreclosure models.
+
+A Random Forest's prediction is the mean of its trees, so the spread of the
+per-tree predictions says how much the fitted trees disagree about a block
+group. The synthetic MLS inputs (script 04) are random draws as well: with
+draws > 0, the MLS columns are re-drawn that many times and the per-tree
+predictions of every draw are pooled, so the band also covers input noise.
+
+Everything is stacked rather than rerun per draw:
+- one synthesize_mls() call for all draws (block groups tiled draws times)
+- one add_derived_features() pass over the stacked (draws x block groups) rows
+- one sparse multiply for the spatial lags of every draw
+- one per-tree predict per model over all stacked rows
+- np.quantile over the (block groups x draws*trees) matrix
+
+Rows are processed ROWS_PER_PASS block groups at a time, so memory stays
+bounded (draws x trees x ROWS_PER_PASS values per target) at statewide
+scale.
+
+The bands describe model and input variability, not calibrated coverage:
+per-tree spread is not a guarantee that the true score lies inside.
+"""
+
+import importlib
+
+import numpy as np
+import pandas as pd
+
+from derived_features import (
+    SPATIAL_LAG_COLUMNS, SPATIAL_LAG_INPUTS, add_derived_features, spatial_lag_values,
+)
+from storage import read_table
+from trained_models import predict_target_trees
+
+# Lower and upper quantile of the reported band (a 90% interval)
+INTERVAL_QUANTILES = (0.05, 0.95)
+
+# MLS columns re-drawn per draw (the rest of synthesize_mls() is deterministic)
+MLS_DRAW_COLUMNS = [
+    'median_sale_price', 'price_yoy_change', 'days_on_market', 'sale_count_12mo', 'price_per_sqft',
+]
+
+# Seed for the re-draws; script 04's own draw uses RandomState(SEED)
+DRAW_SEED = 20240
+
+# Block groups per vectorized pass
+ROWS_PER_PASS = 1024
+
+
+def mls_draws(paths, n_draws, seed=DRAW_SEED):
+    """
+    n_draws synthetic MLS tables from script 04's generator in one pass:
+    (GEOIDs in 04's row order, {column: (n_draws, n_block_groups) array}).
+    """
+    synthetic_mls = importlib.import_module('04_generate_synthetic_mls')
+    census = read_table(paths['census'])
+    bg_data = synthetic_mls.downtown_distances(paths).merge(census, on='GEOID')
+
+    n = len(bg_data)
+    tiled = bg_data.iloc[np.tile(np.arange(n), n_draws)].reset_index(drop=True)
+    sales = synthetic_mls.synthesize_mls(tiled, np.random.default_rng(seed))
+    draws = {col: sales[col].to_numpy(dtype=float).reshape(n_draws, n) for col in MLS_DRAW_COLUMNS}
+    return bg_data['GEOID'].to_numpy(), draws
+
+
+def stack_draws(features, geoids, draws, weights=None):
+    """
+    Features with the MLS columns replaced by each draw: n_draws * len(features)
+    rows, draw-major, with derived columns recomputed and, given the spatial
+    weights W aligned to features' rows, spatial lags as well. Block groups
+    missing from the draws keep their pipeline values.
+    """
+    n = len(features)
+    n_draws = len(next(iter(draws.values())))
+    stacked = features.iloc[np.tile(np.arange(n), n_draws)].reset_index(drop=True)
+
+    positions = pd.Index(geoids).get_indexer(features['GEOID'].astype(str))
+    found = positions >= 0
+    for col, values in draws.items():
+        column = np.tile(features[col].to_numpy(dtype=float), (n_draws, 1))
+        column[:, found] = values[:, positions[found]]
+        stacked[col] = column.reshape(-1)
+
+    add_derived_features(stacked)
+
+    if weights is not None:
+        # (draws * n, k) -> (n, draws * k): one multiply lags every draw
+        k = len(SPATIAL_LAG_INPUTS)
+        X = stacked[SPATIAL_LAG_INPUTS].to_numpy(dtype=float).reshape(n_draws, n, k)
+        lagged = spatial_lag_values(X.transpose(1, 0, 2).reshape(n, n_draws * k), weights)
+        lagged = lagged.reshape(n, n_draws, k).transpose(1, 0, 2).reshape(n_draws * n, k)
+        for i, col in enumerate(SPATIAL_LAG_COLUMNS):
+            stacked[col] = lagged[:, i]
+    return stacked
+
+
+def prediction_intervals(models, X, n_rows, quantiles=INTERVAL_QUANTILES):
+    """
+    Quantiles of the pooled per-tree predictions. X holds n_draws * n_rows
+    rows, draw-major (n_draws = 1 for the model inputs as they are). Returns
+    {'equity': (n_rows, len(quantiles)), 'foreclosure': ...}.
+    """
+    n_draws = len(X) // n_rows
+    X = X.reset_index(drop=True)
+    bands = {'equity': np.empty((n_rows, len(quantiles))),
+             'foreclosure': np.empty((n_rows, len(quantiles)))}
+    for start in range(0, n_rows, ROWS_PER_PASS):
+        block = np.arange(start, min(start + ROWS_PER_PASS, n_rows))
+        rows = (np.arange(n_draws)[:, None] * n_rows + block).reshape(-1)
+        for target, trees in zip(bands, predict_target_trees(models, X.iloc[rows])):
+            # (draws * rows, trees) -> (rows, draws * trees)
+            pooled = trees.reshape(n_draws, len(block), -1).transpose(1, 0, 2).reshape(len(block), -1)
+            bands[target][block] = np.quantile(pooled, quantiles, axis=1).T
+    return bands
@@ -10,6 +10,7 @@ import {
   getAreaStatistics,
   findNeighbors
 } from '@/lib/ai-tools'
+import { AdjacencyGraph, AdjacencyIndex, indexAdjacency } from '@/lib/adjacency'
 
 export const runtime = 'nodejs'
 
@@ -20,7 +21,19 @@ const anthropic = new Anthropic({
 // Load predictions data (in production, use a database)
 let predictionsCache: BlockGroupData[] | null = null
 
+// Optional warm prediction service (scripts/prediction_service.py)
+const PREDICTION_SERVICE_URL = process.env.PREDICTION_SERVICE_URL
+
 async function loadPredictions(): Promise<BlockGroupData[]> {
+  if (PREDICTION_SERVICE_URL) {
+    try {
+      const response = await fetch(`${PREDICTION_SERVICE_URL}/predictions`, { cache: 'no-store' })
+      if (response.ok) return await response.json()
+    } catch (error) {
+      console.warn('Prediction service unavailable, using static predictions:', error)
+    }
+  }
+
   if (predictionsCache) return predictionsCache
 
   const response = await fetch(`${process.env.NEXT_PUBLIC_BASE_URL || 'http://localhost:3000'}/data/bg_predictions.json`)
@@ -29,6 +42,22 @@ async function loadPredictions(): Promise<BlockGroupData[]> {
   return data
 }
 
+// Block group adjacency graph (scripts/adjacency.py); null when unavailable
+let adjacencyCache: AdjacencyIndex | null | undefined
+
+async function loadAdjacency(): Promise<AdjacencyIndex | null> {
+  if (adjacencyCache !== undefined) return adjacencyCache
+
+  try {
+    const response = await fetch(`${process.env.NEXT_PUBLIC_BASE_URL || 'http://localhost:3000'}/data/ingham_block_groups.adjacency.json`)
+    adjacencyCache = response.ok ? indexAdjacency(await response.json() as AdjacencyGraph) : null
+  } catch (error) {
+    console.warn('Adjacency graph unavailable, using GEOID prefix neighbors:', error)
+    adjacencyCache = null
+  }
+  return adjacencyCache
+}
+
 // Define tools for Claude
 const tools: Anthropic.Tool[] = [
   {
@@ -192,7 +221,8 @@ async function executeTool(toolName: string, toolInput: any): Promise<any> {
       const bg = predictions.find(p => p.geoid === toolInput.geoid)
       if (!bg) return { error: 'Block group not found' }
 
-      const neighbors = findNeighbors(toolInput.geoid, predictions)
+      // Every block group that shares a border (or corner) with this one
+      const neighbors = findNeighbors(toolInput.geoid, predictions, Infinity, await loadAdjacency())
       return simulateSpilloverEffects(bg, neighbors, {
         type: toolInput.intervention_type,
         amount: toolInput.intervention_amount,
@@ -4,6 +4,7 @@ import { useEffect, useState } from 'react'
 import BlockGroupMap from '@/components/BlockGroupMap'
 import AIAssistant from '@/components/AIAssistant'
 import { BlockGroupData } from '@/lib/types'
+import { loadPredictions } from '@/lib/data-loader'
 
 export default function Home() {
   const [predictions, setPredictions] = useState<BlockGroupData[]>([])
@@ -16,11 +17,7 @@ export default function Home() {
   useEffect(() => {
     async function loadData() {
       try {
-        const response = await fetch('/data/bg_predictions.json')
-        if (!response.ok) {
-          throw new Error('Failed to load predictions')
-        }
-        const data = await response.json()
+        const data = await loadPredictions()
         setPredictions(data)
         setLoading(false)
       } catch (err) {
@@ -3,6 +3,7 @@
 import { useEffect, useRef, useState } from 'react'
 import mapboxgl from 'mapbox-gl'
 import { BlockGroupData } from '@/lib/types'
+import { geometryLevelForZoom, loadBlockGroupGeometry } from '@/lib/data-loader'
 import BlockGroupPanel from './BlockGroupPanel'
 import ScoreLegend from './ScoreLegend'
 
@@ -38,12 +39,12 @@ export default function BlockGroupMap({
     })
 
     map.on('load', async () => {
-      console.log('Map loaded, fetching GeoJSON...')
+      console.log('Map loaded, fetching block group geometry...')
 
-      // Load block group GeoJSON
-      const response = await fetch('/data/ingham_block_groups.geojson')
-      const geojson = await response.json()
-      console.log('GeoJSON loaded, features:', geojson.features?.length)
+      // Load simplified block group geometry for the current zoom level
+      let geometryLevel = geometryLevelForZoom(map.getZoom())
+      const geojson = await loadBlockGroupGeometry(map.getZoom())
+      console.log('Geometry loaded, features:', geojson.features?.length, 'level: z' + geometryLevel)
 
       // Create a map of scores by GEOID
       const scoresMap: Record<string, number> = {}
@@ -59,6 +60,18 @@ export default function BlockGroupMap({
       })
       console.log('Source added: block-groups')
 
+      // Swap in more (or less) detailed geometry when the zoom level changes
+      map.on('zoomend', async () => {
+        const level = geometryLevelForZoom(map.getZoom())
+        if (level === geometryLevel) return
+        geometryLevel = level
+        const data = await loadBlockGroupGeometry(level)
+        const source = map.getSource('block-groups') as mapboxgl.GeoJSONSource | undefined
+        if (source && level === geometryLevel) {
+          source.setData(data)
+        }
+      })
+
       // Add fill layer with color based on equity score
       map.addLayer({
         id: 'bg-fill',
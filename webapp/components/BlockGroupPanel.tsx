@@ -53,6 +53,11 @@ export default function BlockGroupPanel({ bg, onClose }: Props) {
           <div className="text-xs text-gray-500 mt-1">
             {getScoreLabel(bg.equity_score)}
           </div>
+          {bg.equity_low !== undefined && bg.equity_high !== undefined && (
+            <div className="text-xs text-gray-500">
+              90% range: {bg.equity_low.toFixed(1)} – {bg.equity_high.toFixed(1)}
+            </div>
+          )}
         </div>
 
         {/* Risk Scores */}
@@ -69,6 +74,11 @@ export default function BlockGroupPanel({ bg, onClose }: Props) {
             <div className="text-2xl font-bold text-red-600">
               {bg.foreclosure_risk.toFixed(1)}
             </div>
+            {bg.foreclosure_low !== undefined && bg.foreclosure_high !== undefined && (
+              <div className="text-xs text-gray-500">
+                90% range: {bg.foreclosure_low.toFixed(1)} – {bg.foreclosure_high.toFixed(1)}
+              </div>
+            )}
           </div>
         </div>
 
@@ -0,0 +1,47 @@
+/**
+ * Block group adjacency graph written by scripts/adjacency.py
+ * (ingham_block_groups.adjacency.json, CSR layout).
+ */
+
+export interface AdjacencyGraph {
+  version: number
+  contiguity: 'queen' | 'rook'
+  geoids: string[]
+  indptr: number[]
+  indices: number[]
+}
+
+export interface AdjacencyIndex {
+  graph: AdjacencyGraph
+  position: Map<string, number>
+}
+
+export const ADJACENCY_VERSION = 1
+
+/**
+ * Build the GEOID -> node lookup once per loaded graph
+ */
+export function indexAdjacency(graph: AdjacencyGraph): AdjacencyIndex {
+  if (graph.version !== ADJACENCY_VERSION) {
+    throw new Error(`Unsupported adjacency file version ${graph.version}`)
+  }
+  const position = new Map<string, number>()
+  graph.geoids.forEach((geoid, i) => position.set(geoid, i))
+  return { graph, position }
+}
+
+/**
+ * GEOIDs of the block groups touching `geoid` (O(degree)); undefined when
+ * the GEOID is not in the graph
+ */
+export function neighborGeoids(index: AdjacencyIndex, geoid: string): string[] | undefined {
+  const i = index.position.get(geoid)
+  if (i === undefined) return undefined
+
+  const { indptr, indices, geoids } = index.graph
+  const out: string[] = []
+  for (let k = indptr[i]; k < indptr[i + 1]; k++) {
+    out.push(geoids[indices[k]])
+  }
+  return out
+}
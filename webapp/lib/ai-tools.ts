@@ -1,4 +1,5 @@
 import { BlockGroupData } from './types'
+import { AdjacencyIndex, neighborGeoids } from './adjacency'
 
 export interface CausalLoopState {
   month: number
@@ -251,14 +252,38 @@ export function getAreaStatistics(predictions: BlockGroupData[]) {
   }
 }
 
+// GEOID lookup per predictions array, built once instead of scanning per call
+const geoidLookups = new WeakMap<BlockGroupData[], Map<string, BlockGroupData>>()
+
+function geoidLookup(allBlockGroups: BlockGroupData[]): Map<string, BlockGroupData> {
+  let lookup = geoidLookups.get(allBlockGroups)
+  if (!lookup) {
+    lookup = new Map(allBlockGroups.map(bg => [bg.geoid, bg]))
+    geoidLookups.set(allBlockGroups, lookup)
+  }
+  return lookup
+}
+
 /**
- * Find neighboring block groups (same first 9 digits of GEOID)
+ * Find neighboring block groups. With an adjacency graph these are the block
+ * groups whose polygons touch; without one, fall back to block groups that
+ * share the first 9 digits of the GEOID.
  */
 export function findNeighbors(
   geoid: string,
   allBlockGroups: BlockGroupData[],
-  limit: number = 4
+  limit: number = 4,
+  adjacency?: AdjacencyIndex | null
 ): BlockGroupData[] {
+  const adjacent = adjacency ? neighborGeoids(adjacency, geoid) : undefined
+  if (adjacent) {
+    const lookup = geoidLookup(allBlockGroups)
+    return adjacent
+      .map(g => lookup.get(g))
+      .filter((bg): bg is BlockGroupData => bg !== undefined)
+      .slice(0, limit)
+  }
+
   return allBlockGroups
     .filter(bg => bg.geoid !== geoid && bg.geoid.substring(0, 9) === geoid.substring(0, 9))
     .slice(0, limit)
@@ -1,6 +1,44 @@
 import { BlockGroupData } from './types'
+import { decodePredictions } from './predictions-payload'
+import { loadSnapshotPredictions } from './prediction-snapshots'
+import { Topology, topologyToGeoJSON } from './topojson'
 
+// Zoom levels with a pre-simplified TopoJSON file (see scripts/topology.py)
+export const GEOMETRY_ZOOM_LEVELS = [9, 12, 15]
+
+/**
+ * Pick the most detailed geometry level at or below the current map zoom
+ */
+export function geometryLevelForZoom(zoom: number): number {
+  let level = GEOMETRY_ZOOM_LEVELS[0]
+  for (const z of GEOMETRY_ZOOM_LEVELS) {
+    if (zoom >= z) level = z
+  }
+  return level
+}
+
+/**
+ * Load predictions from the published snapshots (only diffs since the last
+ * visit), then the compact binary payload, falling back to the JSON file
+ * when neither is available or from an unsupported version
+ */
 export async function loadPredictions(): Promise<BlockGroupData[]> {
+  try {
+    const records = await loadSnapshotPredictions()
+    if (records) return records
+  } catch (error) {
+    console.warn('Prediction snapshots unavailable, falling back to the full payload:', error)
+  }
+
+  try {
+    const binary = await fetch('/data/bg_predictions.bin')
+    if (binary.ok) {
+      return decodePredictions(await binary.arrayBuffer())
+    }
+  } catch (error) {
+    console.warn('Binary predictions unavailable, falling back to JSON:', error)
+  }
+
   const response = await fetch('/data/bg_predictions.json')
   if (!response.ok) {
     throw new Error('Failed to load predictions')
@@ -8,10 +46,12 @@ export async function loadPredictions(): Promise<BlockGroupData[]> {
   return response.json()
 }
 
-export async function loadBlockGroupGeometry() {
-  const response = await fetch('/data/ingham_block_groups.geojson')
+export async function loadBlockGroupGeometry(zoom: number = GEOMETRY_ZOOM_LEVELS[0]): Promise<GeoJSON.FeatureCollection> {
+  const level = geometryLevelForZoom(zoom)
+  const response = await fetch(`/data/ingham_block_groups.z${level}.topojson`)
   if (!response.ok) {
     throw new Error('Failed to load block group boundaries')
   }
-  return response.json()
+  const topology: Topology = await response.json()
+  return topologyToGeoJSON(topology, 'block_groups')
 }
@@ -0,0 +1,114 @@
+/**
+ * Client for the versioned prediction snapshots published by
+ * scripts/prediction_snapshots.py under /data/snapshots/.
+ *
+ * The manifest is the only mutable file. Snapshots and diffs under objects/
+ * are content-addressed, so the browser can cache them indefinitely. The
+ * last snapshot loaded is kept in localStorage; on the next visit only the
+ * diffs from it to the latest snapshot are fetched, or the latest snapshot
+ * when ours has been evicted from the manifest.
+ */
+
+import { BlockGroupData } from './types'
+import { decodePredictions } from './predictions-payload'
+
+const SNAPSHOT_ROOT = '/data/snapshots'
+const STORAGE_KEY = 'bg-predictions-snapshot'
+export const SNAPSHOT_MANIFEST_VERSION = 1
+
+interface SnapshotEntry {
+  id: string
+  file: string
+  // Diff from the previous snapshot: changed records, in the payload format
+  diff: { from: string; file: string; remove: string[] } | null
+}
+
+interface SnapshotManifest {
+  version: number
+  latest: string
+  snapshots: SnapshotEntry[]
+}
+
+interface HeldSnapshot {
+  id: string
+  records: BlockGroupData[]
+}
+
+/**
+ * The next snapshot's records from the previous one's and a diff; same
+ * order as apply_diff() in scripts/prediction_snapshots.py
+ */
+export function applyDiff(records: BlockGroupData[], upsert: BlockGroupData[], remove: string[]): BlockGroupData[] {
+  const upserts = new Map<string, BlockGroupData>(upsert.map(record => [record.geoid, record]))
+  const removed = new Set(remove)
+  const out: BlockGroupData[] = []
+  for (const record of records) {
+    if (removed.has(record.geoid)) continue
+    const updated = upserts.get(record.geoid)
+    if (updated) upserts.delete(record.geoid)
+    out.push(updated ?? record)
+  }
+  return out.concat(Array.from(upserts.values()))
+}
+
+function readHeld(): HeldSnapshot | null {
+  try {
+    const stored = localStorage.getItem(STORAGE_KEY)
+    return stored ? JSON.parse(stored) : null
+  } catch {
+    return null
+  }
+}
+
+function storeHeld(held: HeldSnapshot) {
+  try {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(held))
+  } catch {
+    // Storage full or unavailable: the next visit fetches the full snapshot
+  }
+}
+
+/**
+ * Diffs leading from snapshot `from` to the latest one, or null when the
+ * manifest no longer has an unbroken chain from it
+ */
+function diffChain(manifest: SnapshotManifest, from: string): SnapshotEntry[] | null {
+  const start = manifest.snapshots.map(entry => entry.id).lastIndexOf(from)
+  if (start < 0) return null
+  const chain = manifest.snapshots.slice(start + 1)
+  return chain.every(entry => entry.diff !== null) ? chain : null
+}
+
+/**
+ * Latest predictions via the snapshot manifest, or null when no snapshots
+ * are published (callers fall back to bg_predictions.bin/.json)
+ */
+export async function loadSnapshotPredictions(): Promise<BlockGroupData[] | null> {
+  const response = await fetch(`${SNAPSHOT_ROOT}/manifest.json`, { cache: 'no-cache' })
+  if (!response.ok) return null
+  const manifest: SnapshotManifest = await response.json()
+  if (manifest.version !== SNAPSHOT_MANIFEST_VERSION || !manifest.latest) return null
+
+  const held = readHeld()
+  if (held?.id === manifest.latest) return held.records
+
+  const chain = held ? diffChain(manifest, held.id) : null
+  let records: BlockGroupData[]
+  if (held && chain) {
+    records = held.records
+    for (const entry of chain) {
+      const diff = entry.diff!
+      const upserts = await fetch(`${SNAPSHOT_ROOT}/${diff.file}`)
+      if (!upserts.ok) throw new Error(`Failed to load snapshot diff ${diff.file}`)
+      records = applyDiff(records, decodePredictions(await upserts.arrayBuffer()), diff.remove)
+    }
+  } else {
+    const latest = manifest.snapshots[manifest.snapshots.length - 1]
+    const snapshot = await fetch(`${SNAPSHOT_ROOT}/${latest.file}`)
+    if (!snapshot.ok) throw new Error(`Failed to load snapshot ${latest.file}`)
+    records = decodePredictions(await snapshot.arrayBuffer())
+  }
+
+  storeHeld({ id: manifest.latest, records })
+  return records
+}
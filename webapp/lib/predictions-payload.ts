@@ -0,0 +1,118 @@
+/**
+ * Decoder for the struct-of-arrays predictions payload written by
+ * scripts/predictions_payload.py (bg_predictions.bin).
+ *
+ * Numeric columns are read as typed-array views over the response buffer;
+ * fixed-point columns are divided by their scale, which reproduces the
+ * values in bg_predictions.json exactly. The uncertainty band columns are
+ * optional and only copied into the records when the payload has them.
+ */
+
+import { BlockGroupData } from './types'
+
+const MAGIC = 'BGPR'
+export const PREDICTIONS_PAYLOAD_VERSION = 1
+
+interface ColumnSpec {
+  name: string
+  type: 'str' | 'u16' | 'i32'
+  offset: number
+  scale?: number
+}
+
+interface PayloadHeader {
+  version: number
+  count: number
+  columns: ColumnSpec[]
+}
+
+function readStrings(buffer: ArrayBuffer, start: number, count: number): string[] {
+  const ends = new Uint32Array(buffer, start, count + 1)
+  const blob = new Uint8Array(buffer, start + 4 * (count + 1), ends[count])
+  const decoder = new TextDecoder()
+  const out = new Array<string>(count)
+
+  // One decode for the whole blob; byte offsets are character offsets when
+  // it is pure ASCII (GEOIDs and Census names almost always are)
+  const text = decoder.decode(blob)
+  const ascii = text.length === blob.length
+  for (let i = 0; i < count; i++) {
+    out[i] = ascii
+      ? text.slice(ends[i], ends[i + 1])
+      : decoder.decode(blob.subarray(ends[i], ends[i + 1]))
+  }
+  return out
+}
+
+function readNumbers(buffer: ArrayBuffer, spec: ColumnSpec, start: number, count: number): ArrayLike<number> {
+  const values = spec.type === 'u16'
+    ? new Uint16Array(buffer, start, count)
+    : new Int32Array(buffer, start, count)
+  if (!spec.scale) return values
+
+  const scaled = new Float64Array(count)
+  for (let i = 0; i < count; i++) scaled[i] = values[i] / spec.scale
+  return scaled
+}
+
+/**
+ * Decode bg_predictions.bin into the same records as bg_predictions.json
+ */
+export function decodePredictions(buffer: ArrayBuffer): BlockGroupData[] {
+  const view = new DataView(buffer)
+  const decoder = new TextDecoder()
+  const magic = decoder.decode(new Uint8Array(buffer, 0, 4))
+  if (magic !== MAGIC) {
+    throw new Error('Not a predictions payload')
+  }
+
+  const headerLength = view.getUint32(4, true)
+  const header: PayloadHeader = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)))
+  if (header.version !== PREDICTIONS_PAYLOAD_VERSION) {
+    throw new Error(`Unsupported predictions payload version ${header.version}`)
+  }
+
+  const dataStart = 8 + headerLength
+  const { count } = header
+  const columns: Record<string, ArrayLike<number> | string[]> = {}
+  for (const spec of header.columns) {
+    const start = dataStart + spec.offset
+    columns[spec.name] = spec.type === 'str'
+      ? readStrings(buffer, start, count)
+      : readNumbers(buffer, spec, start, count)
+  }
+
+  const geoid = columns.geoid as string[]
+  const name = columns.name as string[]
+  const num = (key: string) => columns[key] as ArrayLike<number>
+  const equity = num('equity_score')
+  const gentrification = num('gentrification_risk')
+  const foreclosure = num('foreclosure_risk')
+  const income = num('median_income')
+  const price = num('median_price')
+  const population = num('population')
+  const dom = num('days_on_market')
+  const yoy = num('price_yoy_change')
+  const bandColumns = ['equity_low', 'equity_high', 'foreclosure_low', 'foreclosure_high'] as const
+  const bands = bandColumns.filter(key => key in columns)
+
+  const records = new Array<BlockGroupData>(count)
+  for (let i = 0; i < count; i++) {
+    records[i] = {
+      geoid: geoid[i],
+      name: name[i],
+      equity_score: equity[i],
+      gentrification_risk: gentrification[i],
+      foreclosure_risk: foreclosure[i],
+      median_income: income[i],
+      median_price: price[i],
+      population: population[i],
+      days_on_market: dom[i],
+      price_yoy_change: yoy[i],
+    }
+    for (const key of bands) {
+      records[i][key] = num(key)[i]
+    }
+  }
+  return records
+}
@@ -0,0 +1,70 @@
+/**
+ * Minimal TopoJSON decoder for the block group topologies written by
+ * scripts/topology.py (quantized, delta-encoded arcs; Polygon/MultiPolygon only).
+ */
+
+type Position = [number, number]
+type ArcRing = number[]
+
+interface TopoGeometry {
+  type: 'Polygon' | 'MultiPolygon'
+  arcs: ArcRing[] | ArcRing[][]
+  properties?: Record<string, unknown>
+}
+
+export interface Topology {
+  type: 'Topology'
+  transform: { scale: Position; translate: Position }
+  objects: Record<string, { type: 'GeometryCollection'; geometries: TopoGeometry[] }>
+  arcs: Position[][]
+}
+
+/**
+ * Undo delta encoding and quantization for every arc
+ */
+function decodeArcs(topology: Topology): Position[][] {
+  const [sx, sy] = topology.transform.scale
+  const [tx, ty] = topology.transform.translate
+
+  return topology.arcs.map(arc => {
+    let x = 0
+    let y = 0
+    return arc.map(([dx, dy]) => {
+      x += dx
+      y += dy
+      return [x * sx + tx, y * sy + ty] as Position
+    })
+  })
+}
+
+/**
+ * Stitch arc references into a closed ring (negative index = reversed arc)
+ */
+function stitchRing(refs: ArcRing, arcs: Position[][]): Position[] {
+  const ring: Position[] = []
+  for (const ref of refs) {
+    const arc = ref >= 0 ? arcs[ref] : arcs[~ref].slice().reverse()
+    ring.push(...(ring.length === 0 ? arc : arc.slice(1)))
+  }
+  return ring
+}
+
+/**
+ * Convert one object of a topology into a GeoJSON FeatureCollection
+ */
+export function topologyToGeoJSON(topology: Topology, objectName: string): GeoJSON.FeatureCollection {
+  const arcs = decodeArcs(topology)
+  const collection = topology.objects[objectName]
+
+  const features: GeoJSON.Feature[] = collection.geometries.map(geom => {
+    const geometry: GeoJSON.Geometry = geom.type === 'Polygon'
+      ? { type: 'Polygon', coordinates: (geom.arcs as ArcRing[]).map(r => stitchRing(r, arcs)) }
+      : {
+          type: 'MultiPolygon',
+          coordinates: (geom.arcs as ArcRing[][]).map(p => p.map(r => stitchRing(r, arcs)))
+        }
+    return { type: 'Feature', properties: geom.properties ?? {}, geometry }
+  })
+
+  return { type: 'FeatureCollection', features }
+}
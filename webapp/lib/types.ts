@@ -9,6 +9,11 @@ export interface BlockGroupData {
   population: number
   days_on_market: number
   price_yoy_change: number
+  // 90% bands from the per-tree predictions (scripts/uncertainty.py)
+  equity_low?: number
+  equity_high?: number
+  foreclosure_low?: number
+  foreclosure_high?: number
 }
 
 export interface MapProps {
@@ -6,6 +6,20 @@ const nextConfig = {
       bodySizeLimit: '2mb',
     },
   },
+  // Prediction snapshots and diffs are content-addressed (scripts/prediction_snapshots.py);
+  // only their manifest changes
+  async headers() {
+    return [
+      {
+        source: '/data/snapshots/objects/:file*',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+      {
+        source: '/data/snapshots/manifest.json',
+        headers: [{ key: 'Cache-Control', value: 'no-cache' }],
+      },
+    ]
+  },
 }
 
 module.exports = nextConfig